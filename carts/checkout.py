@@ -0,0 +1,44 @@
+"""
+Checkout: turns the user's cart into an order in one transaction.
+
+The cart row is locked first, so concurrent checkouts of one cart run one
+after the other. Its items become the order's items through the order
+pipeline (orders.pipeline): products are locked in one query, stock is
+reserved with one UPDATE and prices are snapshotted from the locked rows.
+The cart is then emptied and remembers the order.
+
+A retry of a checkout that went through finds the cart empty and gets the
+same order back instead of an error, until items are added to the cart again.
+"""
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from orders.pipeline import reserve_items, create_order
+
+from .models import Cart
+
+
+@transaction.atomic
+def checkout_cart(user):
+    """
+    Returns (order, created). Raises ValidationError for an empty cart or
+    when a product is short, leaving the cart as it was.
+    """
+    cart, _ = Cart.objects.select_for_update().get_or_create(user=user)
+    items_data = [
+        {'product': product_id, 'quantity': quantity}
+        for product_id, quantity in cart.items.filter(product__isnull=False).values_list('product_id', 'quantity')
+    ]
+
+    if not items_data:
+        if cart.checkout_order_id:
+            return cart.checkout_order, False
+        raise ValidationError({'items': ["Your cart is empty."]})
+
+    lines = reserve_items(items_data)
+    order = create_order(lines, user=user)
+
+    cart.items.all().delete()
+    cart.checkout_order = order
+    cart.save(update_fields=['checkout_order'])
+    return order, True
@@ -10,6 +10,10 @@ class Cart(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="cart")
     created_at = models.DateTimeField(auto_now_add=True)
+    # The order the cart was last checked out into, until items are added again; replayed on checkout retries
+    checkout_order = models.ForeignKey(
+        'orders.Order', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+'
+    )
 
     def __str__(self):
         return f"Cart of {self.user.email}"
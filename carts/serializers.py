@@ -1,15 +1,22 @@
 from rest_framework import serializers
 from .models import CartItem, Cart
+from products.sparse import SparseFieldsetMixin
 
 
-class CartItemSerializer(serializers.ModelSerializer):
+class CartItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     total_price = serializers.ReadOnlyField()
 
     class Meta:
         model = CartItem
         fields = ['id', 'product', 'quantity', 'total_price']
+        expandable_fields = {
+            'product': ('products.serializers.ProductSerializer', {}),
+        }
+        field_requirements = {
+            'total_price': ['product__price', 'quantity'],
+        }
 
-class CartSerializer(serializers.ModelSerializer):
+class CartSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
     total_price = serializers.ReadOnlyField()
 
@@ -17,5 +24,8 @@ class CartSerializer(serializers.ModelSerializer):
         model = Cart
         fields = ['id', 'user', 'items', 'total_price', 'created_at']
         read_only_fields = ['user', 'total_price', 'created_at']
+        field_requirements = {
+            'total_price': ['items__product__price', 'items__quantity'],
+        }
 
         
\ No newline at end of file
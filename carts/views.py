@@ -6,14 +6,18 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Prefetch
 from rest_framework.exceptions import APIException, ValidationError
 from .models import Cart, CartItem
 from products.models import Product
 from .serializers import CartItemSerializer, CartSerializer
+from .checkout import checkout_cart
+from orders.serializers import OrderSerializers
+from products.sparse import SparseFieldsetViewMixin, optimize_queryset
 
 logger = logging.getLogger(__name__)
 
-class CartItemViewSet(ModelViewSet):
+class CartItemViewSet(SparseFieldsetViewMixin, ModelViewSet):
     """
     Handles operations for CartItem model.
 
@@ -30,12 +34,16 @@ class CartItemViewSet(ModelViewSet):
 
     def get_queryset(self):
         cart, _ = Cart.objects.get_or_create(user=self.request.user)  # Retrieve or create user's cart
-        logger.info("Fetched cart for user %s with %d items.", self.request.user, cart.items.count())
+        logger.info("Fetched cart %s for user %s.", cart.id, self.request.user)
         return cart.items.all()
 
     def create(self, request, *args, **kwargs):
         logger.info("User %s is attempting to add item to cart.", request.user)
         cart, _ = Cart.objects.get_or_create(user=request.user)
+        if cart.checkout_order_id:
+            # A filled cart is a new checkout, no longer a retry of the last one
+            cart.checkout_order = None
+            cart.save(update_fields=['checkout_order'])
         product_id = request.data.get('product')
         quantity = request.data.get('quantity', 1)
 
@@ -87,15 +95,30 @@ class CartViewSet(ViewSet):
     Endpoints:
         - GET    /cart/                  -> Show the user's cart.
         - GET    /cart/total_price/      -> Return the cart's total price.
+        - POST   /cart/checkout/         -> Turn the cart into an order and empty it.
     """
     permission_classes = [IsAuthenticated]
     throttle_classes = [UserRateThrottle, AnonRateThrottle]
 
+    def get_cart(self, request):
+        """
+        Returns the user's cart with its items and their products loaded in two queries.
+        """
+        cart, _ = Cart.objects.prefetch_related(
+            Prefetch('items', queryset=CartItem.objects.select_related('product'))
+        ).get_or_create(user=request.user)
+        return cart
+
     def list(self, request):
+        """
+        Accepts ?fields= and ?expand=; only what they select is loaded.
+        """
         logger.info("User %s requested cart details.", request.user)
+        serializer = CartSerializer(context={'request': request})
+        serializer.fields  # Rejects invalid ?fields= / ?expand= with a 400
         try:
-            cart, _ = Cart.objects.get_or_create(user=request.user)
-            serializer = CartSerializer(cart)
+            cart, _ = optimize_queryset(Cart.objects.all(), serializer).get_or_create(user=request.user)
+            serializer = CartSerializer(cart, context={'request': request})
             logger.info("Cart details retrieved successfully for user %s.", request.user)
             return Response(serializer.data)
         except Exception as e:
@@ -106,9 +129,32 @@ class CartViewSet(ViewSet):
     def total_price(self, request):
         logger.info("User %s requested total price of the cart.", request.user)
         try:
-            cart, _ = Cart.objects.get_or_create(user=request.user)
+            cart = self.get_cart(request)
             logger.info("Cart total price calculated successfully for user %s: %s", request.user, cart.total_price)
             return Response({'total_price': cart.total_price})
         except Exception as e:
             logger.error("Unexpected error while calculating total price for user %s: %s", request.user, str(e), exc_info=True)
             raise APIException("An error occurred while calculating the cart's total price.")
+
+    @action(detail=False, methods=['post'])
+    def checkout(self, request):
+        """
+        Creates an order from the cart (201). Retrying after a checkout went
+        through returns the same order (200) until items are added again.
+        """
+        logger.info("User %s is checking out their cart.", request.user)
+        try:
+            order, created = checkout_cart(request.user)
+        except ValidationError as ve:
+            logger.warning("Checkout failed for user %s: %s", request.user, ve.detail)
+            raise
+        except Exception as e:
+            logger.error("Unexpected error during checkout for user %s: %s", request.user, str(e), exc_info=True)
+            raise APIException("An error occurred while checking out the cart.")
+
+        if created:
+            logger.info("Cart checked out into order %s for user %s.", order.id, request.user)
+        else:
+            logger.info("Replayed checkout of order %s for user %s.", order.id, request.user)
+        serializer = OrderSerializers(order, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
@@ -1,5 +1,6 @@
-from django.contrib import admin
-from .models import Order, OrderItem
+from django.contrib import admin, messages
+from .models import Order, OrderItem, OrderStatusHistory
+from .status import transition_orders
 
 
 # Register your models here.
@@ -9,10 +10,43 @@ class OrderItemInline(admin.TabularInline):  # Use TabularInline for inline edit
     extra = 1  # Number of extra empty fields to show for new items
 
 
+class OrderStatusHistoryInline(admin.TabularInline):
+    model = OrderStatusHistory
+    fields = ('from_status', 'to_status', 'changed_by', 'created_at')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+def transition_action(target, label):
+    """
+    An admin action moving the selected orders to ``target`` through orders.status.
+    """
+    def action(modeladmin, request, queryset):
+        result = transition_orders(queryset.values_list('pk', flat=True), target, changed_by=request.user)
+        modeladmin.message_user(request, f"{len(result.moved_ids)} orders marked as {label.lower()}.")
+        if result.rejected:
+            modeladmin.message_user(
+                request, f"{len(result.rejected)} orders can't be marked as {label.lower()} from their status.",
+                level=messages.WARNING,
+            )
+
+    action.__name__ = f'mark_{target.lower()}'
+    action.short_description = f"Mark selected orders as {label.lower()}"
+    return action
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ('user', 'status', 'created_at', 'updated_at')  # Added updated_at for better tracking
-    inlines = [OrderItemInline]  # Add the inline admin for OrderItems
+    list_display = ('user', 'status', 'item_count', 'total_amount', 'created_at', 'updated_at')  # Added updated_at for better tracking
+    list_filter = ('status',)
+    # Status changes go through the actions, which check and record them
+    readonly_fields = ('status', 'subtotal', 'item_count', 'total_amount')
+    inlines = [OrderItemInline, OrderStatusHistoryInline]  # Add the inline admin for OrderItems
+    actions = [transition_action(status, label) for status, label in Order.STATUS_CHOICES if status != 'PENDING']
 
 
 @admin.register(OrderItem)
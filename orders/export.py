@@ -0,0 +1,199 @@
+"""
+Streaming exports of orders and order items, as CSV or JSON Lines.
+
+Rows are read with ``values_list(...).iterator(chunk_size=EXPORT_CHUNK_SIZE)``,
+a server-side cursor on PostgreSQL, and encoded a chunk at a time, so memory
+stays flat however many rows match. The chunks are meant for a
+StreamingHttpResponse: the first bytes go out as soon as the first chunk is
+read, instead of after the whole export has been built.
+
+    orders  one row per order, with its stored totals
+    items   one row per order item, with its order, product and vendor
+"""
+import csv
+import datetime
+import io
+import zlib
+from decimal import Decimal
+
+import orjson
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+
+from .models import Order, OrderItem
+
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+
+# (column name, lookup) per export, in the order they are written
+ORDER_COLUMNS = [
+    ('order_id', 'id'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+    ('status', 'status'),
+    ('customer_email', 'user__email'),
+    ('item_count', 'item_count'),
+    ('subtotal', 'subtotal'),
+    ('total_amount', 'total_amount'),
+]
+ITEM_COLUMNS = [
+    ('order_id', 'order_id'),
+    ('order_created_at', 'order__created_at'),
+    ('order_status', 'order__status'),
+    ('customer_email', 'order__user__email'),
+    ('item_id', 'id'),
+    ('product_id', 'product_id'),
+    ('product_name', 'product__name'),
+    ('vendor_id', 'product__vendor_id'),
+    ('vendor_name', 'product__vendor__store_name'),
+    ('quantity', 'quantity'),
+    ('unit_price', 'price'),
+]
+# Worked out in Python, where Decimal arithmetic is exact on every database
+ITEM_EXTRA_COLUMNS = ['line_total']
+
+
+def _add_line_total(row):
+    quantity, price = row[-2], row[-1]
+    return (*row, None if price is None else price * quantity)
+
+
+def _export(columns, queryset, extra_columns=(), convert=None):
+    """
+    (column names, value tuples queryset, row conversion or None)
+    """
+    names = [name for name, _ in columns] + list(extra_columns)
+    return names, queryset.values_list(*(lookup for _, lookup in columns)), convert
+
+
+def order_rows(created_after=None, created_before=None, status=None, vendor=None):
+    """
+    Orders created in [created_after, created_before), oldest first.
+    With ``vendor``, the orders with at least one item of theirs.
+    """
+    queryset = Order.objects.all()
+    if created_after is not None:
+        queryset = queryset.filter(created_at__gte=created_after)
+    if created_before is not None:
+        queryset = queryset.filter(created_at__lt=created_before)
+    if status is not None:
+        queryset = queryset.filter(status=status)
+    if vendor is not None:
+        # A join on the items would repeat an order once per matching item
+        queryset = queryset.filter(Exists(
+            OrderItem.objects.filter(order=OuterRef('pk'), product__vendor=vendor)
+        ))
+    return _export(ORDER_COLUMNS, queryset.order_by('created_at', 'id'))
+
+
+def item_rows(created_after=None, created_before=None, status=None, vendor=None):
+    """
+    Items of the orders created in [created_after, created_before), grouped
+    by order, oldest first. With ``vendor``, only the items of theirs.
+    """
+    queryset = OrderItem.objects.all()
+    if created_after is not None:
+        queryset = queryset.filter(order__created_at__gte=created_after)
+    if created_before is not None:
+        queryset = queryset.filter(order__created_at__lt=created_before)
+    if status is not None:
+        queryset = queryset.filter(order__status=status)
+    if vendor is not None:
+        queryset = queryset.filter(product__vendor=vendor)
+    return _export(ITEM_COLUMNS, queryset.order_by('order__created_at', 'order_id', 'id'),
+                   extra_columns=ITEM_EXTRA_COLUMNS, convert=_add_line_total)
+
+
+EXPORTS = {
+    'orders': order_rows,
+    'items': item_rows,
+}
+
+
+def iter_chunks(queryset, convert=None, chunk_size=None):
+    """
+    Lists of up to ``chunk_size`` rows, read with a single cursor.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    chunk = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(convert(row) if convert else row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _csv_value(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_csv(names, chunks):
+    """
+    A header line, then one block of CSV lines per chunk, as UTF-8.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow(names)
+    yield flush()
+    for chunk in chunks:
+        writer.writerows([_csv_value(value) for value in row] for row in chunk)
+        yield flush()
+
+
+def _json_default(obj):
+    # Decimals are numbers, as the API renders them (COERCE_DECIMAL_TO_STRING is off)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError
+
+
+def encode_jsonl(names, chunks):
+    """
+    One JSON object per line, one block of lines per chunk.
+    """
+    for chunk in chunks:
+        yield b''.join(
+            orjson.dumps(dict(zip(names, row)), default=_json_default, option=orjson.OPT_APPEND_NEWLINE)
+            for row in chunk
+        )
+
+
+ENCODERS = {
+    'csv': encode_csv,
+    'jsonl': encode_jsonl,
+}
+
+
+def gzip_stream(blocks, level=6):
+    """
+    Compress a stream of byte blocks into one gzip member, block by block.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for block in blocks:
+        data = compressor.compress(block)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(export, file_format, filters, compress=False, chunk_size=None):
+    """
+    The encoded bytes of ``export`` ('orders' or 'items') matching
+    ``filters``, as an iterator of blocks.
+    """
+    names, queryset, convert = EXPORTS[export](**filters)
+    blocks = ENCODERS[file_format](names, iter_chunks(queryset, convert, chunk_size))
+    return gzip_stream(blocks) if compress else blocks
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.models import Order
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored subtotal, item count and total of orders from their items"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                            help="Number of orders updated per statement")
+
+    def handle(self, *args, **options):
+        batch_size = options.get("batch_size")
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        updated = 0
+        orders = Order.objects.order_by("pk").values_list("pk", flat=True)
+        # Keyset batches: each one is a short statement and a crash can simply be rerun
+        batch = list(orders[:batch_size])
+        while batch:
+            updated += Order.objects.filter(pk__in=batch).refresh_totals()
+            self.stdout.write(f"Updated {updated} orders")
+            batch = list(orders.filter(pk__gt=batch[-1])[:batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled totals for {updated} orders"))
@@ -0,0 +1,28 @@
+from django.db import models
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+class OrderQuerySet(models.QuerySet):
+    def refresh_totals(self):
+        """
+        Recompute the stored totals of every order in the queryset from its
+        items, with one UPDATE. Returns the number of orders updated.
+        """
+        OrderItem = self.model._meta.get_field('items').related_model
+        items = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order')
+
+        def aggregate(expression, output_field):
+            return Coalesce(
+                Subquery(items.annotate(total=Sum(expression)).values('total'), output_field=output_field),
+                Value(0, output_field=output_field),
+            )
+
+        line_total = ExpressionWrapper(F('price') * F('quantity'), output_field=DecimalField(max_digits=12, decimal_places=2))
+        subtotal = aggregate(line_total, DecimalField(max_digits=12, decimal_places=2))
+        return self.update(
+            subtotal=subtotal,
+            item_count=aggregate(F('quantity'), models.PositiveIntegerField()),
+            # No shipping, tax or discounts yet, so the grand total is the subtotal
+            total_amount=subtotal,
+        )
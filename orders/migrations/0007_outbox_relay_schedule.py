@@ -0,0 +1,32 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:58
+
+from django.db import migrations
+
+SCHEDULE_NAME = 'relay-order-outbox'
+
+
+def create_schedule(apps, schema_editor):
+    # Safety net for relays that couldn't be queued after commit, see orders.outbox
+    Schedule = apps.get_model('django_q', 'Schedule')
+    Schedule.objects.update_or_create(name=SCHEDULE_NAME, defaults={
+        'func': 'orders.outbox.relay_outbox',
+        'schedule_type': 'I',  # Schedule.MINUTES
+        'minutes': 1,
+        'repeats': -1,
+    })
+
+
+def delete_schedule(apps, schema_editor):
+    apps.get_model('django_q', 'Schedule').objects.filter(name=SCHEDULE_NAME).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_outboxmessage'),
+        ('django_q', '0018_task_success_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_schedule, delete_schedule),
+    ]
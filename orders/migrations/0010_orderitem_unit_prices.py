@@ -0,0 +1,42 @@
+from decimal import Decimal
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+CENT = Decimal('0.01')
+
+
+def _reprice(apps, convert):
+    """
+    Apply ``convert(price, quantity)`` to every priced item with a quantity
+    above one, the only ones whose line total and unit price differ.
+    """
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    items = OrderItem.objects.filter(quantity__gt=1, price__isnull=False).order_by('pk').only('price', 'quantity')
+
+    batch = list(items[:BATCH_SIZE])
+    while batch:
+        for item in batch:
+            item.price = convert(item.price, item.quantity)
+        OrderItem.objects.bulk_update(batch, ['price'])
+        batch = list(items.filter(pk__gt=batch[-1].pk)[:BATCH_SIZE])
+
+
+def line_totals_to_unit_prices(apps, schema_editor):
+    # Items written before unit prices hold product.price * quantity, so this is exact
+    _reprice(apps, lambda price, quantity: (price / quantity).quantize(CENT))
+
+
+def unit_prices_to_line_totals(apps, schema_editor):
+    _reprice(apps, lambda price, quantity: price * quantity)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0009_order_status_history'),
+    ]
+
+    operations = [
+        migrations.RunPython(line_totals_to_unit_prices, unit_prices_to_line_totals),
+    ]
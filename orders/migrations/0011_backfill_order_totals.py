@@ -0,0 +1,40 @@
+from django.db import migrations, models
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def backfill_order_totals(apps, schema_editor):
+    # Same totals as OrderQuerySet.refresh_totals, which historical models don't have
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    items = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order')
+
+    def aggregate(expression, output_field):
+        return Coalesce(
+            Subquery(items.annotate(total=Sum(expression)).values('total'), output_field=output_field),
+            Value(0, output_field=output_field),
+        )
+
+    line_total = ExpressionWrapper(F('price') * F('quantity'), output_field=DecimalField(max_digits=12, decimal_places=2))
+    subtotal = aggregate(line_total, DecimalField(max_digits=12, decimal_places=2))
+    item_count = aggregate(F('quantity'), models.PositiveIntegerField())
+
+    orders = Order.objects.order_by('pk').values_list('pk', flat=True)
+    batch = list(orders[:BATCH_SIZE])
+    while batch:
+        Order.objects.filter(pk__in=batch).update(subtotal=subtotal, item_count=item_count, total_amount=subtotal)
+        batch = list(orders.filter(pk__gt=batch[-1])[:BATCH_SIZE])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        # Totals are computed from unit prices
+        ('orders', '0010_orderitem_unit_prices'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_order_totals, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,18 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from products.models import Product
+from .manager import OrderQuerySet
 
 import uuid
+from decimal import Decimal
 
 
 # Create your models here.
 class Order(models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
+        ('PAID', 'Paid'),
         ('PROCESSING', 'Processing'),
         ('SHIPPED', 'Shipped'),
         ('DELIVERED', 'Delivered'),
@@ -16,17 +20,47 @@ class Order(models.Model):
     ]
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='orders')
+    # Changed only through orders.status, which checks the transition and records it
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     # payment_reference = models.CharField(max_length=100, blank=True, null=True)  # Paystack transaction reference
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized from the items by the order item write paths, see OrderQuerySet.refresh_totals
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+    item_count = models.PositiveIntegerField(default=0, editable=False)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
 
-    @property
-    def total_amount(self):
-        return sum(item.price * item.quantity for item in self.items.all())
+    TOTAL_FIELDS = ('subtotal', 'item_count', 'total_amount')
+
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        # Serves order history pages, see OrderHistoryPagination
+        indexes = [models.Index(fields=['user', 'created_at', 'id'], name='order_history_idx')]
 
     def __str__(self):
         return f"Order {self.id} - {self.user.email}"
+
+    def set_totals(self, items):
+        """
+        Set the stored totals from ``items``, for an order that isn't saved yet.
+        """
+        self.subtotal = sum((item.price * item.quantity for item in items), Decimal('0'))
+        self.item_count = sum(item.quantity for item in items)
+        self.total_amount = self.subtotal
+
+    def refresh_totals(self):
+        Order.objects.filter(pk=self.pk).refresh_totals()
+        self.refresh_from_db(fields=self.TOTAL_FIELDS)
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Never write back totals loaded before a concurrent change to the items
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.TOTAL_FIELDS
+            ]
+        super().save(*args, **kwargs)
     
 
 class OrderItem(models.Model):
@@ -39,3 +73,36 @@ class OrderItem(models.Model):
     def __str__(self):
         return f"{self.product.name} (x{self.quantity})"
     
+
+
+class OutboxMessage(models.Model):
+    """
+    A task to enqueue once the transaction that wrote it has committed,
+    relayed to the task queue by orders.outbox.relay_outbox.
+    """
+    task = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.task}{tuple(self.args)}"
+
+
+class OrderStatusHistory(models.Model):
+    """
+    A status change of an order, written by orders.status.transition_orders.
+    """
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='status_history')
+    from_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    to_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        verbose_name_plural = 'order status history'
+
+    def __str__(self):
+        return f"Order {self.order_id}: {self.from_status} -> {self.to_status}"
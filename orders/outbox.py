@@ -0,0 +1,65 @@
+"""
+Transactional outbox for side effects of order writes.
+
+Tasks are written to the OutboxMessage table in the same transaction as the
+order, so a rolled-back order never sends anything and nothing is enqueued
+while the transaction is open. Once it commits, a single relay task is
+queued; relay_outbox then moves pending messages to the task queue in
+batches. A django-q schedule runs the relay every minute as well, so
+messages are still delivered when queueing the relay failed.
+
+Delivery is at least once: a relay that fails halfway may enqueue some
+messages of its batch again on the next run.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django_q.tasks import async_task
+
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+RELAY_TASK = 'orders.outbox.relay_outbox'
+
+
+def publish(*messages):
+    """
+    Store ``messages`` ((task path, args) pairs) in the current transaction
+    and relay them once it commits.
+    """
+    OutboxMessage.objects.bulk_create([OutboxMessage(task=task, args=list(args)) for task, args in messages])
+    transaction.on_commit(queue_relay)
+
+
+def queue_relay():
+    try:
+        async_task(RELAY_TASK)
+    except Exception as e:
+        # The scheduled relay picks the messages up; the commit itself already happened
+        logger.warning("Could not queue the outbox relay: %s", e)
+
+
+def relay_outbox(batch_size=None):
+    """
+    Enqueue pending messages, oldest first, and delete them. Concurrent relays
+    skip each other's batches where the database supports SKIP LOCKED.
+    Returns the number of messages relayed.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    relayed = 0
+    while True:
+        with transaction.atomic():
+            messages = list(
+                OutboxMessage.objects.select_for_update(skip_locked=True).order_by('id')[:batch_size]
+            )
+            if not messages:
+                break
+            for message in messages:
+                async_task(message.task, *message.args)
+            OutboxMessage.objects.filter(pk__in=[message.pk for message in messages]).delete()
+        relayed += len(messages)
+    if relayed:
+        logger.info("Relayed %s outbox messages.", relayed)
+    return relayed
@@ -0,0 +1,10 @@
+from products.pagination import KeysetPagination
+
+
+class OrderHistoryPagination(KeysetPagination):
+    """
+    Newest orders first, one indexed range scan per page on
+    (user, created_at, id); see KeysetPagination.
+    """
+    ordering_fields = ('created_at',)
+    ordering = '-created_at'
@@ -0,0 +1,129 @@
+"""
+Order item pipeline: turns the items of an order payload into OrderItem rows
+with a fixed number of queries, however many items there are.
+
+1. merge: items for the same product are added up into one line
+2. lock: the products are loaded and locked with one SELECT ... FOR UPDATE
+3. check: stock is compared in memory, so a short order fails before any write
+4. reserve: stock is taken with one conditional UPDATE (ProductQuerySet.reserve_stock)
+5. write: lines are priced in memory and inserted with one bulk_create, and
+   the order's stored totals are set from them
+
+Run it inside a transaction, so the locks are held until the order is written.
+"""
+from rest_framework import serializers
+
+from products.models import Product, InsufficientStock
+
+from .models import Order, OrderItem
+
+
+class OrderLine:
+    def __init__(self, product, quantity):
+        self.product = product
+        self.quantity = quantity
+
+
+def merge_items(items_data):
+    """
+    {product pk: quantity}, in the order products first appear in the payload.
+    """
+    quantities = {}
+    for item_data in items_data:
+        pk = item_data['product']
+        quantities[pk] = quantities.get(pk, 0) + item_data['quantity']
+    return quantities
+
+
+def lock_products(pks):
+    # A fixed lock order keeps concurrent orders for the same products from deadlocking
+    products = Product.objects.select_for_update().filter(pk__in=pks).order_by('pk').only(
+        'id', 'name', 'price', 'stock_quantity',
+    )
+    products = {product.pk: product for product in products}
+    missing = [pk for pk in pks if pk not in products]
+    if missing:
+        raise serializers.ValidationError({'items': [f'Invalid pk "{pk}" - object does not exist.' for pk in missing]})
+    return products
+
+
+def check_stock(lines):
+    shortages = [
+        f"Insufficient stock for product '{line.product.name}'. Only {line.product.stock_quantity} available."
+        for line in lines if line.product.stock_quantity < line.quantity
+    ]
+    if shortages:
+        raise serializers.ValidationError({'items': shortages})
+
+
+def reserve_items(items_data):
+    """
+    Merge, lock, check and reserve the stock for ``items_data`` and return
+    the OrderLines to write. Raises ValidationError before writing anything
+    when a product doesn't exist or is short.
+    """
+    quantities = merge_items(items_data)
+    if not quantities:
+        return []
+    products = lock_products(quantities)
+    lines = [OrderLine(products[pk], quantity) for pk, quantity in quantities.items()]
+    check_stock(lines)
+
+    try:
+        Product.objects.reserve_stock(quantities)
+    except InsufficientStock as e:
+        # Only reachable where SELECT ... FOR UPDATE doesn't lock, e.g. on SQLite
+        raise serializers.ValidationError({'items': [
+            f"Insufficient stock for product '{products[pk].name}'. Only {available} available."
+            for pk, available in e.shortages.items()
+        ]})
+    return lines
+
+
+def build_items(order, lines):
+    """
+    One OrderItem per line, priced at the product's current unit price.
+    """
+    return [
+        OrderItem(order=order, product=line.product, quantity=line.quantity, price=line.product.price)
+        for line in lines
+    ]
+
+
+def create_order(lines, **fields):
+    """
+    Create an order with an item per line, its totals set in memory.
+    """
+    order = Order(**fields)
+    items = build_items(order, lines)
+    order.set_totals(items)
+    order.save(force_insert=True)
+    OrderItem.objects.bulk_create(items)
+    return order
+
+
+def add_items(order, lines):
+    """
+    Add ``lines`` to an existing order: products already on it get their
+    quantity raised and are repriced, the others get new items.
+    """
+    existing = {
+        item.product_id: item
+        for item in OrderItem.objects.filter(order=order, product_id__in=[line.product.pk for line in lines])
+    }
+    to_update, to_create = [], []
+    for line in lines:
+        item = existing.get(line.product.pk)
+        if item is None:
+            to_create.append(line)
+        else:
+            item.quantity += line.quantity
+            item.price = line.product.price
+            to_update.append(item)
+
+    if to_update:
+        OrderItem.objects.bulk_update(to_update, ['quantity', 'price'])
+    created = OrderItem.objects.bulk_create(build_items(order, to_create))
+    if lines:
+        order.refresh_totals()
+    return to_update + created
@@ -1,111 +1,125 @@
+import datetime
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils.dateparse import parse_date
 from rest_framework import serializers
+from .export import EXPORTS, FORMATS
 from .models import Order, OrderItem
+from .pipeline import reserve_items, create_order, add_items
+from .status import MAX_ORDERS
+from products.models import Product
+from products.sparse import SparseFieldsetMixin
 
-class OrderItemSerializer(serializers.ModelSerializer):
-    price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
 
-    class Meta:
-        model = OrderItem
-        fields = ['id', 'product', 'quantity', 'price']
+class ProductKeyField(serializers.PrimaryKeyRelatedField):
+    """
+    Accepts a product pk without loading the product: the products of an
+    order are loaded, and locked, together by orders.pipeline.
+    """
 
-    def validate(self, attrs):
-        product = attrs['product']
-        quantity = attrs['quantity']
-
-        # Check stock quantity
-        if product.stock_quantity < quantity:
-            raise serializers.ValidationError(
-                f"Insufficient stock for product '{product.name}'. Only {product.stock_quantity} available."
-            )
-        return attrs
+    def to_internal_value(self, data):
+        try:
+            return Product._meta.pk.to_python(data)
+        except DjangoValidationError:
+            self.fail('incorrect_type', data_type=type(data).__name__)
 
-    def create(self, validated_data):
-        product = validated_data['product']
-        quantity = validated_data['quantity']
-
-        # Check and deduct stock
-        if product.stock_quantity < quantity:
-            raise serializers.ValidationError(
-                f"Not enough stock for product {product.name}."
-            )
-
-        # Deduct stock quantity
-        product.stock_quantity -= quantity
-        product.save()
 
-        # Calculate the price based on the product's price and quantity
-        price = product.price * quantity
-        validated_data['price'] = price  # Set the calculated price
+class OrderItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    product = ProductKeyField(queryset=Product.objects.all())
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
 
-        # Create and return the OrderItem instance
-        return super().create(validated_data)
+    class Meta:
+        model = OrderItem
+        fields = ['id', 'product', 'quantity', 'price']
+        extra_kwargs = {'quantity': {'min_value': 1}}
+        expandable_fields = {
+            'product': ('products.serializers.ProductSerializer', {}),
+        }
 
-class OrderSerializers(serializers.ModelSerializer):
+class OrderSerializers(SparseFieldsetMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True)
-    total_amount = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    total_amount = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
     payment_reference = serializers.CharField(read_only=True)
     status = serializers.CharField(read_only=True)
 
     class Meta:
         model = Order
-        fields = ['id', 'user', 'status', 'created_at', 'updated_at', 'items', 'total_amount', 'payment_reference', 'status']
+        fields = ['id', 'user', 'status', 'created_at', 'updated_at', 'items', 'subtotal', 'item_count', 'total_amount', 'payment_reference', 'status']
+        read_only_fields = ['subtotal', 'item_count']
 
+    @transaction.atomic
     def create(self, validated_data):
-        # Extract items data from the validated data
         items_data = validated_data.pop('items')
 
-        # Create the order instance
-        order = Order.objects.create(**validated_data)
-
-        # Iterate through each item data and create/update associated OrderItem instances
-        for item_data in items_data:
-            product = item_data['product']
-            existing_item = OrderItem.objects.filter(order=order, product=product).first()
-
-            if existing_item:
-                # Update quantity and price of the existing item
-                existing_item.quantity += item_data['quantity']
-                if product.stock_quantity < item_data['quantity']:
-                    raise serializers.ValidationError(
-                        f"Not enough stock for product {product.name}."
-                    )
-                product.stock_quantity -= item_data['quantity']
-                product.save()
-                existing_item.price = product.price * existing_item.quantity
-                existing_item.save()
-            else:
-                # Create a new item if it doesn't already exist
-                item_data['order'] = order
-                OrderItemSerializer.create(OrderItemSerializer(), validated_data=item_data)
-
-        return order
+        # Reserve stock first: a short item fails the order before anything is written
+        lines = reserve_items(items_data)
+        return create_order(lines, **validated_data)
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        # Update the order fields
         items_data = validated_data.pop('items', [])
+
+        lines = reserve_items(items_data)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
+        add_items(instance, lines)
+        return instance
 
-        # Handle items: update existing or add new
-        for item_data in items_data:
-            product = item_data['product']
-            existing_item = OrderItem.objects.filter(order=instance, product=product).first()
-
-            if existing_item:
-                # Update quantity and price of the existing item
-                existing_item.quantity += item_data['quantity']
-                if product.stock_quantity < item_data['quantity']:
-                    raise serializers.ValidationError(
-                        f"Not enough stock for product {product.name}."
-                    )
-                product.stock_quantity -= item_data['quantity']
-                product.save()
-                existing_item.price = product.price * existing_item.quantity
-                existing_item.save()
-            else:
-                # Create a new item if it doesn't already exist
-                item_data['order'] = instance
-                OrderItemSerializer.create(OrderItemSerializer(), validated_data=item_data)
 
-        return instance
+class OrderSummarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    An order without its items, for order history lists.
+    """
+
+    class Meta:
+        model = Order
+        fields = ['id', 'status', 'created_at', 'updated_at', 'item_count', 'subtotal', 'total_amount']
+        read_only_fields = fields
+
+
+class DateOrDateTimeField(serializers.DateTimeField):
+    """
+    Accepts a datetime or a bare date, read as midnight in the current time zone.
+    """
+
+    def to_internal_value(self, value):
+        if isinstance(value, str):
+            date = parse_date(value)
+            if date is not None:
+                value = datetime.datetime.combine(date, datetime.time.min)
+        return super().to_internal_value(value)
+
+
+class OrderExportSerializer(serializers.Serializer):
+    """
+    Query parameters of the order export, see orders.export.
+    """
+    rows = serializers.ChoiceField(choices=list(EXPORTS), default='orders')
+    output = serializers.ChoiceField(choices=list(FORMATS), default='csv')
+    created_after = DateOrDateTimeField(required=False)
+    created_before = DateOrDateTimeField(required=False)
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES, required=False)
+    vendor = serializers.UUIDField(required=False)
+    gzip = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        after, before = attrs.get('created_after'), attrs.get('created_before')
+        if after is not None and before is not None and after >= before:
+            raise serializers.ValidationError({'created_before': 'Must be later than created_after.'})
+        return attrs
+
+    def get_filters(self):
+        return {
+            name: self.validated_data.get(name)
+            for name in ('created_after', 'created_before', 'status', 'vendor')
+        }
+
+
+class OrderTransitionSerializer(serializers.Serializer):
+    """
+    A bulk status change, see orders.status.transition_orders.
+    """
+    orders = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=MAX_ORDERS)
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
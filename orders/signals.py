@@ -1,22 +1,26 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from orders.models import Order
+from orders.models import Order, OrderItem
 from notifications.models import Notifications
-from django_q.tasks import async_task
+from orders.outbox import publish
 
 @receiver(post_save, sender=Order)
 def create_notification(sender, instance, created, **kwargs):
     if created:
-        # Trigger an async task for in-app notification
-        async_task("orders.tasks.send_order_notification", instance.user.id, instance.id)
-
-        async_task(
-            "notifications.twilio.send_sms_notification",
-            instance.user.phone_number,
-            f"Your order {instance.id} has been created successfully!",
+        # Written with the order and queued after commit, see orders.outbox
+        publish(
+            ("orders.tasks.send_order_notification", (str(instance.user_id), str(instance.id))),
+            ("orders.tasks.send_order_sms", (str(instance.id),)),
         )
 
 
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def update_order_totals(sender, instance, **kwargs):
+    # Single item writes (admin, shell); the order pipeline writes in bulk and refreshes itself
+    Order.objects.filter(pk=instance.order_id).refresh_totals()
+
+
 # @receiver(post_save, sender=Order)
 # def save_notification(sender, instance, **kwargs):
 #     instance.notifications.save()
@@ -0,0 +1,153 @@
+"""
+Order status state machine.
+
+Statuses only move along TRANSITIONS; anything else is refused. Every move
+goes through transition_orders(), which takes any number of orders and
+writes, whatever their number:
+
+1. lock: the orders are read and locked with one SELECT ... FOR UPDATE
+2. update: one conditional UPDATE per source status (WHERE status = source),
+   so a concurrent change is never overwritten
+3. history: an OrderStatusHistory row per moved order, with one bulk_create
+4. stock: cancelled orders put their items back in stock with one UPDATE
+5. notify: the customers are notified by a task, through the outbox, so the
+   notifications go out after the transaction commits and off the request
+
+    PENDING -> PAID -> PROCESSING -> SHIPPED -> DELIVERED
+       |         |          |
+       +---------+----------+-> CANCELLED
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from products.models import Product
+
+from .models import Order, OrderItem, OrderStatusHistory
+from .outbox import publish
+
+TRANSITIONS = {
+    'PENDING': {'PAID', 'CANCELLED'},
+    'PAID': {'PROCESSING', 'CANCELLED'},
+    'PROCESSING': {'SHIPPED', 'CANCELLED'},
+    'SHIPPED': {'DELIVERED'},
+    'DELIVERED': set(),
+    'CANCELLED': set(),
+}
+
+NOTIFY_TASK = 'orders.tasks.send_status_notifications'
+# Most orders one request may move, keeps the pk lists of the queries bounded
+MAX_ORDERS = 5000
+
+
+class InvalidTransition(ValueError):
+    def __init__(self, current, target):
+        self.current = current
+        self.target = target
+        super().__init__(f"An order can't go from {current} to {target}.")
+
+
+def can_transition(current, target):
+    return target in TRANSITIONS.get(current, ())
+
+
+class TransitionResult:
+    """
+    What transition_orders() did: the orders it moved, grouped by the status
+    they left, the ones whose status can't move to the target ({pk: status})
+    and the pks that matched no order.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.moved = {}
+        self.rejected = {}
+        self.missing = []
+
+    @property
+    def moved_ids(self):
+        return [pk for pks in self.moved.values() for pk in pks]
+
+
+def release_items(order_ids):
+    """
+    Put the items of ``order_ids`` back in stock, one UPDATE for all products.
+    """
+    quantities = (
+        OrderItem.objects.filter(order_id__in=order_ids).order_by()
+        .values_list('product').annotate(quantity=Sum('quantity'))
+    )
+    Product.objects.release_stock(dict(quantities))
+
+
+def notify(order_ids, status):
+    batch_size = settings.ORDER_STATUS_NOTIFY_BATCH_SIZE
+    publish(*(
+        (NOTIFY_TASK, ([str(pk) for pk in order_ids[start:start + batch_size]], status))
+        for start in range(0, len(order_ids), batch_size)
+    ))
+
+
+@transaction.atomic
+def transition_orders(order_ids, target, changed_by=None):
+    """
+    Move the orders in ``order_ids`` to ``target`` where their current status
+    allows it and return a TransitionResult. Orders already in ``target`` or
+    in a status that can't reach it are left alone and reported as rejected.
+    """
+    if target not in TRANSITIONS:
+        raise ValueError(f"Unknown order status '{target}'.")
+    result = TransitionResult(target)
+    order_ids = list(dict.fromkeys(Order._meta.pk.to_python(pk) for pk in order_ids))
+    if not order_ids:
+        return result
+
+    current = dict(
+        Order.objects.select_for_update().filter(pk__in=order_ids).order_by('pk').values_list('pk', 'status')
+    )
+    result.missing = [pk for pk in order_ids if pk not in current]
+
+    by_status = {}
+    for pk, status in current.items():
+        if can_transition(status, target):
+            by_status.setdefault(status, []).append(pk)
+        else:
+            result.rejected[pk] = status
+
+    now = timezone.now()
+    for source, pks in by_status.items():
+        updated = Order.objects.filter(pk__in=pks, status=source).update(status=target, updated_at=now)
+        if updated != len(pks):
+            # Only reachable where SELECT ... FOR UPDATE doesn't lock, e.g. on SQLite
+            moved = set(Order.objects.filter(pk__in=pks, status=target, updated_at=now).values_list('pk', flat=True))
+            result.rejected.update(dict(
+                Order.objects.filter(pk__in=[pk for pk in pks if pk not in moved]).values_list('pk', 'status')
+            ))
+            pks = [pk for pk in pks if pk in moved]
+        if pks:
+            result.moved[source] = pks
+
+    moved = result.moved_ids
+    if not moved:
+        return result
+
+    OrderStatusHistory.objects.bulk_create([
+        OrderStatusHistory(order_id=pk, from_status=source, to_status=target, changed_by=changed_by, created_at=now)
+        for source, pks in result.moved.items() for pk in pks
+    ])
+    if target == 'CANCELLED':
+        release_items(moved)
+    notify(moved, target)
+    return result
+
+
+def transition_order(order, target, changed_by=None):
+    """
+    Move a single order to ``target``, or raise InvalidTransition.
+    """
+    result = transition_orders([order.pk], target, changed_by=changed_by)
+    if order.pk in result.rejected:
+        raise InvalidTransition(result.rejected[order.pk], target)
+    order.refresh_from_db(fields=['status', 'updated_at'])
+    return order
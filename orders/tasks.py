@@ -2,12 +2,13 @@ from django_q.tasks import async_task
 from notifications.models import Notifications
 from twilio.rest import Client
 from orders.models import Order
+from notifications import twilio
 
 def send_order_notification(user_id, order_id):
     # Create an in-app notification
-     try:
-        # Fetch order details if needed
-        order = Order.objects.get(id=order_id)
+    try:
+        # Only the stored total is needed, not the items
+        order = Order.objects.only('id', 'total_amount').get(id=order_id)
 
         # Create the notification
         Notifications.objects.create(
@@ -24,6 +25,32 @@ def send_order_notification(user_id, order_id):
 
 
 
+def send_order_sms(order_id):
+    # The phone number is looked up here, so the order's transaction doesn't have to
+    order = Order.objects.select_related('user').only('id', 'user__phone_number').filter(id=order_id).first()
+    if order is None or not order.user.phone_number:
+        return None
+    return twilio.send_sms_notification(
+        to=order.user.phone_number,
+        message=f"Your order {order.id} has been created successfully!",
+    )
+
+
+def send_status_notifications(order_ids, status):
+    # One task per batch of a bulk transition, see orders.status.notify; orders
+    # that moved on again before the task ran get the later status' notification
+    orders = Order.objects.filter(id__in=order_ids, status=status).values_list('id', 'user_id')
+    label = dict(Order.STATUS_CHOICES)[status].lower()
+    return len(Notifications.objects.bulk_create([
+        Notifications(
+            user_id=user_id,
+            title="Order Status Updated",
+            message=f"Your order {order_id} is now {label}.",
+        )
+        for order_id, user_id in orders
+    ]))
+
+
 def send_sms_notification(phone_number, message):
     # Use Twilio or another SMS service to send the SMS
     account_sid = "your_twilio_account_sid"
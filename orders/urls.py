@@ -1,7 +1,12 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import OrderViewSet
+from .views import OrderExportView, OrderTransitionView, OrderViewSet
 
 router = DefaultRouter()
 router.register(r'', OrderViewSet, basename='orders')
 
-urlpatterns = router.urls
+urlpatterns = [
+    # Ahead of the router, whose detail route would take these for order ids
+    path('export/', OrderExportView.as_view(), name='order-export'),
+    path('transition/', OrderTransitionView.as_view(), name='order-transition'),
+] + router.urls
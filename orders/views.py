@@ -1,22 +1,36 @@
 import logging
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework.viewsets import ModelViewSet
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from .models import Order
-from .serializers import OrderSerializers
+from .export import FORMATS, stream_export
+from .serializers import OrderExportSerializer, OrderSerializers, OrderSummarySerializer, OrderTransitionSerializer
+from .status import transition_orders
+from .pagination import OrderHistoryPagination
+from products.sparse import SparseFieldsetViewMixin
+from shoplit.idempotency import idempotent
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
-class OrderViewSet(ModelViewSet):
+class OrderViewSet(SparseFieldsetViewMixin, ModelViewSet):
     """
     Handles operations for the Order model.
 
+    Lists are keyset paginated, newest first (see OrderHistoryPagination), and
+    read the stored order totals. Items are prefetched in one query per page;
+    ?expand=items.product joins their products into it. ?summary=true lists
+    orders without their items, in a single query per page.
+
     Endpoints:
         - GET    /orders        -> List all orders by the user.
-        - POST   /orders/       -> Create a new order for the user.
+        - POST   /orders/       -> Create a new order for the user (accepts an Idempotency-Key header).
         - GET    /orders/{id}/  -> Retrieve a specific order.
         - PUT    /orders/{id}/  -> Update a specific order.
         - PATCH  /orders/{id}/  -> Patch update on a specific order.
@@ -24,9 +38,18 @@ class OrderViewSet(ModelViewSet):
     """
     queryset = Order.objects.all()
     serializer_class = OrderSerializers
+    pagination_class = OrderHistoryPagination
     permission_classes = [IsAuthenticated]
     throttle_classes = [UserRateThrottle, AnonRateThrottle]
 
+    def get_serializer_class(self):
+        """
+        Returns the serializer without items for ?summary=true lists.
+        """
+        if self.action == 'list' and self.request.query_params.get('summary', '').lower() in ('1', 'true'):
+            return OrderSummarySerializer
+        return super().get_serializer_class()
+
     def get_queryset(self):
         """
         Ensure only the user's orders are returned.
@@ -39,6 +62,13 @@ class OrderViewSet(ModelViewSet):
             logger.error(f"Error retrieving orders for user {self.request.user.username}: {e}")
             return Order.objects.none()
 
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        """
+        Accepts an Idempotency-Key header, see shoplit.idempotency.
+        """
+        return super().create(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         """
         Automatically assign the logged-in user to the order when creating.
@@ -47,6 +77,8 @@ class OrderViewSet(ModelViewSet):
             logger.info(f"Creating order for user {self.request.user.username}.")
             serializer.save(user=self.request.user)
             logger.info(f"Order created successfully for user {self.request.user.username}.")
+        except ValidationError:
+            raise
         except Exception as e:
             logger.error(f"Error creating order for user {self.request.user.username}: {e}")
             raise Exception(f"An error occurred while creating the order: {e}")
@@ -94,3 +126,78 @@ class OrderViewSet(ModelViewSet):
                 {"error": f"An error occurred while deleting the order: {e}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+
+class OrderExportView(APIView):
+    """
+    Streams orders, or their items, as a CSV or JSON Lines download for staff.
+
+    The rows are read with a server-side cursor and sent as they are encoded
+    (see orders.export), so a year of orders takes no more memory than a
+    page of them and the first bytes arrive right away.
+
+    Query parameters:
+        - rows=orders|items       -> One row per order (default) or per order item.
+        - output=csv|jsonl        -> File format, CSV by default.
+        - created_after=<date>    -> Orders created at or after, a date or datetime.
+        - created_before=<date>   -> Orders created before, a date or datetime.
+        - status=<status>         -> Orders with this status.
+        - vendor=<vendor id>      -> Items of this vendor, or orders with any.
+        - gzip=true               -> Send a gzip compressed file.
+
+    Endpoints:
+        - GET /orders/export/ -> Download the export.
+    """
+    permission_classes = [IsAdminUser]
+    throttle_classes = [UserRateThrottle]
+
+    def get(self, request):
+        params = OrderExportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        options = params.validated_data
+
+        content_type, extension = FORMATS[options['output']]
+        filename = f"{options['rows']}-{timezone.now():%Y%m%d-%H%M%S}.{extension}"
+        if options['gzip']:
+            content_type = 'application/gzip'
+            filename += '.gz'
+
+        logger.info(f"Order export ({options['rows']}, {options['output']}) started by {request.user.email}.")
+        response = StreamingHttpResponse(
+            stream_export(options['rows'], options['output'], params.get_filters(), compress=options['gzip']),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class OrderTransitionView(APIView):
+    """
+    Moves many orders to a new status at once, for staff and warehouse tools.
+
+    Orders whose status can't move to the requested one (see orders.status)
+    are left alone and listed under "rejected" with their current status;
+    unknown ids are listed under "missing". The others are moved with one
+    UPDATE per status they leave, and their customers are notified in the
+    background.
+
+    Endpoints:
+        - POST /orders/transition/ -> {"orders": [<id>, ...], "status": "SHIPPED"}
+    """
+    permission_classes = [IsAdminUser]
+    throttle_classes = [UserRateThrottle]
+
+    def post(self, request):
+        serializer = OrderTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        target = serializer.validated_data['status']
+
+        result = transition_orders(serializer.validated_data['orders'], target, changed_by=request.user)
+        logger.info(f"{len(result.moved_ids)} orders moved to {target} by {request.user.email}.")
+        return Response({
+            'status': target,
+            'updated': len(result.moved_ids),
+            'moved': result.moved,
+            'rejected': result.rejected,
+            'missing': result.missing,
+        })
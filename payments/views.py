@@ -10,8 +10,10 @@ from .models import Payment
 from .serializers import PaymentSerializer
 from .paystack import Paystack
 from orders.models import Order  # Import your Order model
+from orders.status import transition_orders
 from notifications.models import Notifications
 from notifications import twilio
+from shoplit.idempotency import idempotent
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -21,11 +23,12 @@ class InitializePaymentView(APIView):
     Initialize payment for an order.
 
     Endpoint: 
-    POST /payments/initialize/{order_id} -> Initialize Payment
+    POST /payments/initialize/{order_id} -> Initialize Payment (accepts an Idempotency-Key header)
     """
     permission_classes = [IsAuthenticated]
     throttle_classes = [UserRateThrottle, AnonRateThrottle]
 
+    @idempotent
     def post(self, request, order_id):
         try:
             order = Order.objects.get(id=order_id, user=request.user)
@@ -106,8 +109,8 @@ class VerifyPaymentView(APIView):
             try:
                 payment.status = 'PAID'
                 payment.save()
-                payment.order.status = 'PAID'
-                payment.order.save()
+                # A repeated verification leaves an already paid order alone
+                transition_orders([payment.order_id], 'PAID', changed_by=request.user)
                 logger.info(f"Payment status updated for reference {reference}.")
             except Exception as e:
                 logger.error(f"Error updating payment/order status for reference {reference}: {e}")
@@ -165,13 +168,11 @@ class PaystackWebhookView(APIView):
         try:
             if event.get('event') == 'charge.success':
                 reference = event['data']['reference']
-                try:
-                    order = Order.objects.get(payment_reference=reference)
-                    order.status = 'PAID'
-                    order.save()
-                    logger.info(f"Order {order.id} status updated to 'PAID'.")
-                except Order.DoesNotExist:
+                order_id = Order.objects.filter(payment__ref=reference).values_list('id', flat=True).first()
+                if order_id is None:
                     logger.warning(f"Order not found for reference {reference}.")
+                elif transition_orders([order_id], 'PAID').moved:
+                    logger.info(f"Order {order_id} status updated to 'PAID'.")
         except Exception as e:
             logger.error(f"Error processing webhook: {e}")
         
@@ -0,0 +1,117 @@
+"""
+Versioned caching for catalog responses.
+
+Every cached catalog page is stored under the current catalog version.
+Writes to categories, subcategories, products or product images bump the
+version once their transaction commits, which orphans all cached pages at
+once; orphans simply expire with their timeout.
+
+Data that only depends on the taxonomy and on which products sit where
+(e.g. the category tree) is keyed on a separate taxonomy version, so price
+or stock updates don't rebuild it.
+
+With read replicas, a miss right after a bump could be filled from a
+replica that hasn't replayed the write yet, storing the old rows under the
+new version for the whole timeout. Fills therefore read from the primary
+for REPLICA_PIN_SECONDS after each bump (see fill_from_primary()).
+"""
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.views.decorators.cache import cache_page
+
+from shoplit.replicas import read_from_primary
+
+CATALOG = 'catalog'
+TAXONOMY = 'taxonomy'
+# Generation of the in-process name indexes (see products.indexes)
+NAME_INDEXES = 'name-indexes'
+
+
+def _version_key(namespace):
+    return f'{namespace}:version'
+
+
+def _initial_version():
+    # Seeded from the clock so a version evicted from the cache is never reused
+    return time.time_ns()
+
+
+def _bumped_key(namespace):
+    return f'{namespace}:bumped'
+
+
+def get_version(namespace=CATALOG):
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        version = _initial_version()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(namespace=CATALOG):
+    key = _version_key(namespace)
+    if settings.DATABASE_REPLICAS:
+        # Set before the new version is visible, so no fill can miss it
+        cache.set(_bumped_key(namespace), True, settings.REPLICA_PIN_SECONDS)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_version(), timeout=None)
+
+
+def fill_from_primary(*namespaces):
+    """
+    Context for the reads that fill a cache keyed on the versions of
+    ``namespaces``: they go to the primary while the replicas may still be
+    behind the last bump of one of them.
+    """
+    bumped = bool(settings.DATABASE_REPLICAS) and bool(
+        cache.get_many([_bumped_key(namespace) for namespace in namespaces])
+    )
+    return read_from_primary(bumped)
+
+
+def invalidate_catalog(using=None, taxonomy=False):
+    """
+    Bump the catalog version (and the taxonomy version when ``taxonomy``)
+    after the current transaction commits, so a concurrent reader can't
+    cache the old rows under the new version.
+    """
+    namespaces = [CATALOG, TAXONOMY] if taxonomy else [CATALOG]
+
+    def bump():
+        for namespace in namespaces:
+            bump_version(namespace)
+
+    transaction.on_commit(bump, using=using)
+
+
+def invalidate_name_indexes(using=None):
+    """
+    Make every process rebuild its name indexes once the transaction
+    commits; needed for deletions and bulk renames, which the indexes
+    can't pick up from updated_at.
+    """
+    transaction.on_commit(lambda: bump_version(NAME_INDEXES), using=using)
+
+
+def cache_catalog_page(timeout=None):
+    """
+    Like cache_page, but keyed on the current catalog version and filled
+    from the primary right after a bump.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            key_prefix = f'{CATALOG}.{get_version(CATALOG)}'
+            page_timeout = timeout if timeout is not None else settings.CATALOG_CACHE_TIMEOUT
+            with fill_from_primary(CATALOG):
+                return cache_page(page_timeout, key_prefix=key_prefix)(view_func)(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,140 @@
+"""
+ETag / Last-Modified support for catalog resources.
+
+Validators come from one aggregate query over ``updated_at`` of the rows a
+list or detail response would render, and of the related rows it nests
+(e.g. ?expand=category), so a 304 is answered without loading or
+serializing anything. They are cached under the catalog version like the
+pages themselves (see products.cache), so a repeated request, whether it
+ends in a 304 or a cached page, doesn't query the database at all.
+
+Only single rows without nested relations get a Last-Modified: deletions
+and rows leaving a filtered list don't move any updated_at, so lists are
+validated by the ETag alone, which folds in the row counts.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .cache import CATALOG, fill_from_primary, get_version
+from .sparse import QueryPlan, plan_serializer
+
+
+def related_paths(plan, prefix=''):
+    """
+    (path, model) of every relation ``plan`` joins or prefetches, nested ones included.
+    """
+    for name, related in [*plan.joins.items(), *plan.prefetches.items()]:
+        path = f'{prefix}{name}'
+        yield path, related.model
+        yield from related_paths(related, f'{path}__')
+
+
+def get_aggregates(view, model):
+    """
+    Aggregates whose values change whenever the response would: the last
+    updated_at and the row count of the rows themselves and of each nested
+    relation that has an updated_at.
+    """
+    aggregates = {}
+    plan = plan_serializer(view.get_serializer(), QueryPlan(model))
+    for number, (path, related) in enumerate(related_paths(plan)):
+        if any(field.name == 'updated_at' for field in related._meta.concrete_fields):
+            aggregates[f'related_{number}_last_modified'] = Max(f'{path}__updated_at')
+            # Counts catch related rows being removed or swapped for older ones
+            aggregates[f'related_{number}_count'] = Count(path, distinct=True)
+    # Distinct once to-many joins repeat the rows
+    aggregates['last_modified'] = Max('updated_at')
+    aggregates['count'] = Count('pk', distinct=bool(aggregates))
+    return aggregates
+
+
+def get_validators(view, request, kwargs):
+    """
+    Returns ``(etag, last_modified)`` for the current request, or None when
+    the request can't be validated up front (e.g. a malformed pk).
+    ``last_modified`` is None unless the response is a single row without
+    nested relations.
+    """
+    queryset = view.filter_queryset(view.get_queryset())
+    lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+    detail = lookup_url_kwarg in kwargs
+    if detail:
+        queryset = queryset.filter(**{view.lookup_field: kwargs[lookup_url_kwarg]})
+
+    aggregates = get_aggregates(view, queryset.model)
+    try:
+        stats = queryset.order_by().aggregate(**aggregates)
+    except (DjangoValidationError, ValueError):
+        return None
+
+    # Removing a row from a list, or a related row from a nested list, never
+    # raises max(updated_at), so only the ETag can validate those responses
+    last_modified = stats['last_modified'] if detail and len(aggregates) == 2 else None
+    # The row counts catch deletions, which never raise max(updated_at)
+    fingerprint = '|'.join([
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        *(value.isoformat() if hasattr(value, 'isoformat') else str(value) for _, value in sorted(stats.items())),
+    ])
+    etag = quote_etag(hashlib.sha1(fingerprint.encode()).hexdigest())
+    return etag, last_modified and int(last_modified.timestamp())
+
+
+def get_cached_validators(view, request, kwargs):
+    """
+    get_validators(), cached under the current catalog version.
+    """
+    # Read before the aggregate runs, so a write committing meanwhile orphans the result
+    version = get_version(CATALOG)
+    request_key = '|'.join([request.get_full_path(), request.META.get('HTTP_ACCEPT', '')])
+    key = f'{CATALOG}.{version}.validators.{hashlib.sha1(request_key.encode()).hexdigest()}'
+
+    validators = cache.get(key)
+    if validators is None:
+        with fill_from_primary(CATALOG):
+            validators = get_validators(view, request, kwargs)
+        if validators is not None:
+            cache.set(key, validators, settings.CATALOG_CACHE_TIMEOUT)
+    return validators
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def conditional_on_updated_at(view_method):
+    """
+    Answer conditional GETs on a list/retrieve viewset action with 304 Not Modified
+    before the action runs, and add ETag/Last-Modified to its fresh responses.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        validators = get_cached_validators(self, request, kwargs)
+        if validators is None:
+            return view_method(self, request, *args, **kwargs)
+
+        etag, last_modified = validators
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified,
+            response=set_validators(HttpResponse(), etag, last_modified),
+        )
+        if not_modified.status_code != 200:
+            return not_modified
+
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validators(response, etag, last_modified)
+        return response
+    return wrapper
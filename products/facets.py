@@ -0,0 +1,115 @@
+"""
+Facet counts for the product listing.
+
+All counts for one filter set come from three grouped queries (category,
+subcategory, price buckets) and are cached under the catalog version, keyed
+on the normalized filters so equivalent query strings share an entry.
+"""
+import hashlib
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Model, Q
+
+from .cache import CATALOG, fill_from_primary, get_version
+from .search import search_products
+
+# Lower bounds of the price buckets; the last bucket is open-ended
+PRICE_BUCKETS = (0, 25, 50, 100, 250, 500, 1000)
+
+SEARCH_PARAM = 'search'
+
+
+def normalize_filters(filterset, search=''):
+    """
+    The cleaned filter values that actually narrow the queryset, as a sorted
+    list of pairs, so '?a=1&b=2', '?b=2&a=1.00' and '?a=1&b=2&c=' collapse.
+    """
+    filters = sorted(
+        (name, _normalize_value(value))
+        for name, value in filterset.form.cleaned_data.items()
+        if value not in (None, '')
+    )
+    search = ' '.join(search.split())
+    if search:
+        filters.append((SEARCH_PARAM, search))
+    return filters
+
+
+def _normalize_value(value):
+    if isinstance(value, Model):
+        return str(value.pk)
+    if isinstance(value, Decimal):
+        return str(value.normalize())
+    return str(value)
+
+
+def get_price_buckets():
+    bounds = list(PRICE_BUCKETS) + [None]
+    return list(zip(bounds, bounds[1:]))
+
+
+def bucket_label(low, high):
+    return f'{low}-{high}' if high is not None else f'{low}+'
+
+
+def build_facets(queryset):
+    queryset = queryset.order_by()
+
+    categories = list(
+        queryset.filter(category__isnull=False)
+        .values('category_id', 'category__name')
+        .annotate(count=Count('pk'))
+        .order_by('category__name')
+    )
+    subcategories = list(
+        queryset.filter(subcategory__isnull=False)
+        .values('subcategory_id', 'subcategory__name')
+        .annotate(count=Count('pk'))
+        .order_by('subcategory__name')
+    )
+
+    buckets = get_price_buckets()
+    price_counts = queryset.aggregate(**{
+        bucket_label(low, high): Count(
+            'pk', filter=Q(price__gte=low) & (Q(price__lt=high) if high is not None else Q())
+        )
+        for low, high in buckets
+    })
+
+    return {
+        'categories': [
+            {'id': row['category_id'], 'name': row['category__name'], 'count': row['count']}
+            for row in categories
+        ],
+        'subcategories': [
+            {'id': row['subcategory_id'], 'name': row['subcategory__name'], 'count': row['count']}
+            for row in subcategories
+        ],
+        'price': [
+            {'min': low, 'max': high, 'count': price_counts[bucket_label(low, high)]}
+            for low, high in buckets
+        ],
+    }
+
+
+def get_facets(filterset, search=''):
+    """
+    Facet counts for a bound, valid ProductFilterSet plus an optional search.
+    """
+    filters = normalize_filters(filterset, search)
+    digest = hashlib.sha1(json.dumps(filters).encode()).hexdigest()
+    key = f'product-facets:{get_version(CATALOG)}:{digest}'
+
+    facets = cache.get(key)
+    if facets is None:
+        with fill_from_primary(CATALOG):
+            # Same order as the list: search, then the filters, ?fuzzy= last
+            queryset = filterset.queryset
+            if search:
+                queryset = search_products(queryset, search, rank=False)
+            facets = build_facets(filterset.filter_queryset(queryset))
+        cache.set(key, facets, settings.CATALOG_CACHE_TIMEOUT)
+    return facets
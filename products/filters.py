@@ -1,7 +1,15 @@
-from django_filters.rest_framework import FilterSet
+from django_filters.rest_framework import FilterSet, CharFilter
+from rest_framework.filters import SearchFilter
 from .models import Product
+from .search import search_products
+from .fuzzy import fuzzy_search
+
 
 class ProductFilterSet(FilterSet):
+    name__search = CharFilter(field_name='name', method='filter_full_text')
+    description__search = CharFilter(field_name='description', method='filter_full_text')
+    fuzzy = CharFilter(method='filter_fuzzy')
+
     class Meta:
         model = Product
         fields = {
@@ -10,4 +18,40 @@ class ProductFilterSet(FilterSet):
             'price': ['gte', 'lte'],
             'name': ['icontains'],
             'description': ['icontains'],
-        }
\ No newline at end of file
+        }
+
+    def filter_full_text(self, queryset, name, value):
+        """
+        Matches the words of ``value``, as prefixes, against the full-text index
+        of one column. The *__icontains filters keep matching any substring.
+        """
+        return search_products(queryset, value, field=name, rank=False)
+
+    def filter_queryset(self, queryset):
+        """
+        Applies ?fuzzy= after every other filter: it keeps only the best
+        MAX_CANDIDATES matches, so it must rank among the products the other
+        filters (and ?search=, applied before the filterset) already allow.
+        """
+        data = self.form.cleaned_data
+        for name, value in data.items():
+            if name != 'fuzzy':
+                queryset = self.filters[name].filter(queryset, value)
+        return self.filters['fuzzy'].filter(queryset, data.get('fuzzy'))
+
+    def filter_fuzzy(self, queryset, name, value):
+        """
+        Typo-tolerant name match, ranked by trigram similarity.
+        """
+        return fuzzy_search(queryset, value)
+
+
+class ProductSearchFilter(SearchFilter):
+    """
+    Relevance-ranked full-text search over product name and description.
+    An explicit ?ordering= still takes precedence over relevance.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        return search_products(queryset, query)
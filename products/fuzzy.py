@@ -0,0 +1,161 @@
+"""
+Typo-tolerant product name search based on trigram similarity.
+
+Names are compared with word similarity, i.e. how much of the query shows
+up in the name, so "labtop" finds "Gaming Laptop" although the names as a
+whole are far apart.
+
+Postgres uses pg_trgm: the ``<%`` operator is served by the GIN trigram index
+created by products.search.ensure_search_index and results are ranked by
+word_similarity(). Other databases use an in-process inverted index from
+trigram to product ids, so a lookup reads postings instead of scanning
+products and the database only sees a primary-key filter.
+
+Trigrams follow pg_trgm: each lower-cased word is padded with two spaces in
+front and one behind. In-process, word similarity is approximated by the
+share of the query's trigrams found in the name.
+"""
+import re
+from collections import Counter
+
+from django.db import connections
+from django.db.models import BooleanField, Case, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+
+from .indexes import SyncedNameIndex, PRODUCT
+
+# Lower than pg_trgm's 0.6 default so one wrong letter in a short word still
+# matches; Postgres connections are configured with it in products.signals
+WORD_SIMILARITY_THRESHOLD = 0.5
+# Most similar products handed to the database per query, and ranked per search
+MAX_CANDIDATES = 1000
+
+
+def trigrams(text):
+    grams = set()
+    for word in re.findall(r'[^\W_]+', text.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(shared, left, right):
+    return shared / (left + right - shared) if shared else 0.0
+
+
+def configure_connection(connection):
+    """
+    Apply WORD_SIMILARITY_THRESHOLD to the ``<%`` operator on a Postgres connection.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SET pg_trgm.word_similarity_threshold = %s", [WORD_SIMILARITY_THRESHOLD])
+
+
+class TrigramIndex(SyncedNameIndex):
+    """
+    Trigram postings over product names, active or not: product filters
+    like is_active are applied by the database afterwards.
+    """
+    kinds = (PRODUCT,)
+
+    def __init__(self):
+        super().__init__()
+        self.postings = {}
+        self.grams = {}
+
+    def is_visible(self, kind, is_active):
+        return True
+
+    def load(self, rows):
+        postings, grams_by_pk = {}, {}
+        for _, pk, name in rows:
+            grams = grams_by_pk[pk] = frozenset(trigrams(name))
+            for gram in grams:
+                postings.setdefault(gram, set()).add(pk)
+        self.postings, self.grams = postings, grams_by_pk
+
+    def add(self, kind, pk, name):
+        self.remove(kind, pk)
+        grams = self.grams[pk] = frozenset(trigrams(name))
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(pk)
+
+    def remove(self, kind, pk):
+        for gram in self.grams.pop(pk, ()):
+            postings = self.postings[gram]
+            postings.discard(pk)
+            if not postings:
+                del self.postings[gram]
+
+    def search(self, query, threshold=WORD_SIMILARITY_THRESHOLD, limit=MAX_CANDIDATES):
+        """
+        [(pk, score)] of the names most similar to ``query``, best first, at
+        most ``limit`` of them (all with None). Names sharing the same part of
+        the query rank by overall similarity.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        self.sync()
+        with self.lock:
+            shared = Counter()
+            for gram in grams:
+                shared.update(self.postings.get(gram, ()))
+            matches = [
+                (pk, count / len(grams) + similarity(count, len(grams), len(self.grams[pk])) / 10)
+                for pk, count in shared.items()
+                if count / len(grams) >= threshold
+            ]
+
+        matches.sort(key=lambda match: (-match[1], str(match[0])))
+        return matches if limit is None else matches[:limit]
+
+
+trigram_index = TrigramIndex()
+
+
+def filter_matches(queryset, matches):
+    """
+    The best MAX_CANDIDATES of ``matches`` that pass the filters of
+    ``queryset``. Matches are checked against the database in ranked
+    batches of MAX_CANDIDATES, so a filtered search still finds products
+    ranked outside the overall top, and stops once enough passed.
+    """
+    if len(matches) <= MAX_CANDIDATES:
+        return matches
+    allowed = set()
+    for start in range(0, len(matches), MAX_CANDIDATES):
+        batch = [pk for pk, _ in matches[start:start + MAX_CANDIDATES]]
+        allowed.update(queryset.filter(pk__in=batch).order_by().values_list('pk', flat=True))
+        if len(allowed) >= MAX_CANDIDATES:
+            break
+    return [match for match in matches if match[0] in allowed][:MAX_CANDIDATES]
+
+
+def fuzzy_search(queryset, query):
+    """
+    Products whose name is similar to ``query``, annotated with
+    ``fuzzy_rank`` and ordered by it.
+    """
+    if not trigrams(query):
+        return queryset
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        table = queryset.model._meta.db_table
+        queryset = queryset.filter(RawSQL(
+            f"%s <%% {table}.name", (query,), output_field=BooleanField(),
+        )).annotate(fuzzy_rank=RawSQL(
+            f"word_similarity(%s, {table}.name) + similarity(%s, {table}.name) / 10",
+            (query, query), output_field=FloatField(),
+        ))
+    else:
+        matches = filter_matches(queryset, trigram_index.search(query, limit=None))
+        if not matches:
+            return queryset.none()
+        queryset = queryset.filter(pk__in=[pk for pk, _ in matches]).annotate(fuzzy_rank=Case(
+            *[When(pk=pk, then=Value(score)) for pk, score in matches],
+            default=Value(0.0), output_field=FloatField(),
+        ))
+    return queryset.order_by('-fuzzy_rank', 'pk')
@@ -0,0 +1,229 @@
+"""
+Reproducible synthetic data for load tests and benchmarks.
+
+The taxonomy is resolved once, then every model is generated in batches and
+written with bulk_create. All randomness, including primary keys, comes from
+one seeded ``random.Random``, so the same seed produces the same dataset.
+Faker is only used to fill small word pools up front; per-row values are
+drawn from those pools, which keeps generation cheap at millions of rows.
+
+Bulk writes skip model signals: order notifications are not sent and
+product ratings are refreshed with one statement after reviews are written.
+Running the same seed twice against one database collides on primary keys,
+so use a fresh database or a different seed.
+"""
+import random
+import uuid
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from faker import Faker
+
+from carts.models import Cart, CartItem
+from orders.models import Order, OrderItem
+from reviews.models import Review
+from reviews.utils import refresh_product_ratings
+
+from .models import Category, SubCategory, Product
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_PASSWORD = 'loadtest'
+POOL_SIZE = 500
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class CatalogGenerator:
+    """
+    Generates categories, products, users, reviews, carts and orders.
+    Each ``generate_*`` method returns the number of rows it created.
+    """
+
+    def __init__(self, seed=0, batch_size=DEFAULT_BATCH_SIZE, log=None):
+        self.seed = seed
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.log = log or (lambda message: None)
+
+        fake = Faker()
+        fake.seed_instance(seed)
+        self.words = [word.capitalize() for word in fake.words(POOL_SIZE)]
+        self.descriptions = [fake.text(max_nb_chars=200) for _ in range(POOL_SIZE // 5)]
+        self.first_names = [fake.first_name() for _ in range(POOL_SIZE // 5)]
+        self.last_names = [fake.last_name() for _ in range(POOL_SIZE // 5)]
+
+        self.products = []
+        self.users = []
+
+    def uuid(self):
+        return uuid.UUID(int=self.random.getrandbits(128), version=4)
+
+    def price(self):
+        return Decimal(self.random.randint(1000, 100000)) / 100
+
+    def resolve_taxonomy(self, taxonomy):
+        """
+        Create whatever part of ``taxonomy`` ({category: [subcategory, ...]})
+        is missing, then return {(category, subcategory): (subcategory_id, category_id)}
+        for all of it. Uses a fixed number of queries regardless of its size.
+        """
+        Category.objects.bulk_create(
+            [Category(id=self.uuid(), name=name) for name in taxonomy], ignore_conflicts=True
+        )
+        categories = dict(Category.objects.filter(name__in=taxonomy).values_list('name', 'id'))
+
+        SubCategory.objects.bulk_create([
+            SubCategory(id=self.uuid(), name=name, category_id=categories[category])
+            for category, names in taxonomy.items()
+            for name in names
+        ], ignore_conflicts=True)
+
+        resolved = {
+            (category, name): (subcategory_id, category_id)
+            for subcategory_id, name, category_id, category in SubCategory.objects.filter(
+                category__name__in=taxonomy
+            ).values_list('id', 'name', 'category_id', 'category__name')
+        }
+        self.log(f"Resolved {len(categories)} categories and {len(resolved)} subcategories")
+        return resolved
+
+    def generate_products(self, taxonomy, per_subcategory):
+        """
+        ``per_subcategory`` products in every subcategory of ``taxonomy``.
+        The running number in each name keeps (name, subcategory) unique.
+        """
+        resolved = self.resolve_taxonomy(taxonomy)
+        subcategories = [resolved[key] for key in sorted(resolved)]
+
+        def rows():
+            for number in range(per_subcategory):
+                for subcategory_id, category_id in subcategories:
+                    adjective, noun = self.random.choices(self.words, k=2)
+                    yield Product(
+                        id=self.uuid(),
+                        name=f'{adjective} {noun} {self.seed}-{number}',
+                        description=self.random.choice(self.descriptions),
+                        price=self.price(),
+                        stock_quantity=self.random.randint(1, 100),
+                        category_id=category_id,
+                        subcategory_id=subcategory_id,
+                    )
+
+        created = 0
+        for batch in batched(rows(), self.batch_size):
+            with transaction.atomic():
+                Product.objects.bulk_create(batch)
+            self.products.extend((product.id, product.price) for product in batch)
+            created += len(batch)
+            self.log(f"Created {created} products")
+        return created
+
+    def load_products(self):
+        """
+        Use the products already in the database for reviews, carts and orders.
+        """
+        self.products = list(Product.objects.order_by('pk').values_list('pk', 'price'))
+        return len(self.products)
+
+    def generate_users(self, count):
+        User = get_user_model()
+        # Hashing is deliberately slow, so every generated user shares one hash
+        password = make_password(DEFAULT_PASSWORD, salt=f'loadtest{self.seed}')
+
+        def rows():
+            for number in range(count):
+                yield User(
+                    id=self.uuid(),
+                    email=f'user{number}.{self.seed}@loadtest.example.com',
+                    first_name=self.random.choice(self.first_names),
+                    last_name=self.random.choice(self.last_names),
+                    password=password,
+                )
+
+        created = 0
+        for batch in batched(rows(), self.batch_size):
+            with transaction.atomic():
+                User.objects.bulk_create(batch)
+            self.users.extend(user.id for user in batch)
+            created += len(batch)
+            self.log(f"Created {created} users")
+        return created
+
+    def sample_products(self, count):
+        """
+        Up to ``count`` distinct (id, price) pairs.
+        """
+        return self.random.sample(self.products, min(count, len(self.products)))
+
+    def generate_reviews(self, per_user):
+        def rows():
+            for user_id in self.users:
+                for product_id, _ in self.sample_products(self.random.randint(0, per_user)):
+                    yield Review(
+                        id=self.uuid(),
+                        user_id=user_id,
+                        product_id=product_id,
+                        title=' '.join(self.random.choices(self.words, k=3)),
+                        body=self.random.choice(self.descriptions),
+                        rating=self.random.randint(1, 5),
+                    )
+
+        created = 0
+        for batch in batched(rows(), self.batch_size):
+            with transaction.atomic():
+                Review.objects.bulk_create(batch)
+            created += len(batch)
+            self.log(f"Created {created} reviews")
+
+        if created:
+            refresh_product_ratings()
+        return created
+
+    def generate_carts(self, max_items):
+        created = 0
+        for users in batched(self.users, self.batch_size):
+            carts = [Cart(id=self.uuid(), user_id=user_id) for user_id in users]
+            items = [
+                CartItem(id=self.uuid(), cart=cart, product_id=product_id, quantity=self.random.randint(1, 5))
+                for cart in carts
+                for product_id, _ in self.sample_products(self.random.randint(0, max_items))
+            ]
+            with transaction.atomic():
+                Cart.objects.bulk_create(carts)
+                CartItem.objects.bulk_create(items, batch_size=self.batch_size)
+            created += len(carts)
+            self.log(f"Created {created} carts")
+        return created
+
+    def generate_orders(self, per_user, max_items=5):
+        statuses = [status for status, _ in Order.STATUS_CHOICES]
+
+        def rows():
+            for user_id in self.users:
+                for _ in range(self.random.randint(0, per_user)):
+                    order = Order(id=self.uuid(), user_id=user_id, status=self.random.choice(statuses))
+                    items = [
+                        OrderItem(id=self.uuid(), order=order, product_id=product_id,
+                                  quantity=self.random.randint(1, 3), price=price)
+                        for product_id, price in self.sample_products(self.random.randint(1, max_items))
+                    ]
+                    order.set_totals(items)
+                    yield order, items
+
+        created = 0
+        for batch in batched(rows(), self.batch_size):
+            with transaction.atomic():
+                Order.objects.bulk_create([order for order, _ in batch])
+                OrderItem.objects.bulk_create(
+                    [item for _, items in batch for item in items], batch_size=self.batch_size
+                )
+            created += len(batch)
+            self.log(f"Created {created} orders")
+        return created
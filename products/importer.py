@@ -0,0 +1,253 @@
+"""
+Streaming bulk import of products from CSV or JSON Lines.
+
+Rows are read lazily and handled in chunks of ``batch_size``: each chunk is
+validated, its subcategories are resolved from a map loaded once up front,
+and it is written with one bulk_create and one bulk_update inside its own
+transaction. Memory use depends on the batch size, not the file size.
+
+Products are matched on (name, subcategory), the model's natural key:
+existing rows are updated in place, new rows are created. Images listed for
+an existing product are added to it unless it already has them.
+"""
+import csv
+import json
+import uuid
+from decimal import Decimal
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import SubCategory, Product, ProductImage
+
+FORMATS = ('csv', 'jsonl')
+UPDATE_FIELDS = ['description', 'price', 'stock_quantity', 'is_active', 'updated_at']
+DEFAULT_BATCH_SIZE = 1000
+# Only the first errors are kept so a bad file can't grow the report unbounded
+MAX_REPORTED_ERRORS = 100
+
+
+class ProductImportRowSerializer(serializers.Serializer):
+    """
+    One input row. ``subcategory`` is a subcategory id or name; ``category``
+    (a name) disambiguates subcategory names used in several categories.
+    """
+    name = serializers.CharField(max_length=255)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True, default='')
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0'))
+    stock_quantity = serializers.IntegerField(min_value=0, required=False, default=0)
+    subcategory = serializers.CharField()
+    category = serializers.CharField(required=False, allow_blank=True, default='')
+    is_active = serializers.BooleanField(required=False, default=True)
+    images = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+
+    def to_internal_value(self, data):
+        # CSV has no lists and no nulls: images are '|'-separated, empty cells are omitted
+        data = {key: value for key, value in data.items() if key and value not in ('', None)}
+        if isinstance(data.get('images'), str):
+            data['images'] = [image.strip() for image in data['images'].split('|') if image.strip()]
+        return super().to_internal_value(data)
+
+
+class SubCategoryMap:
+    """
+    Every subcategory keyed by id, by (category name, name) and by name alone,
+    loaded in one query. Names shared across categories need a category.
+    """
+
+    def __init__(self):
+        self.by_id = {}
+        self.by_name = {}
+        self.by_category_and_name = {}
+        for subcategory in SubCategory.objects.values('id', 'name', 'category_id', 'category__name'):
+            entry = (subcategory['id'], subcategory['category_id'])
+            name = subcategory['name'].casefold()
+            self.by_id[subcategory['id']] = entry
+            self.by_category_and_name[(subcategory['category__name'].casefold(), name)] = entry
+            self.by_name.setdefault(name, []).append(entry)
+
+    def resolve(self, subcategory, category=''):
+        """
+        Returns (subcategory_id, category_id) or raises ValidationError.
+        """
+        try:
+            pk = uuid.UUID(subcategory.strip())
+        except ValueError:
+            pk = None
+        if pk in self.by_id:
+            return self.by_id[pk]
+        name = subcategory.strip().casefold()
+        if category:
+            entry = self.by_category_and_name.get((category.strip().casefold(), name))
+            if entry:
+                return entry
+            raise serializers.ValidationError({'subcategory': f"No subcategory '{subcategory}' in category '{category}'."})
+        matches = self.by_name.get(name, [])
+        if len(matches) == 1:
+            return matches[0]
+        if matches:
+            raise serializers.ValidationError(
+                {'subcategory': f"Subcategory '{subcategory}' exists in several categories; add a category column."}
+            )
+        raise serializers.ValidationError({'subcategory': f"Unknown subcategory '{subcategory}'."})
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, row_number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'failed': self.failed,
+            'errors': self.errors,
+        }
+
+
+def read_rows(stream, format):
+    """
+    Yields (row_number, row dict) from a text stream. Row numbers are the
+    line numbers in the file (the CSV header is line 1).
+    """
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif format == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, serializers.ValidationError(f"Invalid JSON: {e}")
+                continue
+            if not isinstance(row, dict):
+                row = serializers.ValidationError("Expected a JSON object.")
+            yield line_number, row
+    else:
+        raise ValueError(f"Unsupported import format '{format}', expected one of {', '.join(FORMATS)}.")
+
+
+def get_format(filename, default='csv'):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension == 'json':
+        extension = 'jsonl'
+    return extension if extension in FORMATS else default
+
+
+def import_products(stream, format='csv', batch_size=DEFAULT_BATCH_SIZE, vendor=None):
+    """
+    Create or update products from a CSV/JSONL text stream. Invalid rows are
+    skipped and reported; valid rows are written in batches of ``batch_size``.
+    """
+    subcategories = SubCategoryMap()
+    report = ImportReport()
+    rows = read_rows(stream, format)
+
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+        _import_chunk(chunk, subcategories, report, vendor)
+
+    return report
+
+
+def _import_chunk(chunk, subcategories, report, vendor):
+    # Later rows for the same product win, as if the file were applied row by row
+    products = {}
+    images = {}
+    for row_number, row in chunk:
+        try:
+            if isinstance(row, serializers.ValidationError):
+                raise row
+            serializer = ProductImportRowSerializer(data=row)
+            serializer.is_valid(raise_exception=True)
+            data = serializer.validated_data
+            subcategory_id, category_id = subcategories.resolve(data['subcategory'], data['category'])
+        except serializers.ValidationError as e:
+            report.add_error(row_number, e.detail)
+            continue
+
+        key = (data['name'], subcategory_id)
+        products[key] = Product(
+            name=data['name'],
+            description=data['description'] or '',
+            price=data['price'],
+            stock_quantity=data['stock_quantity'],
+            is_active=data['is_active'],
+            subcategory_id=subcategory_id,
+            category_id=category_id,
+            vendor=vendor,
+        )
+        images[key] = data['images']
+
+    if not products:
+        return
+
+    existing = {
+        (name, subcategory_id): pk
+        for pk, name, subcategory_id in Product.objects.filter(
+            name__in={name for name, _ in products},
+            subcategory_id__in={subcategory_id for _, subcategory_id in products},
+        ).values_list('pk', 'name', 'subcategory_id')
+    }
+
+    now = timezone.now()
+    to_create, to_update = [], []
+    for key, product in products.items():
+        if key in existing:
+            product.pk = existing[key]
+            product.updated_at = now
+            to_update.append(product)
+        else:
+            to_create.append(product)
+
+    with transaction.atomic():
+        Product.objects.bulk_create(to_create)
+        if to_update:
+            Product.objects.bulk_update(to_update, UPDATE_FIELDS)
+        ProductImage.objects.bulk_create(_new_images(to_create, to_update, images))
+
+    report.created += len(to_create)
+    report.updated += len(to_update)
+
+
+def _new_images(created, updated, images):
+    """
+    ProductImages for the images listed in the rows, skipping the ones an
+    updated product already has; one query for all updated products.
+    """
+    field = ProductImage._meta.get_field('image')
+
+    def stored(image):
+        # Loaded images are resources, listed ones strings; compare them as the field stores them
+        return field.get_prep_value(field.to_python(image))
+
+    updated = [product for product in updated if images[(product.name, product.subcategory_id)]]
+    present = set()
+    if updated:
+        present = {
+            (product_id, stored(image))
+            for product_id, image in ProductImage.objects.filter(
+                product_id__in=[product.pk for product in updated],
+            ).values_list('product_id', 'image')
+        }
+    return [
+        ProductImage(product=product, image=image)
+        for product in [*created, *updated]
+        for image in dict.fromkeys(images[(product.name, product.subcategory_id)])
+        if (product.pk, stored(image)) not in present
+    ]
@@ -0,0 +1,127 @@
+"""
+Base class for the in-process indexes over product, category and
+subcategory names (see products.suggest and products.fuzzy).
+
+An index is built lazily per process and kept current incrementally:
+- saves in this process are applied by products.signals once they commit;
+- rows written elsewhere (other workers, bulk writes) are picked up every
+  NAME_INDEX_SYNC_INTERVAL seconds by a delta query on updated_at;
+- deletions and bulk renames bump a shared version in the cache (see
+  products.cache.invalidate_name_indexes), and a process that sees a new
+  version rebuilds its indexes.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .cache import NAME_INDEXES, fill_from_primary, get_version
+from .models import Category, SubCategory, Product
+
+PRODUCT, CATEGORY, SUBCATEGORY = 'product', 'category', 'subcategory'
+# Rows committed slightly after their updated_at are still caught by the next sync
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def get_sync_interval():
+    return getattr(settings, 'NAME_INDEX_SYNC_INTERVAL', 5)
+
+
+class SyncedNameIndex(ABC):
+    """
+    Subclasses pick the ``kinds`` of rows they index and implement
+    ``load`` (bulk build from rows), ``add`` and ``remove``.
+    """
+    kinds = (CATEGORY, SUBCATEGORY, PRODUCT)
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.version = None
+        self.synced_at = None
+        self.checked_at = 0.0
+
+    @abstractmethod
+    def load(self, rows):
+        """
+        Replace the index with ``rows``, (kind, pk, name) tuples.
+        """
+
+    @abstractmethod
+    def add(self, kind, pk, name):
+        """
+        Index one row, replacing an earlier name for ``pk``.
+        """
+
+    @abstractmethod
+    def remove(self, kind, pk):
+        """
+        Drop ``pk`` from the index; unknown pks are ignored.
+        """
+
+    def is_visible(self, kind, is_active):
+        return is_active
+
+    def rows(self, since=None):
+        """
+        (kind, pk, name, is_active) for every indexed row, or those updated since ``since``.
+        """
+        sources = {
+            CATEGORY: Category.objects.all(),
+            SUBCATEGORY: SubCategory.objects.all(),
+            PRODUCT: Product.objects.all(),
+        }
+        for kind in self.kinds:
+            queryset = sources[kind]
+            if since is not None:
+                queryset = queryset.filter(updated_at__gte=since)
+            fields = ['pk', 'name'] + (['is_active'] if kind == PRODUCT else [])
+            for row in queryset.values_list(*fields).iterator(chunk_size=5000):
+                yield kind, row[0], row[1], row[2] if kind == PRODUCT else True
+
+    def apply(self, kind, pk, name, is_active):
+        if self.is_visible(kind, is_active):
+            self.add(kind, pk, name)
+        else:
+            self.remove(kind, pk)
+
+    def rebuild(self):
+        with self.lock:
+            version = get_version(NAME_INDEXES)
+            synced_at = timezone.now()
+            # A replica behind a deletion would bring the deleted names back
+            with fill_from_primary(NAME_INDEXES):
+                self.load(
+                    (kind, pk, name) for kind, pk, name, is_active in self.rows()
+                    if self.is_visible(kind, is_active)
+                )
+            self.version, self.synced_at, self.checked_at = version, synced_at, time.monotonic()
+
+    def sync(self):
+        """
+        Bring the index up to date: rebuild it when it was never built or
+        something was deleted, otherwise apply rows changed since the last sync.
+        Cheap to call on every lookup, it only queries every few seconds.
+        """
+        with self.lock:
+            if self.version is None or get_version(NAME_INDEXES) != self.version:
+                self.rebuild()
+                return
+            if time.monotonic() - self.checked_at < get_sync_interval():
+                return
+            synced_at = timezone.now()
+            for row in self.rows(since=self.synced_at - SYNC_OVERLAP):
+                self.apply(*row)
+            self.synced_at, self.checked_at = synced_at, time.monotonic()
+
+    def update(self, kind, pk, name, is_active=True):
+        """
+        Apply one saved row. Does nothing until the index has been built.
+        """
+        if kind not in self.kinds:
+            return
+        with self.lock:
+            if self.version is not None:
+                self.apply(kind, pk, name, is_active)
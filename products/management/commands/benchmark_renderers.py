@@ -0,0 +1,41 @@
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from products.models import Product
+from products.serializers import ProductSerializer
+from shoplit.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = "Compare how fast the JSON renderers encode a product list page"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=100,
+                            help="Number of products rendered per run")
+        parser.add_argument("--repeat", type=int, default=50,
+                            help="Number of runs per renderer")
+
+    def handle(self, *args, **options):
+        limit, repeat = options.get("limit"), options.get("repeat")
+        if limit < 1 or repeat < 1:
+            raise CommandError("--limit and --repeat must be positive.")
+
+        products = Product.objects.for_catalog().order_by("pk")[:limit]
+        data = {"count": limit, "next": None, "previous": None,
+                "results": ProductSerializer(products, many=True).data}
+        if not data["results"]:
+            raise CommandError("No products to render, create some with manualcreate first.")
+
+        timings = {}
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            name = type(renderer).__name__
+            size = len(renderer.render(data))
+            timings[name] = min(timeit.repeat(lambda: renderer.render(data), number=1, repeat=repeat))
+            self.stdout.write(f"{name}: {timings[name] * 1000:.3f} ms per page of "
+                              f"{len(data['results'])} products ({size} bytes)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"ORJSONRenderer is {timings['JSONRenderer'] / timings['ORJSONRenderer']:.1f}x faster"
+        ))
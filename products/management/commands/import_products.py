@@ -0,0 +1,38 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.importer import import_products, get_format, DEFAULT_BATCH_SIZE, FORMATS
+
+
+class Command(BaseCommand):
+    help = "Create or update products from a CSV or JSON Lines file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin")
+        parser.add_argument("--format", choices=FORMATS,
+                            help="Input format (defaults to the file extension)")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                            help="Number of rows validated and written per batch")
+
+    def handle(self, *args, **options):
+        path = options.get("path")
+        format = options.get("format") or get_format(path)
+
+        if path == "-":
+            report = import_products(sys.stdin, format=format, batch_size=options.get("batch_size"))
+        else:
+            try:
+                with open(path, newline="", encoding="utf-8-sig") as stream:
+                    report = import_products(stream, format=format, batch_size=options.get("batch_size"))
+            except OSError as e:
+                raise CommandError(f"Could not read {path}: {e}")
+
+        for error in report.errors:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        if report.failed > len(report.errors):
+            self.stderr.write(f"... and {report.failed - len(report.errors)} more invalid rows")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported products: {report.created} created, {report.updated} updated, {report.failed} failed"
+        ))
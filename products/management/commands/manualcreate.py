@@ -1,22 +1,55 @@
 from django.core.management.base import BaseCommand, CommandError
-from products.models import Category, SubCategory, Product
+from django.db import IntegrityError
+
 from products import utils
+from products.generator import CatalogGenerator, DEFAULT_BATCH_SIZE
+
 
 class Command(BaseCommand):
-    help = "create new set of categories, subcategories, and products"
+    help = "Generate a reproducible synthetic dataset: taxonomy, products, users, reviews, carts and orders"
 
     def add_arguments(self, parser):
-        # parser.add_argument('num_categories', type=int, help='Number of categories')
-        # parser.add_argument('num_subcategories', type=int, help='Number of subcategories per category')
-        parser.add_argument('num_products', type=int, help='Number of products per subcategory')
+        parser.add_argument('num_products', type=int, nargs='?', default=1,
+                            help='Number of products per subcategory')
         parser.add_argument("--categories", action='store_true', default=False)
         parser.add_argument("--products", action='store_true', default=False)
+        parser.add_argument("--users", type=int, default=0, help="Number of users to create")
+        parser.add_argument("--reviews", type=int, default=0,
+                            help="Maximum number of reviews per generated user")
+        parser.add_argument("--cart-items", type=int, default=0,
+                            help="Maximum number of items in each generated user's cart (0 creates no carts)")
+        parser.add_argument("--orders", type=int, default=0,
+                            help="Maximum number of orders per generated user")
+        parser.add_argument("--seed", type=int, default=0,
+                            help="Random seed; the same seed always generates the same data")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                            help="Number of rows per bulk insert")
 
     def handle(self, *args, **options):
-        create_categories = options.get('categories')
-        create_products = options.get('products')
-        products = options.get('num_products')
-        if create_categories:
-            utils.generate_categories()
-        if create_products:
-            utils.generate_products(num=products)
\ No newline at end of file
+        generator = CatalogGenerator(
+            seed=options.get('seed'),
+            batch_size=options.get('batch_size'),
+            log=lambda message: self.stdout.write(message),
+        )
+        users = options.get('users')
+
+        try:
+            if options.get('categories'):
+                generator.resolve_taxonomy(utils.subcategories)
+            if options.get('products'):
+                generator.generate_products(utils.subcategories, options.get('num_products'))
+            elif users and (options.get('reviews') or options.get('cart_items') or options.get('orders')):
+                generator.load_products()
+
+            if users:
+                generator.generate_users(users)
+                if options.get('reviews'):
+                    generator.generate_reviews(options.get('reviews'))
+                if options.get('cart_items'):
+                    generator.generate_carts(options.get('cart_items'))
+                if options.get('orders'):
+                    generator.generate_orders(options.get('orders'))
+        except IntegrityError as e:
+            raise CommandError(f"Generated rows already exist ({e}); use a fresh database or another --seed.")
+
+        self.stdout.write(self.style.SUCCESS("Synthetic data generated"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from products.search import ensure_search_index, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Create the product full-text index if missing and repopulate it"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options.get("database")]
+        ensure_search_index(connection)
+        rebuild_search_index(connection)
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt on {connection.vendor}"))
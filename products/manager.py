@@ -0,0 +1,99 @@
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .cache import invalidate_catalog, invalidate_name_indexes
+
+
+class InsufficientStock(ValueError):
+    """
+    Raised when products don't have the quantities asked for.
+    ``shortages`` maps each short product's pk to the quantity in stock.
+    """
+
+    def __init__(self, shortages):
+        self.shortages = shortages
+        super().__init__("Insufficient stock")
+
+
+class ProductQuerySet(models.QuerySet):
+    """
+    Query helpers shared by every endpoint that renders products.
+
+    Bulk writes bypass model signals, so they invalidate the catalog cache
+    and the name indexes here.
+    """
+    ASSIGNMENT_FIELDS = {'category', 'category_id', 'subcategory', 'subcategory_id', 'is_active'}
+    NAME_INDEX_FIELDS = {'name', 'is_active'}
+
+    def for_catalog(self):
+        """
+        Load everything the product serializers render in a fixed number of queries:
+        category and subcategory are joined and images are prefetched in one query.
+        Rating aggregates are stored on the product row itself.
+        """
+        return self.select_related('category', 'subcategory').prefetch_related('images')
+
+    def bulk_create(self, *args, **kwargs):
+        objs = super().bulk_create(*args, **kwargs)
+        invalidate_catalog(using=self.db, taxonomy=True)
+        # No post_save reaches the name indexes, so new names would wait for the next sync
+        invalidate_name_indexes(using=self.db)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        invalidate_catalog(using=self.db, taxonomy=not self.ASSIGNMENT_FIELDS.isdisjoint(fields))
+        if not self.NAME_INDEX_FIELDS.isdisjoint(fields):
+            invalidate_name_indexes(using=self.db)
+        return rows
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        if rows:
+            invalidate_catalog(using=self.db, taxonomy=not self.ASSIGNMENT_FIELDS.isdisjoint(kwargs))
+            if not self.NAME_INDEX_FIELDS.isdisjoint(kwargs):
+                invalidate_name_indexes(using=self.db)
+        return rows
+
+    def _quantity_for(self, quantities):
+        return Case(
+            *[When(pk=pk, then=Value(quantity)) for pk, quantity in quantities.items()],
+            output_field=models.PositiveIntegerField(),
+        )
+
+    def reserve_stock(self, quantities):
+        """
+        Take ``quantities`` ({product pk: quantity}) out of stock with one
+        conditional UPDATE, all or nothing: a product with less in stock than
+        asked for is not touched, and then neither is any other. The check and
+        the decrement happen in the database, so concurrent orders can't
+        oversell. Raises InsufficientStock listing the short products.
+        """
+        quantities = {pk: quantity for pk, quantity in quantities.items() if quantity}
+        if not quantities:
+            return
+        quantity = self._quantity_for(quantities)
+        try:
+            with transaction.atomic(using=self.db):
+                reserved = self.filter(pk__in=quantities, stock_quantity__gte=quantity).update(
+                    stock_quantity=F('stock_quantity') - quantity, updated_at=timezone.now(),
+                )
+                if reserved != len(quantities):
+                    raise InsufficientStock({})
+        except InsufficientStock:
+            # Read after the rollback, so products that were decremented show their full stock again
+            in_stock = dict(self.filter(pk__in=quantities).values_list('pk', 'stock_quantity'))
+            raise InsufficientStock({
+                pk: in_stock.get(pk, 0) for pk, wanted in quantities.items() if in_stock.get(pk, 0) < wanted
+            })
+
+    def release_stock(self, quantities):
+        """
+        Put ``quantities`` ({product pk: quantity}) back in stock with one UPDATE.
+        """
+        quantities = {pk: quantity for pk, quantity in quantities.items() if quantity}
+        if quantities:
+            self.filter(pk__in=quantities).update(
+                stock_quantity=F('stock_quantity') + self._quantity_for(quantities), updated_at=timezone.now(),
+            )
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customuser', '0003_rename_phone_no_customuser_phone_number'),
+        ('products', '0006_product_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['updated_at'], name='products_pr_updated_150263_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customuser', '0003_rename_phone_no_customuser_phone_number'),
+        ('products', '0007_product_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='products_pr_price_9b1a5f_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='products_pr_created_52f0d7_idx',
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['price', 'id'], name='product_price_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['created_at', 'id'], name='product_created_keyset_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from customuser.models import Vendor
+from .manager import ProductQuerySet, InsufficientStock
 import uuid
 from cloudinary.models import CloudinaryField
 
@@ -56,48 +57,67 @@ class Product(models.Model):
         'SubCategory', on_delete=models.SET_NULL, null=True, blank=True, related_name='products'
     )
     is_active = models.BooleanField(default=True)
+    # Denormalized review aggregates, maintained by reviews.signals
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    average_rating = models.FloatField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    RATING_FIELDS = ('rating_sum', 'review_count', 'average_rating')
+
+    objects = ProductQuerySet.as_manager()
+
     class Meta:
         unique_together = ('name', 'subcategory')
         indexes = [ models.Index(fields=['name']), 
                    models.Index(fields=['category']), 
                    models.Index(fields=['subcategory']), 
-                   models.Index(fields=['price']), 
-                   models.Index(fields=['created_at']), ]
+                   # (field, id) keys of KeysetPagination, also serve plain price / created_at lookups
+                   models.Index(fields=['price', 'id'], name='product_price_keyset_idx'),
+                   models.Index(fields=['created_at', 'id'], name='product_created_keyset_idx'),
+                   models.Index(fields=['updated_at']), ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_assignment = instance.get_assignment()
+        return instance
+
+    def get_assignment(self):
+        """
+        Where the product shows up in the category tree, without loading deferred fields.
+        """
+        return tuple(self.__dict__.get(name) for name in ('category_id', 'subcategory_id', 'is_active'))
+
     def save(self, *args, **kwargs):
         """
         Automatically sets the category based on the subcategory before saving.
         """
         if self.subcategory and self.subcategory.category:
             self.category = self.subcategory.category
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Never write back rating aggregates loaded before a concurrent review
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.RATING_FIELDS
+            ]
         super().save(*args, **kwargs)
 
-    @property
-    def average_rating(self):
-        reviews = self.reviews.all()
-        if not reviews.exists():
-            return 0
-        return reviews.aggregate(models.Avg('rating'))['rating__avg']
-    
-    @property
-    def review_count(self):
-        return self.reviews.count()
-    
     def reduce_stock(self, quantity):
-        if quantity > self.stock_quantity:
-            raise ValueError("Insufficient stock")
-        self.stock_quantity -= quantity
-        self.save()
+        """
+        Take ``quantity`` out of stock atomically, see ProductQuerySet.reserve_stock.
+        Raises InsufficientStock, a ValueError, when there isn't enough.
+        """
+        Product.objects.reserve_stock({self.pk: quantity})
+        self.refresh_from_db(fields=['stock_quantity', 'updated_at'])
 
     def increase_stock(self, quantity):
-        self.stock_quantity += quantity
-        self.save()
+        Product.objects.release_stock({self.pk: quantity})
+        self.refresh_from_db(fields=['stock_quantity', 'updated_at'])
 
 class ProductImage(models.Model):
     product = models.ForeignKey(Product, related_name="images", on_delete=models.CASCADE)  # Establish one-to-many relationship
@@ -0,0 +1,117 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset pagination on a composite ``(field, pk)`` key.
+
+    Unlike CursorPagination, which keys on the first ordering field and skips
+    duplicates with an offset, every page here is a single range scan of the
+    composite ``(field, id)`` index, from
+    ``WHERE field >= last_field AND (field > last_field OR pk > last_pk)``.
+    The leading bound on ``field`` alone is what lets the planner start the
+    scan at the cursor instead of filtering the whole index. There is no COUNT(*) and no
+    OFFSET, so deep pages cost the same as the first one and rows inserted
+    while a client is paging never shift the pages it has not read yet.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering_param = 'ordering'
+    ordering_fields = ('created_at', 'price')
+    ordering = '-created_at'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = request.query_params.get(self.ordering_param) or self.ordering
+        if ordering.lstrip('-') not in self.ordering_fields:
+            raise ValidationError({
+                self.ordering_param: "Cursor pagination supports ordering by %s only." % ', '.join(
+                    f'{field}, -{field}' for field in self.ordering_fields
+                )
+            })
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.field = self.ordering.lstrip('-')
+        self.model = queryset.model
+
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor['reverse']
+
+        # Walking backwards flips the query direction; the page is flipped back below
+        descending = self.ordering.startswith('-') != reverse
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.field}', f'{prefix}pk')
+        if self.cursor is not None:
+            queryset = queryset.filter(self.get_position_filter(descending))
+
+        # Fetch one extra row to know whether another page follows
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_position_filter(self, descending):
+        lookup = 'lt' if descending else 'gt'
+        value, pk = self.cursor['value'], self.cursor['pk']
+        return Q(**{f'{self.field}__{lookup}e': value}) & (
+            Q(**{f'{self.field}__{lookup}': value}) | Q(**{f'pk__{lookup}': pk})
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse):
+        # The ordering is part of the cursor so a cursor can't be replayed against another key
+        value = getattr(instance, self.field)
+        payload = [self.ordering, value.isoformat() if hasattr(value, 'isoformat') else str(value),
+                   str(instance.pk), reverse]
+        encoded = urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            ordering, value, pk, reverse = json.loads(urlsafe_b64decode(encoded.encode()))
+            if ordering != self.ordering:
+                raise ValueError(ordering)
+            return {
+                'value': self.model._meta.get_field(self.field).to_python(value),
+                'pk': self.model._meta.pk.to_python(pk),
+                'reverse': bool(reverse),
+            }
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,188 @@
+"""
+Full-text product search.
+
+SQLite keeps an FTS5 table mirrored from products_product by triggers, and
+Postgres keeps a weighted, GIN-indexed tsvector generated column, plus a
+pg_trgm index on the name for fuzzy matching. Product ids are UUIDs and the
+implicit rowids of products_product may be renumbered by VACUUM, so FTS rows
+are keyed on the integer primary key of a small key table (product id ->
+FTS rowid); every trigger and ranking lookup is then a rowid lookup. Both are
+created by ensure_search_index() after every migrate, so they follow the
+product table through inserts, bulk imports, updates and deletes.
+Other databases fall back to icontains lookups.
+"""
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'products_product_fts'
+FTS_KEYS_TABLE = 'products_product_fts_keys'
+SEARCH_FIELDS = ('name', 'description')
+
+# Relative weight of a name match over a description match
+SQLITE_WEIGHTS = {'name': 10.0, 'description': 1.0}
+POSTGRES_WEIGHTS = {'name': 'A', 'description': 'B'}
+
+# FTS rowid of the product in ``row``, through the unique index on product_id
+FTS_KEY = f"(SELECT id FROM {FTS_KEYS_TABLE} WHERE product_id = {{row}}.id)"
+
+SQLITE_TRIGGERS = {
+    'products_product_fts_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS products_product_fts_insert AFTER INSERT ON products_product BEGIN
+            INSERT INTO {FTS_KEYS_TABLE}(product_id) VALUES (new.id);
+            INSERT INTO {FTS_TABLE}(rowid, name, description)
+            VALUES ({FTS_KEY.format(row='new')}, new.name, coalesce(new.description, ''));
+        END""",
+    'products_product_fts_update': f"""
+        CREATE TRIGGER IF NOT EXISTS products_product_fts_update AFTER UPDATE OF name, description ON products_product BEGIN
+            UPDATE {FTS_TABLE} SET name = new.name, description = coalesce(new.description, '')
+            WHERE rowid = {FTS_KEY.format(row='new')};
+        END""",
+    'products_product_fts_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS products_product_fts_delete AFTER DELETE ON products_product BEGIN
+            DELETE FROM {FTS_TABLE} WHERE rowid = {FTS_KEY.format(row='old')};
+            DELETE FROM {FTS_KEYS_TABLE} WHERE product_id = old.id;
+        END""",
+}
+
+POSTGRES_SETUP = [
+    """
+    ALTER TABLE products_product ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS products_product_search_vector_idx ON products_product USING GIN (search_vector)",
+    # Trigram index for fuzzy name matching (see products.fuzzy)
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS products_product_name_trgm_idx ON products_product USING GIN (name gin_trgm_ops)",
+]
+
+
+def is_supported(connection):
+    return connection.vendor in ('sqlite', 'postgresql')
+
+
+def ensure_search_index(connection):
+    """
+    Create the search index structures if they are missing.
+
+    SQLite drops triggers whenever a migration rebuilds products_product, so the
+    FTS table is repopulated when that happens. An FTS table from before the
+    key table is replaced.
+    """
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            tables = set(connection.introspection.table_names(cursor))
+            if FTS_TABLE in tables and FTS_KEYS_TABLE not in tables:
+                for name in SQLITE_TRIGGERS:
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+                cursor.execute(f"DROP TABLE {FTS_TABLE}")
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'products_product'"
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {FTS_KEYS_TABLE} "
+                "(id INTEGER PRIMARY KEY, product_id char(32) NOT NULL UNIQUE)"
+            )
+            cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(name, description)")
+            for sql in SQLITE_TRIGGERS.values():
+                cursor.execute(sql)
+        if not existing.issuperset(SQLITE_TRIGGERS):
+            rebuild_search_index(connection)
+    elif connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            for sql in POSTGRES_SETUP:
+                cursor.execute(sql)
+
+
+def rebuild_search_index(connection):
+    """
+    Repopulate the SQLite FTS table from products_product.
+    The Postgres column is generated by the database and never needs a rebuild.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(f"DELETE FROM {FTS_KEYS_TABLE}")
+        cursor.execute(f"INSERT INTO {FTS_KEYS_TABLE}(product_id) SELECT id FROM products_product")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+            f"SELECT keys.id, product.name, coalesce(product.description, '') "
+            f"FROM products_product product JOIN {FTS_KEYS_TABLE} keys ON keys.product_id = product.id"
+        )
+
+
+def get_terms(query):
+    return re.findall(r'\w+', query.lower())
+
+
+def _sqlite_match(terms, field):
+    # Every term is quoted so user input can never be read as FTS5 syntax
+    match = ' '.join('"%s"*' % term.replace('"', '""') for term in terms)
+    if field:
+        match = '%s : (%s)' % (field, match)
+    return match
+
+
+def _postgres_query(terms, field):
+    weight = POSTGRES_WEIGHTS[field] if field else ''
+    return ' & '.join(f'{term}:*{weight}' for term in terms)
+
+
+def search_products(queryset, query, field=None, rank=True):
+    """
+    Filter products matching every term of ``query`` (as a prefix), optionally
+    restricted to one of SEARCH_FIELDS. With ``rank`` the results are annotated
+    with ``search_rank`` and ordered by relevance.
+    """
+    terms = get_terms(query)
+    if not terms:
+        return queryset
+
+    table = queryset.model._meta.db_table
+    connection = connections[queryset.db]
+
+    if connection.vendor == 'sqlite':
+        match = _sqlite_match(terms, field)
+        queryset = queryset.filter(RawSQL(
+            f"{table}.id IN (SELECT keys.product_id FROM {FTS_TABLE} "
+            f"JOIN {FTS_KEYS_TABLE} keys ON keys.id = {FTS_TABLE}.rowid WHERE {FTS_TABLE} MATCH %s)",
+            (match,), output_field=BooleanField(),
+        ))
+        if rank:
+            weights = ', '.join(str(SQLITE_WEIGHTS[name]) for name in SEARCH_FIELDS)
+            # The rowid constraint makes FTS5 seek to the one row instead of scanning the matches
+            queryset = queryset.annotate(search_rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {FTS_KEY.format(row=table)}",
+                (match,), output_field=FloatField(),
+            ))
+    elif connection.vendor == 'postgresql':
+        tsquery = _postgres_query(terms, field)
+        queryset = queryset.filter(RawSQL(
+            f"{table}.search_vector @@ to_tsquery('english', %s)",
+            (tsquery,), output_field=BooleanField(),
+        ))
+        if rank:
+            queryset = queryset.annotate(search_rank=RawSQL(
+                f"ts_rank({table}.search_vector, to_tsquery('english', %s))",
+                (tsquery,), output_field=FloatField(),
+            ))
+    else:
+        fields = [field] if field else SEARCH_FIELDS
+        for term in terms:
+            condition = Q()
+            for name in fields:
+                condition |= Q(**{f'{name}__icontains': term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+    if rank:
+        queryset = queryset.order_by('-search_rank', 'pk')
+    return queryset
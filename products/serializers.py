@@ -1,25 +1,42 @@
 from rest_framework import serializers
 from .models import Category, SubCategory, Product, ProductImage
 from carts.models import CartItem, Cart
+from .sparse import SparseFieldsetMixin
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'description']
+        expandable_fields = {
+            'subcategories': ('products.serializers.SubCategorySerializer', {'many': True}),
+        }
 
 
-class SubCategorySerializer(serializers.ModelSerializer):
+class SubCategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = SubCategory
         fields = ['id', 'name', 'description', 'category']
 
-class ProductImageSerializer(serializers.ModelSerializer):
+class SubCategoryTreeSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    name = serializers.CharField()
+    product_count = serializers.IntegerField()
+
+
+class CategoryTreeSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    name = serializers.CharField()
+    product_count = serializers.IntegerField()
+    subcategories = SubCategoryTreeSerializer(many=True)
+
+
+class ProductImageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = ProductImage
         fields = ['id', 'image']
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     images = ProductImageSerializer(many=True, read_only=True)  # Display images
     average_rating = serializers.FloatField(read_only=True)
     review_count = serializers.FloatField(read_only=True)
@@ -40,6 +57,10 @@ class ProductSerializer(serializers.ModelSerializer):
             'images'
         ]
         read_only_fields = ['category']
+        expandable_fields = {
+            'category': (CategorySerializer, {}),
+            'subcategory': (SubCategorySerializer, {}),
+        }
 
     def create(self, validated_data):
         """
@@ -0,0 +1,78 @@
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.db.models.functions import Now
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate, post_save, post_delete
+from django.dispatch import receiver
+
+from products.cache import invalidate_catalog, invalidate_name_indexes
+from products.models import Category, SubCategory, Product, ProductImage
+from products.search import ensure_search_index
+from products.indexes import CATEGORY, SUBCATEGORY, PRODUCT
+from products.suggest import suggest_index
+from products.fuzzy import trigram_index, configure_connection
+
+
+@receiver(post_migrate)
+def create_search_index(sender, using, **kwargs):
+    if sender.name == 'products':
+        ensure_search_index(connections[using])
+
+
+@receiver(post_migrate)
+def create_cache_table(sender, using, **kwargs):
+    # For a DatabaseCache, the shared cache the catalog versions need; other backends are skipped
+    if sender.name == 'products':
+        call_command('createcachetable', database=using, verbosity=0)
+
+
+@receiver(connection_created)
+def configure_fuzzy_search(sender, connection, **kwargs):
+    if connection.vendor == 'postgresql':
+        configure_connection(connection)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=SubCategory)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=SubCategory)
+@receiver(post_delete, sender=Product)
+def invalidate_taxonomy_cache(sender, using, **kwargs):
+    invalidate_catalog(using=using, taxonomy=True)
+
+
+@receiver(post_save, sender=Product)
+def invalidate_product_cache(sender, instance, created, using, **kwargs):
+    assignment = instance.get_assignment()
+    moved = created or getattr(instance, '_loaded_assignment', None) != assignment
+    instance._loaded_assignment = assignment
+    invalidate_catalog(using=using, taxonomy=moved)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=SubCategory)
+@receiver(post_save, sender=Product)
+def update_name_indexes(sender, instance, using, **kwargs):
+    kind = {Category: CATEGORY, SubCategory: SUBCATEGORY, Product: PRODUCT}[sender]
+    is_active = getattr(instance, 'is_active', True)
+
+    def update():
+        for index in (suggest_index, trigram_index):
+            index.update(kind, instance.pk, instance.name, is_active)
+
+    transaction.on_commit(update, using=using)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=SubCategory)
+@receiver(post_delete, sender=Product)
+def rebuild_name_indexes(sender, using, **kwargs):
+    invalidate_name_indexes(using=using)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def touch_product(sender, instance, **kwargs):
+    # Images are part of the product representation: this moves its Last-Modified
+    # and, through ProductQuerySet.update, invalidates the catalog cache
+    Product.objects.filter(pk=instance.product_id).update(updated_at=Now())
@@ -0,0 +1,216 @@
+"""
+Sparse fieldsets (?fields=) and expansions (?expand=) for read endpoints.
+
+``?fields=id,name,items.quantity`` keeps only the listed fields, with dots
+selecting inside nested serializers. ``?expand=category,items.product``
+replaces a primary key with the nested object, for the fields a serializer
+lists in ``Meta.expandable_fields``; dots lead into nested serializers.
+
+The same serializer then drives the queryset: optimize_queryset() loads only
+the columns the remaining fields read (only()), joins forward relations that
+are rendered nested (select_related) and prefetches reverse and many-to-many
+relations only when they are rendered. Fields computed in Python declare the
+model paths they read in ``Meta.field_requirements``.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def parse_paths(value):
+    """
+    'id,items.product.name' -> {'id': {}, 'items': {'product': {'name': {}}}}
+    """
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in filter(None, (part.strip() for part in path.split('.'))):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def _join(prefix, name):
+    return f'{prefix}.{name}' if prefix else name
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin that applies ?fields= and ?expand= on read requests.
+    Nested serializers using the mixin receive their part of both paths.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.sparse_fields = kwargs.pop('sparse_fields', None)
+        self.expand = kwargs.pop('expand', None)
+        self.sparse_path = ''
+        super().__init__(*args, **kwargs)
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def _read_params(self):
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS or not self._is_root():
+            return
+        params = request.query_params
+        if self.sparse_fields is None and params.get(FIELDS_PARAM):
+            self.sparse_fields = parse_paths(params[FIELDS_PARAM])
+        if self.expand is None and params.get(EXPAND_PARAM):
+            self.expand = parse_paths(params[EXPAND_PARAM])
+
+    def get_fields(self):
+        fields = super().get_fields()
+        self._read_params()
+        expand = self.expand or {}
+        sparse = self.sparse_fields or {}
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+
+        # A name with nested paths only leads into a nested serializer, unless it's expandable itself
+        unknown = [
+            name for name, nested in expand.items()
+            if name not in expandable and (not nested or name not in fields)
+        ]
+        if unknown:
+            raise ValidationError({EXPAND_PARAM: [
+                f"'{_join(self.sparse_path, name)}' can't be expanded." for name in unknown
+            ]})
+        for name in expandable.keys() & expand.keys():
+            serializer_class, options = expandable[name]
+            if isinstance(serializer_class, str):
+                serializer_class = import_string(serializer_class)
+            fields[name] = serializer_class(read_only=True, **options)
+
+        unknown = [name for name in sparse if name not in fields]
+        if unknown:
+            raise ValidationError({FIELDS_PARAM: [
+                f"Unknown field '{_join(self.sparse_path, name)}'." for name in unknown
+            ]})
+        if sparse:
+            fields = {name: field for name, field in fields.items() if name in sparse}
+
+        for name, field in fields.items():
+            child = field.child if isinstance(field, ListSerializer) else field
+            nested_fields, nested_expand = sparse.get(name), expand.get(name)
+            if isinstance(child, SparseFieldsetMixin):
+                child.sparse_fields = nested_fields or None
+                child.expand = nested_expand or None
+                child.sparse_path = _join(self.sparse_path, name)
+            elif nested_fields or nested_expand:
+                raise ValidationError({FIELDS_PARAM if nested_fields else EXPAND_PARAM: [
+                    f"'{_join(self.sparse_path, name)}' has no nested fields."
+                ]})
+        return fields
+
+
+class QueryPlan:
+    """
+    Columns, joins and prefetches needed to render one model, built from
+    model paths like 'quantity', 'product__price' or 'items__product'.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.columns = set()
+        self.joins = {}
+        self.prefetches = {}
+
+    def add_path(self, path, join=False):
+        """
+        Returns the plan of the relation the path ends on when it is loaded
+        (a join or a prefetch), else None. A forward relation at the end of
+        the path only loads its key column unless ``join``.
+        """
+        name, _, rest = path.partition('__')
+        field = self.model._meta.get_field(name)
+
+        if field.many_to_many or field.one_to_many:
+            plan = self.prefetches.get(name)
+            if plan is None:
+                plan = self.prefetches[name] = QueryPlan(field.related_model)
+                if field.one_to_many:
+                    # The key back to this model matches prefetched rows to their owner
+                    plan.columns.add(field.field.name)
+        elif field.is_relation and (rest or join):
+            plan = self.joins.setdefault(name, QueryPlan(field.related_model))
+        else:
+            self.columns.add(name)
+            return None
+        return plan.add_path(rest, join) if rest else plan
+
+    def _collect(self, prefix, columns, joins, prefetches):
+        columns.extend(prefix + column for column in self.columns)
+        for name, plan in self.joins.items():
+            columns.append(prefix + name)
+            joins.append(prefix + name)
+            plan._collect(f'{prefix}{name}__', columns, joins, prefetches)
+        for name, plan in self.prefetches.items():
+            prefetches.append(Prefetch(prefix + name, queryset=plan.apply(plan.model._default_manager.all())))
+
+    def apply(self, queryset):
+        columns, joins, prefetches = ['pk'], [], []
+        self._collect('', columns, joins, prefetches)
+        queryset = queryset.only(*columns)
+        if joins:
+            queryset = queryset.select_related(*joins)
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset
+
+
+def plan_serializer(serializer, plan):
+    requirements = getattr(getattr(serializer, 'Meta', None), 'field_requirements', {})
+    for name, field in serializer.fields.items():
+        for path in requirements.get(name, ()):
+            plan.add_path(path)
+        if field.source == '*' or name in requirements:
+            continue
+        child = field.child if isinstance(field, ListSerializer) else field
+        nested = isinstance(child, BaseSerializer)
+        try:
+            target = plan.add_path(field.source.replace('.', '__'), join=nested)
+        except FieldDoesNotExist:
+            continue
+        if nested and target is not None:
+            plan_serializer(child, target)
+    return plan
+
+
+def optimize_queryset(queryset, serializer):
+    """
+    Restrict ``queryset`` to what ``serializer`` renders: only() the columns
+    it reads, select_related the relations it nests and prefetch the
+    reverse and many-to-many relations it lists. Replaces any joins and
+    prefetches already on the queryset.
+    """
+    plan = plan_serializer(serializer, QueryPlan(queryset.model))
+    return plan.apply(queryset.select_related(None).prefetch_related(None))
+
+
+class SparseFieldsetViewMixin:
+    """
+    View mixin that rejects invalid ?fields= / ?expand= with a 400 before the
+    handler runs and shapes the filtered queryset to the requested
+    representation. Hooks filter_queryset() so views with their own
+    get_queryset() are covered too.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and (FIELDS_PARAM in request.query_params
+                                               or EXPAND_PARAM in request.query_params):
+            self.get_serializer().fields
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method in SAFE_METHODS:
+            queryset = optimize_queryset(queryset, self.get_serializer())
+        return queryset
@@ -0,0 +1,91 @@
+"""
+In-process prefix index for search-box suggestions.
+
+Every word suffix of every active product, category and subcategory name is
+kept in one sorted list, so a prefix lookup is a bisect plus a short scan and
+never touches the database. See products.indexes for how it stays current.
+"""
+from bisect import bisect_left, insort
+
+from .indexes import SyncedNameIndex, PRODUCT, CATEGORY, SUBCATEGORY
+
+# Categories first, then subcategories, then products, for equally good matches
+KIND_ORDER = {CATEGORY: 0, SUBCATEGORY: 1, PRODUCT: 2}
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# How many prefix matches are ranked before the top results are picked
+SCAN_LIMIT = 500
+SEPARATOR = '\x00'
+
+
+def normalize(text):
+    return ' '.join(text.casefold().split())
+
+
+class SuggestIndex(SyncedNameIndex):
+    def __init__(self):
+        super().__init__()
+        self.keys = []
+        self.entries = {}
+
+    @staticmethod
+    def _keys_for(kind, pk, name):
+        words = normalize(name).split(' ')
+        return [
+            SEPARATOR.join((' '.join(words[start:]), kind, str(pk)))
+            for start in range(len(words))
+        ]
+
+    def load(self, rows):
+        keys, entries = [], {}
+        for kind, pk, name in rows:
+            row_keys = self._keys_for(kind, pk, name)
+            keys.extend(row_keys)
+            entries[(kind, str(pk))] = (name, row_keys)
+        keys.sort()
+        self.keys, self.entries = keys, entries
+
+    def add(self, kind, pk, name):
+        self.remove(kind, pk)
+        keys = self._keys_for(kind, pk, name)
+        for key in keys:
+            insort(self.keys, key)
+        self.entries[(kind, str(pk))] = (name, keys)
+
+    def remove(self, kind, pk):
+        entry = self.entries.pop((kind, str(pk)), None)
+        if entry is None:
+            return
+        for key in entry[1]:
+            position = bisect_left(self.keys, key)
+            if position < len(self.keys) and self.keys[position] == key:
+                del self.keys[position]
+
+    def suggest(self, query, limit=DEFAULT_LIMIT):
+        """
+        Up to ``limit`` entries whose name has a word starting with ``query``,
+        best first: matches at the start of the name, then by kind and length.
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        self.sync()
+        with self.lock:
+            matches = {}
+            position = bisect_left(self.keys, prefix)
+            while position < len(self.keys) and len(matches) < SCAN_LIMIT:
+                key = self.keys[position]
+                if not key.startswith(prefix):
+                    break
+                text, kind, pk = key.split(SEPARATOR)
+                name = self.entries[(kind, pk)][0]
+                rank = (not normalize(name).startswith(prefix), KIND_ORDER[kind], len(name), name)
+                if (kind, pk) not in matches or rank < matches[(kind, pk)][0]:
+                    matches[(kind, pk)] = (rank, {'type': kind, 'id': pk, 'name': name})
+                position += 1
+
+        return [suggestion for _, suggestion in sorted(matches.values(), key=lambda match: match[0])[:limit]]
+
+
+suggest_index = SuggestIndex()
@@ -0,0 +1,43 @@
+"""
+Category tree for storefront menus.
+
+The tree is built from two grouped queries and cached under the taxonomy
+version, which only moves when categories, subcategories or product
+assignments change (see products.cache).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .cache import TAXONOMY, fill_from_primary, get_version
+from .models import Category, SubCategory
+
+ACTIVE_PRODUCTS = Q(products__is_active=True)
+
+
+def build_category_tree():
+    subcategories = {}
+    for subcategory in (
+        SubCategory.objects.annotate(product_count=Count('products', filter=ACTIVE_PRODUCTS))
+        .order_by('name')
+        .values('id', 'name', 'category_id', 'product_count')
+    ):
+        category_id = subcategory.pop('category_id')
+        subcategories.setdefault(category_id, []).append(subcategory)
+
+    return [
+        {**category, 'subcategories': subcategories.get(category['id'], [])}
+        for category in Category.objects.annotate(product_count=Count('products', filter=ACTIVE_PRODUCTS))
+        .order_by('name')
+        .values('id', 'name', 'product_count')
+    ]
+
+
+def get_category_tree():
+    key = f'category-tree:{get_version(TAXONOMY)}'
+    tree = cache.get(key)
+    if tree is None:
+        with fill_from_primary(TAXONOMY):
+            tree = build_category_tree()
+        cache.set(key, tree, settings.CATALOG_CACHE_TIMEOUT)
+    return tree
@@ -8,4 +8,16 @@ def api_client():
 @pytest.fixture(autouse=True)
 def disable_throttling(settings):
     settings.REST_FRAMEWORK['DEFAULT_THROTTLE_CLASSES'] = []
-    settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] = {}
\ No newline at end of file
+    settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] = {}
+
+@pytest.fixture(autouse=True)
+def disable_caching(settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+@pytest.fixture
+def enable_caching(settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    from django.core.cache import cache
+    cache.clear()
+
@@ -0,0 +1,91 @@
+import pytest
+from django.core.cache.backends.db import DatabaseCache
+from model_bakery import baker
+
+from customuser.models import CustomUser
+from products.models import Product, Category
+from shoplit.settings import common
+
+
+@pytest.fixture
+def authenticate(api_client):
+    def do_authenticate(is_staff=False):
+        return api_client.force_authenticate(user=CustomUser(is_staff=is_staff))
+    return do_authenticate
+
+
+def product_names(api_client):
+    response = api_client.get('/api/products/')
+    return sorted(product['name'] for product in response.data['results'])
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('enable_caching')
+class TestCatalogCache:
+    def test_if_list_is_served_from_cache(self, api_client):
+        baker.make(Product, name='cached')
+        product_names(api_client)
+
+        Product.objects.all().delete()  # no commit, so no invalidation yet
+
+        assert product_names(api_client) == ['cached']
+
+    def test_if_model_save_invalidates_cache(self, api_client, django_capture_on_commit_callbacks):
+        product = baker.make(Product, name='old')
+        product_names(api_client)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            product.name = 'new'
+            product.save()
+
+        assert product_names(api_client) == ['new']
+
+    def test_if_bulk_create_invalidates_cache(self, api_client, django_capture_on_commit_callbacks):
+        product_names(api_client)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Product.objects.bulk_create([Product(name='bulk', price=1)])
+
+        assert product_names(api_client) == ['bulk']
+
+    def test_if_queryset_update_invalidates_cache(self, api_client, django_capture_on_commit_callbacks):
+        baker.make(Product, name='old')
+        product_names(api_client)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Product.objects.update(name='new')
+
+        assert product_names(api_client) == ['new']
+
+    def test_if_api_write_invalidates_category_cache(self, api_client, authenticate, django_capture_on_commit_callbacks):
+        category = baker.make(Category, name='old')
+        api_client.get(f'/api/products/categories/{category.id}/')
+        authenticate(is_staff=True)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.patch(f'/api/products/categories/{category.id}/', {'name': 'new'})
+        response = api_client.get(f'/api/products/categories/{category.id}/')
+
+        assert response.data['name'] == 'new'
+
+    def test_if_rolled_back_write_does_not_invalidate_cache(self, api_client, django_capture_on_commit_callbacks):
+        baker.make(Product, name='cached')
+        product_names(api_client)
+
+        with django_capture_on_commit_callbacks(execute=False):
+            Product.objects.update(name='rolled back')
+
+        assert product_names(api_client) == ['cached']
+
+
+@pytest.mark.django_db
+def test_if_default_cache_is_shared_between_processes():
+    backend = common.CACHES['default']
+    # Two instances stand in for two worker processes
+    first, second = (DatabaseCache(backend['LOCATION'], {}) for _ in range(2))
+    assert backend['BACKEND'] == 'django.core.cache.backends.db.DatabaseCache'
+
+    first.set('catalog:version', 1)
+    first.incr('catalog:version')
+
+    assert second.get('catalog:version') == 2
@@ -0,0 +1,88 @@
+from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+from model_bakery import baker
+
+from products.models import Category, SubCategory, Product
+
+
+@pytest.mark.django_db
+class TestCategoryTree:
+    def test_if_category_tree_returns_nested_counts(self, api_client):
+        phones = baker.make(Category, name='Phones')
+        android = baker.make(SubCategory, category=phones, name='Android')
+        baker.make(SubCategory, category=phones, name='iOS')
+        baker.make(Category, name='Books')
+        baker.make(Product, subcategory=android, _quantity=2)
+        baker.make(Product, subcategory=android, is_active=False)
+
+        response = api_client.get('/api/products/category-tree/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [category['name'] for category in response.data] == ['Books', 'Phones']
+        phones_node = response.data[1]
+        assert phones_node['product_count'] == 2
+        assert [(sub['name'], sub['product_count']) for sub in phones_node['subcategories']] == [
+            ('Android', 2), ('iOS', 0)
+        ]
+
+    def test_if_category_tree_runs_two_queries(self, api_client):
+        for category in baker.make(Category, _quantity=5):
+            baker.make(SubCategory, category=category, _quantity=3)
+
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get('/api/products/category-tree/')
+
+        assert len(queries) == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('enable_caching')
+class TestCachedCategoryTree:
+    def test_if_cached_tree_runs_no_queries(self, api_client):
+        baker.make(SubCategory)
+        api_client.get('/api/products/category-tree/')
+
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get('/api/products/category-tree/')
+
+        assert len(queries) == 0
+
+    def test_if_price_change_keeps_cached_tree(self, api_client, django_capture_on_commit_callbacks):
+        product = baker.make(Product, subcategory=baker.make(SubCategory))
+        api_client.get('/api/products/category-tree/')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            product = Product.objects.get(pk=product.pk)
+            product.price = 5
+            product.save()
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get('/api/products/category-tree/')
+
+        assert len(queries) == 0
+
+    def test_if_product_move_rebuilds_tree(self, api_client, django_capture_on_commit_callbacks):
+        category = baker.make(Category)
+        subcategory = baker.make(SubCategory, category=category)
+        product = baker.make(Product)
+        api_client.get('/api/products/category-tree/')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            product = Product.objects.get(pk=product.pk)
+            product.subcategory = subcategory
+            product.save()
+        response = api_client.get('/api/products/category-tree/')
+
+        assert response.data[0]['product_count'] == 1
+
+    def test_if_new_subcategory_rebuilds_tree(self, api_client, django_capture_on_commit_callbacks):
+        category = baker.make(Category)
+        api_client.get('/api/products/category-tree/')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            baker.make(SubCategory, category=category)
+        response = api_client.get('/api/products/category-tree/')
+
+        assert len(response.data[0]['subcategories']) == 1
@@ -0,0 +1,101 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from carts.models import Cart, CartItem
+from customuser.models import CustomUser
+from orders.models import Order, OrderItem
+from products.models import Product
+
+
+@pytest.fixture
+def user(api_client):
+    user = baker.make(CustomUser)
+    api_client.force_authenticate(user=user)
+    return user
+
+
+def fill_cart(user, *entries):
+    cart, _ = Cart.objects.get_or_create(user=user)
+    for product, quantity in entries:
+        baker.make(CartItem, cart=cart, product=product, quantity=quantity)
+    return cart
+
+
+@pytest.mark.django_db
+class TestCheckout:
+    def test_if_checkout_creates_order_and_empties_cart(self, api_client, user):
+        lamp = baker.make(Product, price=Decimal('10.00'), stock_quantity=5)
+        mug = baker.make(Product, price=Decimal('2.50'), stock_quantity=5)
+        fill_cart(user, (lamp, 2), (mug, 1))
+
+        response = api_client.post('/api/cart/checkout/')
+
+        assert response.status_code == 201
+        order = Order.objects.get(pk=response.data['id'])
+        assert order.user == user
+        assert (order.item_count, order.total_amount) == (3, Decimal('22.50'))
+        assert {item.product_id: item.price for item in OrderItem.objects.filter(order=order)} == {
+            lamp.pk: Decimal('10.00'), mug.pk: Decimal('2.50'),
+        }
+        assert not CartItem.objects.filter(cart__user=user).exists()
+        assert Product.objects.get(pk=lamp.pk).stock_quantity == 3
+
+    def test_if_retry_returns_same_order(self, api_client, user):
+        fill_cart(user, (baker.make(Product, stock_quantity=5), 1))
+        first = api_client.post('/api/cart/checkout/')
+
+        retry = api_client.post('/api/cart/checkout/')
+
+        assert retry.status_code == 200
+        assert retry.data['id'] == first.data['id']
+        assert Order.objects.count() == 1
+
+    def test_if_adding_items_starts_a_new_checkout(self, api_client, user):
+        product = baker.make(Product, stock_quantity=5)
+        fill_cart(user, (product, 1))
+        first = api_client.post('/api/cart/checkout/')
+
+        api_client.post('/api/cart/items/', {'product': str(product.pk), 'quantity': 1}, format='json')
+        second = api_client.post('/api/cart/checkout/')
+
+        assert second.status_code == 201
+        assert second.data['id'] != first.data['id']
+        assert api_client.post('/api/cart/checkout/').data['id'] == second.data['id']
+
+    def test_if_empty_cart_returns_400(self, api_client, user):
+        response = api_client.post('/api/cart/checkout/')
+
+        assert response.status_code == 400
+        assert not Order.objects.exists()
+
+    def test_if_short_stock_leaves_cart_untouched(self, api_client, user):
+        plenty = baker.make(Product, stock_quantity=5)
+        short = baker.make(Product, stock_quantity=1, name='Mug')
+        fill_cart(user, (plenty, 1), (short, 2))
+
+        response = api_client.post('/api/cart/checkout/')
+
+        assert response.status_code == 400
+        assert "'Mug'. Only 1 available." in str(response.data)
+        assert CartItem.objects.filter(cart__user=user).count() == 2
+        assert Product.objects.get(pk=plenty.pk).stock_quantity == 5
+        assert not Order.objects.exists()
+
+    def test_if_query_count_does_not_grow_with_items(self, api_client, user):
+        products = baker.make(Product, stock_quantity=5, _quantity=10)
+
+        def count_queries(products):
+            fill_cart(user, *[(product, 1) for product in products])
+            with CaptureQueriesContext(connection) as queries:
+                response = api_client.post('/api/cart/checkout/')
+            assert response.status_code == 201
+            return len(queries)
+
+        assert count_queries(products[:1]) == count_queries(products[1:])
+
+    def test_if_anonymous_checkout_returns_401(self, api_client):
+        assert api_client.post('/api/cart/checkout/').status_code == 401
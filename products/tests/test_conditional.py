@@ -0,0 +1,174 @@
+from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+from model_bakery import baker
+
+from products.models import Product, Category, ProductImage, SubCategory
+from reviews.models import Review
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def test_if_list_returns_validators(self, api_client):
+        baker.make(Product)
+
+        response = api_client.get('/api/products/')
+
+        assert response['ETag'].startswith('"')
+        # A deletion never moves the newest updated_at, see test_if_deleting_from_list_ignores_modified_since
+        assert 'Last-Modified' not in response
+
+    def test_if_unchanged_list_returns_304_without_serializing(self, api_client):
+        baker.make(Product, _quantity=3)
+        etag = api_client.get('/api/products/')['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+        assert len(queries) == 1
+
+    def test_if_modified_list_returns_200(self, api_client):
+        product = baker.make(Product)
+        etag = api_client.get('/api/products/')['ETag']
+
+        product.name = 'changed'
+        product.save()
+        response = api_client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_if_deleting_from_list_changes_etag(self, api_client):
+        products = baker.make(Product, _quantity=2)
+        etag = api_client.get('/api/products/')['ETag']
+
+        Product.objects.filter(pk=min(products, key=lambda p: p.updated_at).pk).delete()
+        response = api_client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_if_deleting_from_list_ignores_modified_since(self, api_client):
+        oldest, newest = sorted(baker.make(Product, _quantity=2), key=lambda p: p.updated_at)
+        # What a client holding the list before the deletion would send
+        last_modified = api_client.get(f'/api/products/{newest.id}/')['Last-Modified']
+
+        oldest.delete()
+        response = api_client.get('/api/products/', HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 1
+
+    def test_if_nested_detail_has_no_last_modified(self, api_client):
+        category = baker.make(Category)
+
+        response = api_client.get(f'/api/products/categories/{category.id}/?expand=subcategories')
+
+        assert 'ETag' in response
+        assert 'Last-Modified' not in response
+
+    def test_if_etag_depends_on_query(self, api_client):
+        baker.make(Product)
+
+        assert api_client.get('/api/products/')['ETag'] != api_client.get('/api/products/?page_size=5')['ETag']
+
+    def test_if_unchanged_detail_returns_304(self, api_client):
+        category = baker.make(Category)
+        etag = api_client.get(f'/api/products/categories/{category.id}/')['ETag']
+
+        response = api_client.get(f'/api/products/categories/{category.id}/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_if_modified_since_returns_304(self, api_client):
+        product = baker.make(Product)
+        last_modified = api_client.get(f'/api/products/{product.id}/')['Last-Modified']
+
+        response = api_client.get(f'/api/products/{product.id}/', HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_if_new_review_changes_product_etag(self, api_client):
+        product = baker.make(Product)
+        etag = api_client.get(f'/api/products/{product.id}/')['ETag']
+
+        baker.make(Review, product=product, rating=5)
+        response = api_client.get(f'/api/products/{product.id}/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_if_new_image_changes_product_etag(self, api_client):
+        product = baker.make(Product)
+        etag = api_client.get(f'/api/products/{product.id}/')['ETag']
+
+        baker.make(ProductImage, product=product, image='products/shop.jpg')
+        response = api_client.get(f'/api/products/{product.id}/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_if_expanded_category_rename_changes_etag(self, api_client):
+        category = baker.make(Category)
+        baker.make(Product, category=category)
+        etag = api_client.get('/api/products/?expand=category')['ETag']
+
+        category.name = 'renamed'
+        category.save()
+        response = api_client.get('/api/products/?expand=category', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'][0]['category']['name'] == 'renamed'
+
+    def test_if_expanded_subcategory_changes_etag(self, api_client):
+        category = baker.make(Category)
+        first, second = baker.make(SubCategory, category=category, _quantity=2)
+        url = f'/api/products/categories/{category.id}/?expand=subcategories'
+        etag = api_client.get(url)['ETag']
+
+        first.name = 'renamed'
+        first.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+        # The newest subcategory is kept, so only the count reveals the deletion
+        etag = response['ETag']
+        second.delete()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_if_unexpanded_list_skips_related_joins(self, api_client):
+        baker.make(Product)
+
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get('/api/products/', HTTP_IF_NONE_MATCH='"stale"')
+
+        assert 'JOIN "products_category"' not in queries[0]['sql']
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('enable_caching')
+class TestCachedValidators:
+    def test_if_cached_page_and_304_run_no_queries(self, api_client):
+        baker.make(Product, _quantity=3)
+        etag = api_client.get('/api/products/')['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            cached = api_client.get('/api/products/')
+            not_modified = api_client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+
+        assert cached.status_code == status.HTTP_200_OK
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert len(queries) == 0
+
+    def test_if_write_changes_cached_etag(self, api_client, django_capture_on_commit_callbacks):
+        product = baker.make(Product)
+        etag = api_client.get('/api/products/')['ETag']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            product.name = 'changed'
+            product.save()
+        response = api_client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
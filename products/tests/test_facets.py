@@ -0,0 +1,89 @@
+from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+from model_bakery import baker
+
+from products.models import Category, SubCategory, Product
+
+
+def price_counts(response):
+    return {bucket['min']: bucket['count'] for bucket in response.data['price']}
+
+
+@pytest.mark.django_db
+class TestProductFacets:
+    def test_if_facets_count_per_category_subcategory_and_price(self, api_client):
+        phones = baker.make(SubCategory, name='Phones', category=baker.make(Category, name='Electronics'))
+        novels = baker.make(SubCategory, name='Novels', category=baker.make(Category, name='Books'))
+        baker.make(Product, subcategory=phones, price=30)
+        baker.make(Product, subcategory=phones, price=700)
+        baker.make(Product, subcategory=novels, price=10)
+
+        response = api_client.get('/api/products/facets/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [(row['name'], row['count']) for row in response.data['categories']] == [
+            ('Books', 1), ('Electronics', 2)
+        ]
+        assert [(row['name'], row['count']) for row in response.data['subcategories']] == [
+            ('Novels', 1), ('Phones', 2)
+        ]
+        assert price_counts(response)[0] == 1
+        assert price_counts(response)[25] == 1
+        assert price_counts(response)[500] == 1
+        assert response.data['price'][-1]['max'] is None
+
+    def test_if_facets_apply_list_filters_and_search(self, api_client):
+        subcategory = baker.make(SubCategory)
+        baker.make(Product, name='Gaming Laptop', subcategory=subcategory, price=900)
+        baker.make(Product, name='Office Laptop', subcategory=subcategory, price=400)
+        baker.make(Product, name='Desk Lamp', subcategory=subcategory, price=20)
+
+        response = api_client.get('/api/products/facets/', {'search': 'laptop', 'price__lte': 500})
+
+        assert response.data['categories'][0]['count'] == 1
+        assert price_counts(response)[250] == 1
+        assert price_counts(response)[500] == 0
+
+    def test_if_facets_run_fixed_number_of_queries(self, api_client):
+        for subcategory in baker.make(SubCategory, _quantity=4):
+            baker.make(Product, subcategory=subcategory, _quantity=3)
+
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get('/api/products/facets/')
+
+        assert len(queries) == 3
+
+    def test_if_invalid_filter_returns_400(self, api_client):
+        response = api_client.get('/api/products/facets/', {'price__gte': 'cheap'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('enable_caching')
+class TestCachedProductFacets:
+    def test_if_equivalent_filters_share_cache_entry(self, api_client):
+        subcategory = baker.make(SubCategory)
+        baker.make(Product, subcategory=subcategory, price=10)
+        api_client.get('/api/products/facets/', {'price__gte': 5, 'subcategory_id': subcategory.id})
+
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get('/api/products/facets/', {
+                'subcategory_id': subcategory.id, 'price__gte': '5.00', 'page': 2, 'search': '  ',
+            })
+
+        # Only the subcategory filter's own validation hits the database
+        assert not [query for query in queries if 'products_product' in query['sql']]
+
+    def test_if_product_write_refreshes_facets(self, api_client, django_capture_on_commit_callbacks):
+        subcategory = baker.make(SubCategory)
+        api_client.get('/api/products/facets/')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            baker.make(Product, subcategory=subcategory)
+        response = api_client.get('/api/products/facets/')
+
+        assert response.data['subcategories'][0]['count'] == 1
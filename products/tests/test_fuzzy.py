@@ -0,0 +1,116 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+from model_bakery import baker
+
+from products.models import Category, SubCategory, Product
+
+
+def fuzzy(api_client, term, **params):
+    response = api_client.get('/api/products/', {'fuzzy': term, **params})
+    return [product['name'] for product in response.data['results']]
+
+
+@pytest.mark.django_db
+class TestFuzzySearch:
+    def test_if_misspelled_words_match(self, api_client):
+        baker.make(Product, name='Gaming Laptop')
+        baker.make(Product, name='Wireless Headphones')
+        baker.make(Product, name='Desk Lamp')
+
+        assert fuzzy(api_client, 'labtop') == ['Gaming Laptop']
+        assert fuzzy(api_client, 'hedphones') == ['Wireless Headphones']
+
+    def test_if_results_are_ranked_by_similarity(self, api_client):
+        baker.make(Product, name='Laptop Stand for Large Desks')
+        baker.make(Product, name='Laptop')
+        baker.make(Product, name='Laptops')
+
+        assert fuzzy(api_client, 'laptop') == ['Laptop', 'Laptop Stand for Large Desks', 'Laptops']
+
+    def test_if_unrelated_names_do_not_match(self, api_client):
+        baker.make(Product, name='Garden Hose')
+
+        assert fuzzy(api_client, 'labtop') == []
+
+    def test_if_fuzzy_combines_with_filters(self, api_client):
+        phones = baker.make(SubCategory, category=baker.make(Category))
+        laptops = baker.make(SubCategory, category=baker.make(Category))
+        baker.make(Product, name='Laptop Sleeve', subcategory=phones, price=10)
+        baker.make(Product, name='Gaming Laptop', subcategory=laptops, price=900)
+        baker.make(Product, name='Office Laptop', subcategory=laptops, price=400)
+
+        assert fuzzy(api_client, 'labtop', subcategory_id=laptops.id, price__lte=500) == ['Office Laptop']
+        assert fuzzy(api_client, 'labtop', category_id=phones.category_id) == ['Laptop Sleeve']
+
+    def test_if_explicit_ordering_wins(self, api_client):
+        baker.make(Product, name='Laptop', price=20)
+        baker.make(Product, name='Gaming Laptop', price=10)
+
+        assert fuzzy(api_client, 'laptop', ordering='price') == ['Gaming Laptop', 'Laptop']
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('enable_caching')
+class TestFuzzyIndexUpdates:
+    def test_if_renamed_products_are_found(self, api_client, django_capture_on_commit_callbacks):
+        product = baker.make(Product, name='Desk Lamp')
+        fuzzy(api_client, 'labtop')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            product.name = 'Gaming Laptop'
+            product.save()
+
+        assert fuzzy(api_client, 'labtop') == ['Gaming Laptop']
+        assert fuzzy(api_client, 'desk lamp') == []
+
+    def test_if_lookup_filters_on_primary_keys(self, api_client):
+        baker.make(Product, name='Gaming Laptop')
+        fuzzy(api_client, 'labtop')
+
+        # Another page size misses the cached page and validators but reuses the built index
+        with CaptureQueriesContext(connection) as queries:
+            fuzzy(api_client, 'labtop', page_size=5)
+
+        product_queries = [query['sql'] for query in queries if 'FROM "products_product"' in query['sql']]
+        assert product_queries
+        assert all('"products_product"."id" IN' in sql for sql in product_queries)
+
+
+@pytest.mark.django_db
+class TestFuzzyCandidates:
+    def test_if_filtered_search_finds_matches_outside_overall_top(self, api_client, monkeypatch):
+        monkeypatch.setattr('products.fuzzy.MAX_CANDIDATES', 2)
+        laptops = baker.make(SubCategory, category=baker.make(Category))
+        for name in ('Laptop', 'Laptop A', 'Laptop B'):
+            baker.make(Product, name=name)
+        baker.make(Product, name='Laptop Sleeve for Large Screens', subcategory=laptops)
+
+        assert fuzzy(api_client, 'laptop', subcategory_id=laptops.id) == ['Laptop Sleeve for Large Screens']
+
+    def test_if_results_are_capped_after_filtering(self, api_client, monkeypatch):
+        monkeypatch.setattr('products.fuzzy.MAX_CANDIDATES', 2)
+        for name in ('Laptop', 'Laptops', 'Laptop Stand for Large Desks'):
+            baker.make(Product, name=name)
+
+        assert fuzzy(api_client, 'laptop') == ['Laptop', 'Laptop Stand for Large Desks']
+
+    def test_if_search_applies_before_the_cap(self, api_client, monkeypatch):
+        monkeypatch.setattr('products.fuzzy.MAX_CANDIDATES', 2)
+        for name in ('Laptop', 'Laptop A', 'Laptop B'):
+            baker.make(Product, name=name)
+        baker.make(Product, name='Laptop Sleeve for Large Screens', description='Waterproof neoprene')
+
+        assert fuzzy(api_client, 'laptop', search='neoprene') == ['Laptop Sleeve for Large Screens']
+
+    def test_if_facets_count_search_and_fuzzy_like_the_list(self, api_client, monkeypatch):
+        monkeypatch.setattr('products.fuzzy.MAX_CANDIDATES', 2)
+        category = baker.make(Category)
+        for name in ('Laptop', 'Laptop A', 'Laptop B'):
+            baker.make(Product, name=name)
+        baker.make(Product, name='Laptop Sleeve for Large Screens', description='Waterproof neoprene', category=category)
+
+        response = api_client.get('/api/products/facets/', {'fuzzy': 'laptop', 'search': 'neoprene'})
+
+        assert [row['count'] for row in response.data['categories']] == [1]
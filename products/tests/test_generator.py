@@ -0,0 +1,75 @@
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from products.models import Category, SubCategory, Product
+from products.generator import CatalogGenerator
+from carts.models import Cart
+from orders.models import Order, OrderItem
+from reviews.models import Review
+from customuser.models import CustomUser
+
+import pytest
+
+TAXONOMY = {'Electronics': ['Phones', 'Laptops'], 'Books': ['Fiction']}
+
+
+@pytest.mark.django_db
+class TestCatalogGenerator:
+    def test_if_taxonomy_is_resolved_without_duplicates(self):
+        Category.objects.create(name='Books')
+
+        resolved = CatalogGenerator().resolve_taxonomy(TAXONOMY)
+
+        assert set(resolved) == {('Electronics', 'Phones'), ('Electronics', 'Laptops'), ('Books', 'Fiction')}
+        assert Category.objects.count() == 2
+        assert SubCategory.objects.count() == 3
+
+    def test_if_products_are_created_per_subcategory(self):
+        generator = CatalogGenerator()
+
+        assert generator.generate_products(TAXONOMY, 4) == 12
+        assert Product.objects.filter(subcategory__name='Phones', category__name='Electronics').count() == 4
+
+    def test_if_query_count_does_not_grow_with_products(self):
+        with CaptureQueriesContext(connection) as queries:
+            CatalogGenerator(batch_size=100).generate_products(TAXONOMY, 20)
+
+        assert Product.objects.count() == 60
+        assert len(queries) <= 10
+
+    def test_if_same_seed_generates_same_data(self):
+        def generate():
+            generator = CatalogGenerator(seed=7)
+            generator.generate_products(TAXONOMY, 3)
+            generator.generate_users(2)
+            generator.generate_orders(2)
+            return sorted(Product.objects.values_list('pk', 'name', 'price')), \
+                sorted(OrderItem.objects.values_list('pk', 'product_id', 'quantity'))
+
+        first = generate()
+        for model in (Order, Product, SubCategory, Category, CustomUser):
+            model.objects.all().delete()
+
+        assert generate() == first
+
+    def test_if_reviews_carts_and_orders_reference_generated_rows(self):
+        generator = CatalogGenerator(seed=1)
+        generator.generate_products(TAXONOMY, 5)
+        generator.generate_users(10)
+
+        reviews = generator.generate_reviews(3)
+        generator.generate_carts(2)
+        generator.generate_orders(2)
+
+        assert Review.objects.count() == reviews
+        assert Cart.objects.count() == 10
+        assert all(item.price == item.product.price for item in OrderItem.objects.select_related('product'))
+        reviewed = Product.objects.filter(review_count__gt=0).first()
+        assert reviewed.review_count == Review.objects.filter(product=reviewed).count()
+
+    def test_if_command_generates_dataset(self):
+        call_command('manualcreate', '1', '--products', '--users', '3', '--orders', '1', '--seed', '3')
+
+        assert Product.objects.count() == SubCategory.objects.count()
+        assert Cart.objects.count() == 0
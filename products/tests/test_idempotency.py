@@ -0,0 +1,117 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from customuser.models import CustomUser
+from orders.models import Order
+from payments.paystack import Paystack
+from products.models import Product
+from shoplit.idempotency import _cache_key
+
+
+@pytest.fixture
+def user(api_client):
+    user = baker.make(CustomUser)
+    api_client.force_authenticate(user=user)
+    return user
+
+
+@pytest.fixture
+def product():
+    return baker.make(Product, price=Decimal('10.00'), stock_quantity=10)
+
+
+def post_order(api_client, user, product, key, quantity=1):
+    return api_client.post(
+        '/api/orders/', {'user': user.pk, 'items': [{'product': str(product.pk), 'quantity': quantity}]},
+        format='json', HTTP_IDEMPOTENCY_KEY=key,
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('enable_caching')
+class TestOrderIdempotency:
+    def test_if_retry_replays_first_response_without_queries(self, api_client, user, product):
+        first = post_order(api_client, user, product, 'order-1')
+
+        with CaptureQueriesContext(connection) as queries:
+            retry = post_order(api_client, user, product, 'order-1')
+
+        assert first.status_code == retry.status_code == 201
+        assert retry.data == first.data
+        assert retry['Idempotent-Replayed'] == 'true'
+        assert not [query for query in queries if 'orders_order' in query['sql'] or 'products_product' in query['sql']]
+        assert Order.objects.count() == 1
+        assert Product.objects.get(pk=product.pk).stock_quantity == 9
+
+    def test_if_different_keys_create_separate_orders(self, api_client, user, product):
+        post_order(api_client, user, product, 'order-1')
+        post_order(api_client, user, product, 'order-2')
+
+        assert Order.objects.count() == 2
+
+    def test_if_keys_are_scoped_to_users(self, api_client, user, product):
+        post_order(api_client, user, product, 'order-1')
+        other = baker.make(CustomUser)
+        api_client.force_authenticate(user=other)
+
+        response = post_order(api_client, other, product, 'order-1')
+
+        assert response.status_code == 201
+        assert 'Idempotent-Replayed' not in response
+        assert Order.objects.count() == 2
+
+    def test_if_reused_key_with_different_body_returns_422(self, api_client, user, product):
+        post_order(api_client, user, product, 'order-1')
+
+        response = post_order(api_client, user, product, 'order-1', quantity=2)
+
+        assert response.status_code == 422
+        assert Order.objects.count() == 1
+
+    def test_if_request_in_progress_returns_409(self, api_client, user, product):
+        request = SimpleNamespace(user=user, method='POST', path='/api/orders/')
+        cache.add(f"{_cache_key(request, 'order-1')}:lock", True)
+
+        response = post_order(api_client, user, product, 'order-1')
+
+        assert response.status_code == 409
+        assert not Order.objects.exists()
+
+    def test_if_failed_request_can_be_retried(self, api_client, user, product):
+        first = post_order(api_client, user, product, 'order-1', quantity=11)
+        Product.objects.filter(pk=product.pk).update(stock_quantity=20)
+
+        retry = post_order(api_client, user, product, 'order-1', quantity=11)
+
+        assert first.status_code == 400
+        assert retry.status_code == 201
+
+    def test_if_overlong_key_returns_400(self, api_client, user, product):
+        assert post_order(api_client, user, product, 'k' * 256).status_code == 400
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('enable_caching')
+def test_payment_initialization_calls_paystack_once(api_client, user, monkeypatch):
+    calls = []
+
+    def initialize_payment(self, email, amount):
+        calls.append(amount)
+        return {'status': False, 'message': 'Declined'}
+
+    monkeypatch.setattr(Paystack, 'initialize_payment', initialize_payment)
+    order = Order.objects.bulk_create([Order(user=user, total_amount=Decimal('12.50'))])[0]
+
+    responses = [
+        api_client.post(f'/api/payments/initialize/{order.pk}/', HTTP_IDEMPOTENCY_KEY='pay-1') for _ in range(3)
+    ]
+
+    assert [response.status_code for response in responses] == [400, 400, 400]
+    assert responses[2].data == {'error': 'Declined'}
+    assert calls == [1250]
@@ -0,0 +1,171 @@
+import io
+import json
+
+from rest_framework import status
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from products.models import Product, Category, SubCategory, ProductImage
+from products.importer import import_products
+from customuser.models import CustomUser
+
+import pytest
+from model_bakery import baker
+from decimal import Decimal
+
+
+@pytest.fixture
+def phones():
+    return baker.make(SubCategory, name='Phones', category=baker.make(Category, name='Electronics'))
+
+
+def csv_file(*rows):
+    return io.StringIO('\n'.join(['name,price,stock_quantity,subcategory,category,images', *rows]) + '\n')
+
+
+@pytest.mark.django_db
+class TestImportProducts:
+    def test_if_import_creates_and_updates_products(self, phones):
+        existing = baker.make(Product, name='Pixel', subcategory=phones, price=100)
+
+        report = import_products(csv_file(
+            'Pixel,150,4,Phones,,',
+            'Galaxy,200,7,phones,,a.jpg|b.jpg',
+        ))
+
+        assert (report.created, report.updated, report.failed) == (1, 1, 0)
+        existing.refresh_from_db()
+        assert existing.price == Decimal('150')
+        galaxy = Product.objects.get(name='Galaxy')
+        assert galaxy.category_id == phones.category_id
+        assert galaxy.stock_quantity == 7
+        assert ProductImage.objects.filter(product=galaxy).count() == 2
+
+    def test_if_images_are_added_to_updated_products(self, phones):
+        existing = baker.make(Product, name='Pixel', subcategory=phones, price=100)
+        baker.make(ProductImage, product=existing, image='a.jpg')
+
+        import_products(csv_file('Pixel,150,4,Phones,,a.jpg|b.jpg'))
+
+        assert ProductImage.objects.filter(product=existing).count() == 2
+        assert ProductImage.objects.filter(product=existing, image='b.jpg').exists()
+
+    def test_if_invalid_rows_are_reported_and_skipped(self, phones):
+        report = import_products(csv_file(
+            'Pixel,cheap,4,Phones,,',
+            'Galaxy,200,7,Tablets,,',
+            'Nokia,50,1,Phones,,',
+        ))
+
+        assert (report.created, report.failed) == (1, 2)
+        assert [error['row'] for error in report.errors] == [2, 3]
+        assert 'price' in report.errors[0]['errors']
+        assert 'subcategory' in report.errors[1]['errors']
+        assert list(Product.objects.values_list('name', flat=True)) == ['Nokia']
+
+    def test_if_ambiguous_subcategory_needs_category(self, phones):
+        baker.make(SubCategory, name='Phones', category=baker.make(Category, name='Toys'))
+
+        report = import_products(csv_file('Pixel,10,1,Phones,,', 'Galaxy,10,1,Phones,toys,'))
+
+        assert report.failed == 1
+        assert Product.objects.get().subcategory.category.name == 'Toys'
+
+    def test_if_jsonl_rows_are_imported(self, phones):
+        stream = io.StringIO('\n'.join([
+            json.dumps({'name': 'Pixel', 'price': '9.99', 'subcategory': str(phones.id), 'images': ['a.jpg']}),
+            '',
+            '{not json',
+            '[1, 2]',
+        ]))
+
+        report = import_products(stream, format='jsonl')
+
+        assert (report.created, report.failed) == (1, 2)
+        assert [error['row'] for error in report.errors] == [3, 4]
+
+    def test_if_queries_do_not_grow_with_rows(self, phones):
+        rows = [f'Product {i},10,1,Phones,,' for i in range(50)]
+
+        with CaptureQueriesContext(connection) as queries:
+            import_products(csv_file(*rows), batch_size=50)
+
+        # Subcategory map, existing lookup, savepoint, product and image inserts, release
+        assert len(queries) <= 6
+        assert Product.objects.count() == 50
+
+    def test_if_command_imports_file(self, phones, tmp_path):
+        path = tmp_path / 'products.csv'
+        path.write_text(csv_file('Pixel,10,1,Phones,,').getvalue())
+
+        call_command('import_products', str(path), '--batch-size', '10')
+
+        assert Product.objects.filter(name='Pixel').exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('enable_caching')
+def test_if_imported_names_reach_name_indexes(api_client, phones, settings, django_capture_on_commit_callbacks):
+    settings.NAME_INDEX_SYNC_INTERVAL = 3600
+    baker.make(Product, name='Pixel', subcategory=phones)
+    # Builds the suggest and trigram indexes
+    api_client.get('/api/products/suggest/', {'q': 'pix'})
+    api_client.get('/api/products/', {'fuzzy': 'pixel'})
+
+    with django_capture_on_commit_callbacks(execute=True):
+        import_products(csv_file('Galaxy,200,7,Phones,,'))
+
+    suggestions = api_client.get('/api/products/suggest/', {'q': 'gal'}).data
+    assert [suggestion['name'] for suggestion in suggestions] == ['Galaxy']
+    assert [product['name'] for product in api_client.get('/api/products/', {'fuzzy': 'galaxy'}).data['results']] == ['Galaxy']
+
+
+@pytest.mark.django_db
+class TestImportProductsEndpoint:
+    def test_if_user_is_not_admin_returns_403(self, api_client):
+        api_client.force_authenticate(user=CustomUser(is_staff=False))
+
+        response = api_client.post('/api/products/import/', {}, format='multipart')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_if_upload_returns_report(self, api_client, phones):
+        api_client.force_authenticate(user=CustomUser(is_staff=True))
+        upload = SimpleUploadedFile('products.csv', csv_file('Pixel,10,1,Phones,,', 'Bad,x,1,Phones,,').getvalue().encode())
+
+        response = api_client.post('/api/products/import/', {'file': upload}, format='multipart')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['created'] == 1
+        assert response.data['failed'] == 1
+        assert response.data['errors'][0]['row'] == 3
+
+    def test_if_unexpected_error_is_not_reported_as_bad_input(self, api_client, phones, monkeypatch):
+        def broken(*args, **kwargs):
+            raise ValueError("bug")
+        monkeypatch.setattr('products.views.import_products', broken)
+        api_client.force_authenticate(user=CustomUser(is_staff=True))
+        upload = SimpleUploadedFile('products.csv', csv_file('Pixel,10,1,Phones,,').getvalue().encode())
+
+        response = api_client.post('/api/products/import/', {'file': upload}, format='multipart')
+
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+
+    def test_if_file_is_not_utf8_returns_400(self, api_client, phones):
+        api_client.force_authenticate(user=CustomUser(is_staff=True))
+        upload = SimpleUploadedFile('products.csv', 'name,price\nCaf\u00e9,10\n'.encode('latin-1'))
+
+        response = api_client.post('/api/products/import/', {'file': upload}, format='multipart')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'file' in response.data
+
+    def test_if_unknown_format_returns_400(self, api_client):
+        api_client.force_authenticate(user=CustomUser(is_staff=True))
+        upload = SimpleUploadedFile('products.xml', b'<products/>')
+
+        response = api_client.post('/api/products/import/', {'file': upload, 'format': 'xml'}, format='multipart')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,157 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+from model_bakery import baker
+
+from customuser.models import CustomUser, Vendor
+from orders.export import stream_export
+from orders.models import Order, OrderItem
+from products.models import Product
+
+URL = '/api/orders/export/'
+
+
+@pytest.fixture
+def staff(api_client):
+    user = baker.make(CustomUser, is_staff=True)
+    api_client.force_authenticate(user=user)
+    return user
+
+
+@pytest.fixture
+def orders():
+    """
+    Three orders a day apart in January 2026, the last one shipped; the
+    first has an item from each of two vendors.
+    """
+    customer = baker.make(CustomUser, email='buyer@example.com')
+    acme, globex = baker.make(Vendor, store_name='Acme'), baker.make(Vendor, store_name='Globex')
+    anvil = baker.make(Product, name='Anvil', price=Decimal('12.50'), vendor=acme)
+    rocket = baker.make(Product, name='Rocket', price=Decimal('99.99'), vendor=globex)
+
+    orders = Order.objects.bulk_create([Order(user=customer) for _ in range(3)])
+    start = timezone.make_aware(datetime(2026, 1, 10, 9, 30))
+    for day, order in enumerate(orders):
+        order.created_at = start + timedelta(days=day)
+    orders[2].status = 'SHIPPED'
+    Order.objects.bulk_update(orders, ['created_at', 'status'])
+    OrderItem.objects.bulk_create([
+        OrderItem(order=orders[0], product=anvil, quantity=2, price=anvil.price),
+        OrderItem(order=orders[0], product=rocket, quantity=1, price=rocket.price),
+        OrderItem(order=orders[1], product=anvil, quantity=1, price=anvil.price),
+        OrderItem(order=orders[2], product=rocket, quantity=3, price=rocket.price),
+    ])
+    Order.objects.refresh_totals()
+    return {'orders': orders, 'acme': acme, 'globex': globex}
+
+
+def read_csv(response):
+    return list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+
+@pytest.mark.django_db
+class TestOrderExport:
+    def test_orders_csv(self, api_client, staff, orders):
+        response = api_client.get(URL)
+
+        assert response.status_code == 200
+        assert response.streaming
+        assert response['Content-Type'] == 'text/csv; charset=utf-8'
+        assert response['Content-Disposition'].startswith('attachment; filename="orders-')
+        rows = read_csv(response)
+        assert [row['order_id'] for row in rows] == [str(order.pk) for order in orders['orders']]
+        assert rows[0]['customer_email'] == 'buyer@example.com'
+        assert rows[0]['item_count'] == '3'
+        assert rows[0]['total_amount'] == '124.99'
+        assert rows[0]['created_at'] == '2026-01-10T09:30:00+00:00'
+
+    def test_items_csv(self, api_client, staff, orders):
+        rows = read_csv(api_client.get(URL, {'rows': 'items'}))
+
+        assert len(rows) == 4
+        first = rows[0]
+        assert first['order_id'] == str(orders['orders'][0].pk)
+        assert first['vendor_name'] in ('Acme', 'Globex')
+        assert {(row['product_name'], row['quantity'], row['line_total']) for row in rows[:2]} == {
+            ('Anvil', '2', '25.00'), ('Rocket', '1', '99.99'),
+        }
+
+    def test_jsonl(self, api_client, staff, orders):
+        response = api_client.get(URL, {'rows': 'items', 'output': 'jsonl'})
+
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        assert len(rows) == 4
+        assert rows[-1]['order_status'] == 'SHIPPED'
+        # Numbers, like the API's decimals
+        assert rows[-1]['unit_price'] == 99.99
+        assert rows[-1]['line_total'] == 299.97
+        assert rows[-1]['vendor_id'] == str(orders['globex'].pk)
+
+    def test_gzip(self, api_client, staff, orders):
+        response = api_client.get(URL, {'gzip': 'true'})
+
+        assert response['Content-Type'] == 'application/gzip'
+        assert response['Content-Disposition'].endswith('.csv.gz"')
+        content = gzip.decompress(b''.join(response.streaming_content)).decode()
+        assert len(list(csv.DictReader(io.StringIO(content)))) == 3
+
+    def test_date_range(self, api_client, staff, orders):
+        # Bare dates are midnight, created_before is exclusive
+        rows = read_csv(api_client.get(URL, {'created_after': '2026-01-11', 'created_before': '2026-01-12'}))
+
+        assert [row['order_id'] for row in rows] == [str(orders['orders'][1].pk)]
+
+    def test_status(self, api_client, staff, orders):
+        rows = read_csv(api_client.get(URL, {'rows': 'items', 'status': 'SHIPPED'}))
+
+        assert [row['order_id'] for row in rows] == [str(orders['orders'][2].pk)]
+
+    def test_vendor_filters_items(self, api_client, staff, orders):
+        rows = read_csv(api_client.get(URL, {'rows': 'items', 'vendor': orders['acme'].pk}))
+
+        assert [row['product_name'] for row in rows] == ['Anvil', 'Anvil']
+
+    def test_vendor_lists_each_order_once(self, api_client, staff, orders):
+        rows = read_csv(api_client.get(URL, {'vendor': orders['globex'].pk}))
+
+        assert [row['order_id'] for row in rows] == [str(orders['orders'][0].pk), str(orders['orders'][2].pk)]
+
+    @pytest.mark.parametrize('params', [
+        {'rows': 'products'},
+        {'output': 'xlsx'},
+        {'status': 'LOST'},
+        {'vendor': 'acme'},
+        {'created_after': 'yesterday'},
+        {'created_after': '2026-02-01', 'created_before': '2026-01-01'},
+    ])
+    def test_invalid_params(self, api_client, staff, params):
+        response = api_client.get(URL, params)
+
+        assert response.status_code == 400
+
+    def test_staff_only(self, api_client):
+        assert api_client.get(URL).status_code == 401
+        api_client.force_authenticate(user=baker.make(CustomUser))
+        assert api_client.get(URL).status_code == 403
+
+    def test_streams_in_chunks(self, orders, django_assert_num_queries):
+        blocks = stream_export('items', 'csv', {}, chunk_size=1)
+
+        # Nothing is read until the stream is consumed
+        with django_assert_num_queries(1):
+            blocks = list(blocks)
+        # The header, then one block per chunk
+        assert len(blocks) == 5
+
+    def test_empty_export_has_header(self, api_client, staff):
+        content = b''.join(api_client.get(URL, {'rows': 'items'}).streaming_content).decode()
+
+        assert content.strip().split(',')[0] == 'order_id'
@@ -0,0 +1,109 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+
+from customuser.models import CustomUser
+from orders.models import Order, OrderItem
+from products.models import Product
+
+
+@pytest.fixture
+def user(api_client):
+    user = baker.make(CustomUser)
+    api_client.force_authenticate(user=user)
+    return user
+
+
+def make_orders(user, count, items=1):
+    """
+    Orders created a minute apart, oldest first; every pair shares a timestamp.
+    """
+    start = timezone.now() - timedelta(days=1)
+    orders = Order.objects.bulk_create([Order(user=user) for _ in range(count)])
+    for number, order in enumerate(orders):
+        order.created_at = start + timedelta(minutes=number // 2)
+    Order.objects.bulk_update(orders, ['created_at'])
+    product = baker.make(Product, price=Decimal('5.00'))
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=product, quantity=1, price=Decimal('5.00'))
+        for order in orders for _ in range(items)
+    ])
+    Order.objects.filter(user=user).refresh_totals()
+    return orders
+
+
+def table_queries(queries, table):
+    return [query['sql'] for query in queries if f'FROM "{table}"' in query['sql']]
+
+
+@pytest.mark.django_db
+class TestOrderHistory:
+    def test_if_pages_walk_newest_first_on_created_at_and_id(self, api_client, user):
+        orders = make_orders(user, 7)
+        expected = [str(order.pk) for order in sorted(orders, key=lambda order: (order.created_at, order.pk), reverse=True)]
+
+        seen, url, params = [], '/api/orders/', {'page_size': 3}
+        while url:
+            response = api_client.get(url, params)
+            assert response.status_code == 200
+            assert 'count' not in response.data
+            seen += [order['id'] for order in response.data['results']]
+            url, params = response.data['next'], None
+
+        assert seen == expected
+
+    def test_if_previous_link_returns_to_first_page(self, api_client, user):
+        make_orders(user, 5)
+        first = api_client.get('/api/orders/', {'page_size': 2})
+
+        second = api_client.get(first.data['next'])
+        back = api_client.get(second.data['previous'])
+
+        assert [order['id'] for order in back.data['results']] == [order['id'] for order in first.data['results']]
+
+    def test_if_other_users_orders_are_hidden(self, api_client, user):
+        make_orders(baker.make(CustomUser), 2)
+        make_orders(user, 1)
+
+        response = api_client.get('/api/orders/')
+
+        assert len(response.data['results']) == 1
+
+    def test_if_page_queries_do_not_grow_with_orders_or_items(self, api_client, user):
+        make_orders(user, 10, items=3)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/api/orders/', {'page_size': 10, 'expand': 'items.product'})
+
+        assert len(response.data['results']) == 10
+        assert response.data['results'][0]['total_amount'] == Decimal('15.00')
+        assert len(table_queries(queries, 'orders_order')) == 1
+        assert len(table_queries(queries, 'orders_orderitem')) == 1
+        assert not table_queries(queries, 'products_product')
+
+    def test_if_summary_skips_items(self, api_client, user):
+        make_orders(user, 3, items=2)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/api/orders/', {'summary': 'true'})
+
+        assert response.data['results'][0] == {
+            'id': response.data['results'][0]['id'],
+            'status': 'PENDING',
+            'created_at': response.data['results'][0]['created_at'],
+            'updated_at': response.data['results'][0]['updated_at'],
+            'item_count': 2,
+            'subtotal': Decimal('10.00'),
+            'total_amount': Decimal('10.00'),
+        }
+        assert not table_queries(queries, 'orders_orderitem')
+
+    def test_if_unsupported_ordering_returns_400(self, api_client, user):
+        response = api_client.get('/api/orders/', {'ordering': 'total_amount'})
+
+        assert response.status_code == 400
@@ -0,0 +1,115 @@
+from decimal import Decimal
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from customuser.models import CustomUser
+from orders.models import Order, OrderItem
+from products.models import Product
+
+
+@pytest.fixture
+def user(api_client):
+    user = baker.make(CustomUser)
+    api_client.force_authenticate(user=user)
+    return user
+
+
+def post_order(api_client, user, items):
+    return api_client.post('/api/orders/', {'user': user.pk, 'items': items}, format='json')
+
+
+@pytest.mark.django_db
+class TestCreateOrder:
+    def test_if_duplicate_products_are_merged_and_priced(self, api_client, user):
+        lamp = baker.make(Product, price=Decimal('10.00'), stock_quantity=5)
+        mug = baker.make(Product, price=Decimal('2.50'), stock_quantity=5)
+
+        response = post_order(api_client, user, [
+            {'product': str(lamp.pk), 'quantity': 1},
+            {'product': str(mug.pk), 'quantity': 2},
+            {'product': str(lamp.pk), 'quantity': 2},
+        ])
+
+        assert response.status_code == 201
+        items = {item.product_id: item for item in OrderItem.objects.filter(order_id=response.data['id'])}
+        assert (items[lamp.pk].quantity, items[lamp.pk].price) == (3, Decimal('10.00'))
+        assert (items[mug.pk].quantity, items[mug.pk].price) == (2, Decimal('2.50'))
+        assert response.data['total_amount'] == Decimal('35.00')
+        assert Product.objects.get(pk=lamp.pk).stock_quantity == 2
+
+    def test_if_query_count_does_not_grow_with_items(self, api_client, user):
+        products = baker.make(Product, stock_quantity=5, _quantity=12)
+
+        def count_queries(products):
+            with CaptureQueriesContext(connection) as queries:
+                response = post_order(api_client, user, [{'product': str(p.pk), 'quantity': 1} for p in products])
+            assert response.status_code == 201
+            return len(queries)
+
+        assert count_queries(products[:1]) == count_queries(products[1:12])
+
+    def test_if_unknown_product_returns_400(self, api_client, user):
+        product = baker.make(Product, stock_quantity=5)
+
+        response = post_order(api_client, user, [
+            {'product': str(product.pk), 'quantity': 1},
+            {'product': '00000000-0000-4000-8000-000000000000', 'quantity': 1},
+        ])
+
+        assert response.status_code == 400
+        assert 'does not exist' in str(response.data['items'])
+        assert not Order.objects.exists()
+        assert Product.objects.get(pk=product.pk).stock_quantity == 5
+
+    @pytest.mark.parametrize('item', [{'product': 'not-a-uuid', 'quantity': 1}, {'quantity': 0}])
+    def test_if_invalid_items_return_400(self, api_client, user, item):
+        item.setdefault('product', str(baker.make(Product, stock_quantity=5).pk))
+
+        response = post_order(api_client, user, [item])
+
+        assert response.status_code == 400
+        assert not Order.objects.exists()
+
+
+@pytest.mark.django_db
+def test_if_update_adds_to_existing_items(api_client, user):
+    lamp = baker.make(Product, price=Decimal('10.00'), stock_quantity=10)
+    mug = baker.make(Product, price=Decimal('2.50'), stock_quantity=10)
+    response = post_order(api_client, user, [{'product': str(lamp.pk), 'quantity': 1}])
+    Product.objects.filter(pk=lamp.pk).update(price=Decimal('12.00'))
+
+    response = api_client.patch(f"/api/orders/{response.data['id']}/", {'items': [
+        {'product': str(lamp.pk), 'quantity': 2}, {'product': str(mug.pk), 'quantity': 1},
+    ]}, format='json')
+
+    assert response.status_code == 200
+    items = {item.product_id: item for item in OrderItem.objects.filter(order_id=response.data['id'])}
+    assert (items[lamp.pk].quantity, items[lamp.pk].price) == (3, Decimal('12.00'))
+    assert items[mug.pk].quantity == 1
+    assert Product.objects.get(pk=lamp.pk).stock_quantity == 7
+
+
+@pytest.mark.django_db
+def test_if_migration_turns_legacy_line_totals_into_unit_prices(user):
+    migration = import_module('orders.migrations.0010_orderitem_unit_prices')
+    order = Order.objects.create(user=user)
+    # Written before unit prices: line totals of a 2.50 and a 10.00 product
+    items = OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=baker.make(Product), quantity=3, price=Decimal('7.50')),
+        OrderItem(order=order, product=baker.make(Product), quantity=1, price=Decimal('10.00')),
+        OrderItem(order=order, product=baker.make(Product), quantity=2, price=None),
+    ])
+
+    migration.line_totals_to_unit_prices(apps, None)
+
+    prices = dict(OrderItem.objects.values_list('pk', 'price'))
+    assert [prices[item.pk] for item in items] == [Decimal('2.50'), Decimal('10.00'), None]
+
+    migration.unit_prices_to_line_totals(apps, None)
+
+    assert OrderItem.objects.get(pk=items[0].pk).price == Decimal('7.50')
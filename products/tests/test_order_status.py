@@ -0,0 +1,195 @@
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from customuser.models import CustomUser
+from notifications.models import Notifications
+from orders import outbox, status as order_status
+from orders.models import Order, OrderItem, OrderStatusHistory, OutboxMessage
+from orders.status import InvalidTransition, transition_order, transition_orders
+from orders.tasks import send_status_notifications
+from products.models import Product
+
+URL = '/api/orders/transition/'
+
+
+@pytest.fixture
+def customer():
+    return baker.make(CustomUser)
+
+
+def make_orders(user, *statuses):
+    orders = Order.objects.bulk_create([Order(user=user, status=status) for status in statuses])
+    return [order.pk for order in orders]
+
+
+def statuses(pks):
+    current = dict(Order.objects.filter(pk__in=pks).values_list('pk', 'status'))
+    return [current[pk] for pk in pks]
+
+
+@pytest.mark.django_db
+class TestTransitionOrders:
+    def test_if_allowed_orders_move_and_others_are_rejected(self, customer):
+        pks = make_orders(customer, 'PENDING', 'PAID', 'DELIVERED', 'SHIPPED')
+
+        result = transition_orders(pks, 'CANCELLED')
+
+        assert statuses(pks) == ['CANCELLED', 'CANCELLED', 'DELIVERED', 'SHIPPED']
+        assert result.moved == {'PENDING': [pks[0]], 'PAID': [pks[1]]}
+        assert result.rejected == {pks[2]: 'DELIVERED', pks[3]: 'SHIPPED'}
+        assert result.missing == []
+
+    def test_if_one_update_per_source_status(self, customer):
+        pks = make_orders(customer, *['PENDING'] * 50, *['PAID'] * 50)
+
+        with CaptureQueriesContext(connection) as queries:
+            transition_orders(pks, 'CANCELLED')
+
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "orders_order"')]
+        assert len(updates) == 2
+        assert OrderStatusHistory.objects.count() == 100
+
+    def test_if_history_records_each_move(self, customer):
+        staff = baker.make(CustomUser, is_staff=True)
+        pks = make_orders(customer, 'PENDING', 'PAID')
+
+        transition_orders(pks, 'CANCELLED', changed_by=staff)
+
+        history = OrderStatusHistory.objects.order_by('from_status').values_list(
+            'order_id', 'from_status', 'to_status', 'changed_by',
+        )
+        assert list(history) == [
+            (pks[1], 'PAID', 'CANCELLED', staff.pk),
+            (pks[0], 'PENDING', 'CANCELLED', staff.pk),
+        ]
+
+    def test_if_order_already_in_target_is_rejected(self, customer):
+        pks = make_orders(customer, 'SHIPPED')
+
+        result = transition_orders(pks, 'SHIPPED')
+
+        assert result.rejected == {pks[0]: 'SHIPPED'}
+        assert not OrderStatusHistory.objects.exists()
+
+    def test_if_unknown_ids_are_missing(self, customer):
+        pks = make_orders(customer, 'PENDING')
+        unknown = uuid.uuid4()
+
+        result = transition_orders([str(pks[0]), unknown], 'PAID')
+
+        assert result.moved == {'PENDING': [pks[0]]}
+        assert result.missing == [unknown]
+
+    def test_if_unknown_status_raises(self, customer):
+        with pytest.raises(ValueError):
+            transition_orders(make_orders(customer, 'PENDING'), 'LOST')
+
+    def test_if_cancelling_releases_stock(self, customer):
+        product = baker.make(Product, price=Decimal('3.00'), stock_quantity=10)
+        pks = make_orders(customer, 'PENDING', 'PAID', 'SHIPPED')
+        OrderItem.objects.bulk_create([
+            OrderItem(order_id=pk, product=product, quantity=2, price=product.price) for pk in pks
+        ])
+
+        transition_orders(pks, 'CANCELLED')
+
+        product.refresh_from_db()
+        # The shipped order can't be cancelled, so its items stay sold
+        assert product.stock_quantity == 14
+
+    def test_if_notifications_are_published_in_batches(self, customer, settings):
+        settings.ORDER_STATUS_NOTIFY_BATCH_SIZE = 2
+        # Orders are locked, and so moved, in pk order
+        pks = sorted(make_orders(customer, 'PAID', 'PAID', 'PAID'))
+        OutboxMessage.objects.all().delete()
+
+        transition_orders(pks, 'PROCESSING')
+
+        messages = list(OutboxMessage.objects.order_by('id').values_list('task', 'args'))
+        assert messages == [
+            (order_status.NOTIFY_TASK, [[str(pk) for pk in pks[:2]], 'PROCESSING']),
+            (order_status.NOTIFY_TASK, [[str(pks[2])], 'PROCESSING']),
+        ]
+
+    def test_if_notifications_are_queued_after_commit(self, customer, monkeypatch, django_capture_on_commit_callbacks):
+        queued = []
+        monkeypatch.setattr(outbox, 'async_task', lambda task, *args: queued.append(task))
+        pks = make_orders(customer, 'PENDING')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            transition_orders(pks, 'PAID')
+            assert queued == []
+
+        assert queued == [outbox.RELAY_TASK]
+
+    def test_if_single_transition_raises_when_not_allowed(self, customer):
+        order = Order.objects.get(pk=make_orders(customer, 'DELIVERED')[0])
+
+        with pytest.raises(InvalidTransition):
+            transition_order(order, 'PAID')
+
+    def test_if_single_transition_updates_instance(self, customer):
+        order = Order.objects.get(pk=make_orders(customer, 'PENDING')[0])
+
+        transition_order(order, 'PAID')
+
+        assert order.status == 'PAID'
+
+
+@pytest.mark.django_db
+class TestStatusNotifications:
+    def test_if_task_notifies_each_customer(self, customer):
+        other = baker.make(CustomUser)
+        pks = make_orders(customer, 'SHIPPED') + make_orders(other, 'SHIPPED')
+
+        assert send_status_notifications([str(pk) for pk in pks], 'SHIPPED') == 2
+
+        notifications = Notifications.objects.order_by('message')
+        assert {notification.user_id for notification in notifications} == {customer.pk, other.pk}
+        assert all(notification.message.endswith('is now shipped.') for notification in notifications)
+
+    def test_if_task_skips_orders_that_moved_on(self, customer):
+        pks = make_orders(customer, 'DELIVERED')
+
+        assert send_status_notifications([str(pks[0])], 'SHIPPED') == 0
+
+
+@pytest.mark.django_db
+class TestOrderTransitionView:
+    def test_if_staff_moves_orders(self, api_client, customer):
+        api_client.force_authenticate(user=baker.make(CustomUser, is_staff=True))
+        pks = make_orders(customer, 'PROCESSING', 'PENDING')
+        missing = uuid.uuid4()
+
+        response = api_client.post(URL, {'orders': [*pks, missing], 'status': 'SHIPPED'}, format='json')
+
+        assert response.status_code == 200
+        assert response.data['updated'] == 1
+        assert response.data['moved'] == {'PROCESSING': [pks[0]]}
+        assert response.data['rejected'] == {pks[1]: 'PENDING'}
+        assert response.data['missing'] == [missing]
+        assert statuses(pks) == ['SHIPPED', 'PENDING']
+
+    @pytest.mark.parametrize('data', [
+        {'orders': [], 'status': 'SHIPPED'},
+        {'orders': ['not-a-uuid'], 'status': 'SHIPPED'},
+        {'orders': [str(uuid.uuid4())], 'status': 'LOST'},
+    ])
+    def test_if_invalid_data_returns_400(self, api_client, data):
+        api_client.force_authenticate(user=baker.make(CustomUser, is_staff=True))
+
+        assert api_client.post(URL, data, format='json').status_code == 400
+
+    def test_if_customer_cannot_transition(self, api_client, customer):
+        api_client.force_authenticate(user=customer)
+        pks = make_orders(customer, 'PENDING')
+
+        response = api_client.post(URL, {'orders': pks, 'status': 'PAID'}, format='json')
+
+        assert response.status_code == 403
+        assert statuses(pks) == ['PENDING']
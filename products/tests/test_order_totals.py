@@ -0,0 +1,114 @@
+from decimal import Decimal
+from importlib import import_module
+from io import StringIO
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from customuser.models import CustomUser
+from orders.models import Order, OrderItem
+from products.models import Product
+
+
+@pytest.fixture
+def user(api_client):
+    user = baker.make(CustomUser)
+    api_client.force_authenticate(user=user)
+    return user
+
+
+def totals(order):
+    order = Order.objects.get(pk=order.pk)
+    return order.subtotal, order.item_count, order.total_amount
+
+
+@pytest.mark.django_db
+class TestOrderTotals:
+    def test_if_created_order_stores_totals(self, api_client, user):
+        lamp = baker.make(Product, price=Decimal('10.00'), stock_quantity=5)
+        mug = baker.make(Product, price=Decimal('2.50'), stock_quantity=5)
+
+        response = api_client.post('/api/orders/', {'user': user.pk, 'items': [
+            {'product': str(lamp.pk), 'quantity': 2}, {'product': str(mug.pk), 'quantity': 3},
+        ]}, format='json')
+
+        assert response.status_code == 201
+        assert (response.data['subtotal'], response.data['item_count'], response.data['total_amount']) == (
+            Decimal('27.50'), 5, Decimal('27.50'))
+        assert totals(Order(pk=response.data['id'])) == (Decimal('27.50'), 5, Decimal('27.50'))
+
+    def test_if_single_item_writes_refresh_totals(self, user):
+        order = Order.objects.bulk_create([Order(user=user)])[0]
+        item = OrderItem.objects.create(order=order, product=baker.make(Product), quantity=2, price=Decimal('4.00'))
+        assert totals(order) == (Decimal('8.00'), 2, Decimal('8.00'))
+
+        item.delete()
+
+        assert totals(order) == (Decimal('0.00'), 0, Decimal('0.00'))
+
+    def test_if_saving_stale_order_keeps_totals(self, user):
+        order = Order.objects.bulk_create([Order(user=user)])[0]
+        stale = Order.objects.get(pk=order.pk)
+        OrderItem.objects.create(order=order, product=baker.make(Product), quantity=1, price=Decimal('4.00'))
+
+        stale.status = 'SHIPPED'
+        stale.save()
+
+        assert totals(order) == (Decimal('4.00'), 1, Decimal('4.00'))
+
+    def test_if_order_list_queries_do_not_grow_with_orders(self, api_client, user):
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = api_client.get('/api/orders/')
+            assert response.status_code == 200
+            return len(queries)
+
+        def add_order():
+            order = Order.objects.bulk_create([Order(user=user)])[0]
+            OrderItem.objects.bulk_create(
+                [OrderItem(order=order, product=baker.make(Product), quantity=1, price=1) for _ in range(2)]
+            )
+
+        add_order()
+        one_order = count_queries()
+        for _ in range(4):
+            add_order()
+
+        assert count_queries() == one_order
+
+
+@pytest.mark.django_db
+def test_backfill_order_totals_command():
+    users = baker.make(CustomUser, _quantity=3)
+    orders = Order.objects.bulk_create([Order(user=user) for user in users])
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=baker.make(Product), quantity=number + 1, price=Decimal('1.50'))
+        for number, order in enumerate(orders)
+    ])
+    out = StringIO()
+
+    call_command('backfill_order_totals', batch_size=2, stdout=out)
+
+    assert [totals(order)[1] for order in orders] == [1, 2, 3]
+    assert totals(orders[2]) == (Decimal('4.50'), 3, Decimal('4.50'))
+    assert 'Backfilled totals for 3 orders' in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_if_migration_backfills_order_totals():
+    migration = import_module('orders.migrations.0011_backfill_order_totals')
+    users = baker.make(CustomUser, _quantity=2)
+    orders = Order.objects.bulk_create([Order(user=user) for user in users])
+    OrderItem.objects.bulk_create([
+        OrderItem(order=orders[0], product=baker.make(Product), quantity=2, price=Decimal('1.50')),
+        OrderItem(order=orders[0], product=baker.make(Product), quantity=1, price=Decimal('4.00')),
+    ])
+
+    migration.backfill_order_totals(apps, None)
+
+    assert totals(orders[0]) == (Decimal('7.00'), 3, Decimal('7.00'))
+    assert totals(orders[1]) == (Decimal('0'), 0, Decimal('0'))
@@ -0,0 +1,81 @@
+import pytest
+from django.db import transaction
+from model_bakery import baker
+
+from customuser.models import CustomUser
+from orders import outbox
+from orders.models import Order, OutboxMessage
+from orders.tasks import send_order_sms
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    """
+    Tasks handed to the task queue, as (task, args) pairs.
+    """
+    calls = []
+    monkeypatch.setattr(outbox, 'async_task', lambda task, *args: calls.append((task, args)))
+    return calls
+
+
+@pytest.mark.django_db
+class TestOrderOutbox:
+    def test_if_order_writes_messages_and_queues_relay_after_commit(self, queued, django_capture_on_commit_callbacks):
+        user = baker.make(CustomUser)
+
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            order = Order.objects.create(user=user)
+            assert queued == []
+
+        assert list(OutboxMessage.objects.order_by('id').values_list('task', 'args')) == [
+            ('orders.tasks.send_order_notification', [str(user.id), str(order.id)]),
+            ('orders.tasks.send_order_sms', [str(order.id)]),
+        ]
+        assert len(callbacks) == 1
+        assert queued == [(outbox.RELAY_TASK, ())]
+
+    def test_if_rolled_back_order_leaves_no_messages(self, queued, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    Order.objects.create(user=baker.make(CustomUser))
+                    raise RuntimeError
+
+        assert not OutboxMessage.objects.exists()
+        assert callbacks == []
+        assert queued == []
+
+    def test_if_relay_enqueues_messages_in_batches(self, queued):
+        OutboxMessage.objects.bulk_create([OutboxMessage(task='app.tasks.task', args=[number]) for number in range(5)])
+
+        assert outbox.relay_outbox(batch_size=2) == 5
+
+        assert queued == [('app.tasks.task', (number,)) for number in range(5)]
+        assert not OutboxMessage.objects.exists()
+
+    def test_if_failed_relay_keeps_its_batch(self, monkeypatch):
+        OutboxMessage.objects.bulk_create([OutboxMessage(task='app.tasks.task', args=[1])])
+
+        def broker_down(task, *args):
+            raise ConnectionError
+
+        monkeypatch.setattr(outbox, 'async_task', broker_down)
+        with pytest.raises(ConnectionError):
+            outbox.relay_outbox()
+
+        assert OutboxMessage.objects.count() == 1
+
+    def test_if_unqueued_relay_does_not_fail_commit(self, monkeypatch):
+        def broker_down(task, *args):
+            raise ConnectionError
+
+        monkeypatch.setattr(outbox, 'async_task', broker_down)
+
+        outbox.queue_relay()
+
+
+@pytest.mark.django_db
+def test_if_order_sms_is_skipped_without_phone_number():
+    order = Order.objects.bulk_create([Order(user=baker.make(CustomUser, phone_number=None))])[0]
+
+    assert send_order_sms(str(order.id)) is None
@@ -0,0 +1,135 @@
+from rest_framework import status
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+import pytest
+from model_bakery import baker
+from decimal import Decimal
+from datetime import timedelta
+
+from products.models import Product, Category
+
+
+def make_products(count):
+    """
+    Products named '0'..'count-1', created one second apart in that order.
+    """
+    now = timezone.now()
+    products = []
+    for i in range(count):
+        product = baker.make(Product, name=str(i))
+        Product.objects.filter(pk=product.pk).update(created_at=now + timedelta(seconds=i))
+        products.append(product)
+    return products
+
+
+def collect(api_client, url):
+    names, pages = [], 0
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        names += [product['name'] for product in response.data['results']]
+        url = response.data['next']
+        pages += 1
+    return names, pages
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+    def test_if_cursor_pagination_returns_no_count(self, api_client):
+        baker.make(Product)
+
+        response = api_client.get('/api/products/?pagination=cursor')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert 'count' not in response.data
+        assert response.data['previous'] is None
+
+    def test_if_cursor_pagination_walks_newest_first(self, api_client):
+        products = make_products(7)
+
+        names, pages = collect(api_client, '/api/products/?pagination=cursor&page_size=3')
+
+        assert names == [product.name for product in reversed(products)]
+        assert pages == 3
+
+    def test_if_cursor_pagination_orders_by_price_with_ties(self, api_client):
+        for i in range(6):
+            baker.make(Product, name=str(i), price=Decimal(10 + i % 2))
+
+        names, _ = collect(api_client, '/api/products/?pagination=cursor&ordering=price&page_size=2')
+
+        expected = Product.objects.order_by('price', 'pk').values_list('name', flat=True)
+        assert names == list(expected)
+
+    def test_if_cursor_pagination_orders_by_price_descending(self, api_client):
+        for price in (5, 50, 20):
+            baker.make(Product, name=str(price), price=price)
+
+        names, _ = collect(api_client, '/api/products/?pagination=cursor&ordering=-price&page_size=1')
+
+        assert names == ['50', '20', '5']
+
+    def test_if_previous_link_returns_previous_page(self, api_client):
+        make_products(4)
+        first = api_client.get('/api/products/?pagination=cursor&page_size=2')
+        second = api_client.get(first.data['next'])
+
+        previous = api_client.get(second.data['previous'])
+
+        assert previous.data['results'] == first.data['results']
+        assert previous.data['previous'] is None
+
+    def test_if_cursor_pages_are_stable_under_inserts(self, api_client):
+        make_products(4)
+        first = api_client.get('/api/products/?pagination=cursor&page_size=2')
+
+        product = baker.make(Product, name='new')
+        Product.objects.filter(pk=product.pk).update(created_at=timezone.now() + timedelta(days=1))
+        second = api_client.get(first.data['next'])
+
+        assert [product['name'] for product in second.data['results']] == ['1', '0']
+
+    def test_if_cursor_pagination_keeps_filters(self, api_client):
+        category = baker.make(Category)
+        baker.make(Product, category=category, _quantity=3)
+        baker.make(Product, _quantity=3)
+
+        names, _ = collect(api_client, f'/api/products/?pagination=cursor&page_size=2&category_id={category.id}')
+
+        assert len(names) == 3
+
+    def test_if_unsupported_ordering_returns_400(self, api_client):
+        response = api_client.get('/api/products/?pagination=cursor&ordering=updated_at')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_if_invalid_cursor_returns_404(self, api_client):
+        response = api_client.get('/api/products/?cursor=invalid')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_if_cursor_from_other_ordering_returns_404(self, api_client):
+        baker.make(Product, _quantity=3)
+        response = api_client.get('/api/products/?pagination=cursor&page_size=1')
+
+        response = api_client.get(response.data['next'].replace('pagination=cursor', 'ordering=price'))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_if_cursor_page_is_a_range_scan_of_the_keyset_index(self, api_client):
+        make_products(3)
+        url = api_client.get('/api/products/?pagination=cursor&page_size=1').data['next']
+
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get(url)
+
+        page_query = next(query['sql'] for query in queries if 'LIMIT 2' in query['sql'])
+        # A bound on the ordering field alone leads the predicate
+        assert '"products_product"."created_at" <= ' in page_query
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {page_query}')
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        assert 'USING INDEX product_created_keyset_idx (created_at<?)' in plan
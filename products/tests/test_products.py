@@ -1,6 +1,8 @@
 from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
-from products.models import Product, Category, SubCategory
+from products.models import Product, Category, SubCategory, ProductImage
 from customuser.models import CustomUser
 
 import pytest
@@ -129,6 +131,20 @@ class TestListProducts:
 
         assert response.data['count'] > 0
 
+    @pytest.mark.parametrize('page_size', [1, 10, 50])
+    def test_if_list_products_runs_fixed_number_of_queries(self, api_client, page_size):
+        subcategory = baker.make(SubCategory)
+        products = baker.make(Product, subcategory=subcategory, _quantity=page_size)
+        for product in products:
+            baker.make(ProductImage, product=product, image='products/shop.jpg', _quantity=2)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(f'/api/products/?page_size={page_size}')
+
+        assert len(response.data['results']) == page_size
+        assert len(response.data['results'][0]['images']) == 2
+        assert len(queries) == 4  # validators, count, page, images
+
     def test_if_bad_filtered_products_returns_400(self, api_client):
         response = api_client.get(f'/api/products/?category_id=1')
 
@@ -0,0 +1,97 @@
+from django.core.management import call_command
+
+import pytest
+from model_bakery import baker
+
+from products.models import Product
+from reviews.models import Review
+
+
+@pytest.mark.django_db
+class TestProductRatings:
+    def test_if_new_product_has_no_rating(self):
+        product = baker.make(Product)
+
+        assert product.review_count == 0
+        assert product.average_rating == 0
+
+    def test_if_creating_reviews_updates_product_rating(self):
+        product = baker.make(Product)
+        baker.make(Review, product=product, rating=4)
+        baker.make(Review, product=product, rating=5)
+
+        product.refresh_from_db()
+
+        assert product.rating_sum == 9
+        assert product.review_count == 2
+        assert product.average_rating == 4.5
+
+    def test_if_updating_review_updates_product_rating(self):
+        product = baker.make(Product)
+        review = baker.make(Review, product=product, rating=1)
+
+        review.rating = 3
+        review.save()
+        product.refresh_from_db()
+
+        assert product.average_rating == 3
+
+    def test_if_moving_review_updates_both_products(self):
+        product = baker.make(Product)
+        other_product = baker.make(Product)
+        review = baker.make(Review, product=product, rating=5)
+
+        review.product = other_product
+        review.save()
+        product.refresh_from_db()
+        other_product.refresh_from_db()
+
+        assert product.review_count == 0
+        assert other_product.review_count == 1
+
+    def test_if_deleting_review_updates_product_rating(self):
+        product = baker.make(Product)
+        review = baker.make(Review, product=product, rating=2)
+
+        review.delete()
+        product.refresh_from_db()
+
+        assert product.review_count == 0
+        assert product.average_rating == 0
+
+    def test_if_saving_stale_product_keeps_rating(self):
+        product = baker.make(Product)
+        stale = Product.objects.get(pk=product.pk)
+        baker.make(Review, product=product, rating=5)
+
+        stale.name = 'renamed'
+        stale.save()
+        product.refresh_from_db()
+
+        assert product.name == 'renamed'
+        assert product.review_count == 1
+
+    def test_if_rebuild_ratings_restores_aggregates(self):
+        product = baker.make(Product)
+        Review.objects.bulk_create([
+            baker.prepare(Review, product=product, user=baker.make('customuser.CustomUser'), rating=rating)
+            for rating in (2, 4)
+        ])
+
+        call_command('rebuild_ratings', batch_size=1)
+        product.refresh_from_db()
+
+        assert product.review_count == 2
+        assert product.average_rating == 3
+
+
+@pytest.mark.django_db
+class TestListProductRatings:
+    def test_if_list_products_returns_rating(self, api_client):
+        product = baker.make(Product)
+        baker.make(Review, product=product, rating=4)
+
+        response = api_client.get(f'/api/products/{product.id}/')
+
+        assert response.data['average_rating'] == 4
+        assert response.data['review_count'] == 1
@@ -0,0 +1,177 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+
+import msgpack
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from carts.models import CartItem
+from customuser.models import CustomUser
+from products.models import Category, Product
+from shoplit.parsers import ORJSONParser, MessagePackParser
+from shoplit.renderers import ORJSONRenderer, MessagePackRenderer
+
+
+@pytest.mark.parametrize('data', [
+    {'price': Decimal('19.99'), 'id': uuid.uuid4(), 'name': 'Lamp'},
+    {'created_at': timezone.now(), 'day': datetime.date(2024, 2, 29), 'at': datetime.time(12, 30, 1, 500)},
+    {'naive': datetime.datetime(2024, 1, 1, 8, 0, 0, 123456), 'delta': datetime.timedelta(hours=1)},
+    {'text': 'café     \U0001f600', 'nested': [{'a': None, 'b': True, 'c': 1.5}], 1: 'int key'},
+    [Decimal('0.10'), Decimal('1E+2'), 2 ** 40, -3],
+])
+def test_orjson_renderer_matches_json_renderer(data):
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_orjson_renderer_indents_on_request():
+    data = {'a': [1, 2]}
+    rendered = ORJSONRenderer().render(data, 'application/json; indent=4')
+
+    assert rendered == b'{\n  "a": [\n    1,\n    2\n  ]\n}'
+    assert ORJSONRenderer().render(None) == b''
+
+
+def test_orjson_parser_parses_body():
+    body = '{"name": "café", "price": 1.5, "items": [1, null]}'.encode()
+
+    assert ORJSONParser().parse(io.BytesIO(body)) == {'name': 'café', 'price': 1.5, 'items': [1, None]}
+
+
+@pytest.mark.parametrize('body', [b'{"name": ', b'{"price": NaN}', b'\xff'])
+def test_orjson_parser_rejects_invalid_json(body):
+    with pytest.raises(ParseError):
+        ORJSONParser().parse(io.BytesIO(body))
+
+
+class EchoView(APIView):
+    permission_classes = []
+
+    def post(self, request):
+        return Response(request.data)
+
+
+@pytest.mark.django_db
+def test_api_renders_with_orjson(api_client):
+    product = baker.make(Product, price=Decimal('12.50'), is_active=True)
+
+    response = api_client.get(f'/api/products/{product.id}/')
+
+    assert response.status_code == 200
+    assert response.json()['id'] == str(product.id)
+    assert response.json()['price'] == 12.5
+
+
+def test_default_parser_round_trips_and_rejects_invalid_json():
+    factory = APIRequestFactory()
+    body = {'name': 'café', 'price': 19.99, 'tags': ['a', None]}
+
+    response = EchoView.as_view()(factory.post('/', body, format='json'))
+    assert response.status_code == 200
+    assert response.data == body
+
+    response = EchoView.as_view()(factory.post('/', b'{"name": ', content_type='application/json'))
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_benchmark_renderers_command():
+    baker.make(Product, _quantity=3, is_active=True)
+    out = io.StringIO()
+
+    call_command('benchmark_renderers', limit=3, repeat=2, stdout=out)
+
+    assert 'ORJSONRenderer is' in out.getvalue()
+
+
+def test_msgpack_round_trips_decimals_and_uuids_exactly():
+    data = {
+        'id': uuid.uuid4(),
+        'prices': [Decimal('12.50'), Decimal('0.1'), Decimal('-1E+3')],
+        'created_at': datetime.datetime(2024, 1, 1, 8, 0, 0, 123456),
+        'name': 'café',
+        'count': 2 ** 40,
+    }
+
+    parsed = MessagePackParser().parse(io.BytesIO(MessagePackRenderer().render(data)))
+
+    assert parsed == {**data, 'created_at': '2024-01-01T08:00:00.123456'}
+    assert [str(price) for price in parsed['prices']] == ['12.50', '0.1', '-1E+3']
+    assert isinstance(parsed['id'], uuid.UUID)
+
+
+@pytest.mark.parametrize('body', [b'\xc1', b'\x81\xa1', msgpack.packb(msgpack.ExtType(9, b'x'))])
+def test_msgpack_parser_rejects_invalid_bodies(body):
+    with pytest.raises(ParseError):
+        MessagePackParser().parse(io.BytesIO(body))
+
+
+@pytest.mark.django_db
+def test_api_negotiates_msgpack(api_client):
+    product = baker.make(Product, price=Decimal('12.50'), is_active=True)
+
+    response = api_client.get('/api/products/', HTTP_ACCEPT='application/msgpack')
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/msgpack'
+    page = MessagePackParser().parse(io.BytesIO(response.content))
+    assert page['results'][0]['id'] == product.id
+    assert page['results'][0]['price'] == Decimal('12.50')
+
+
+@pytest.mark.django_db
+def test_msgpack_renders_serializer_uuids_as_uuids(api_client):
+    category = baker.make(Category)
+    product = baker.make(Product, category=category, is_active=True)
+    url = f'/api/products/{product.id}/'
+
+    parsed = MessagePackParser().parse(io.BytesIO(api_client.get(url, HTTP_ACCEPT='application/msgpack').content))
+
+    # The id comes from a UUIDField (a string), the category from a pk relation (a UUID)
+    assert parsed['id'] == product.id
+    assert parsed['category'] == category.id
+    assert parsed['name'] == product.name
+    # JSON is unchanged
+    assert api_client.get(url).data['id'] == str(product.id)
+
+
+def test_msgpack_uuid_restoring_follows_the_serializer():
+    class ItemSerializer(serializers.Serializer):
+        id = serializers.UUIDField()
+        code = serializers.CharField()
+        tags = serializers.ListField(child=serializers.UUIDField())
+
+    pk = uuid.uuid4()
+    # A string that only looks like a UUID stays a string
+    item = {'id': pk, 'code': str(pk), 'tags': [pk]}
+    data = {'count': 1, 'results': ItemSerializer([item], many=True).data}
+
+    parsed = MessagePackParser().parse(io.BytesIO(MessagePackRenderer().render(data)))
+
+    assert parsed == {'count': 1, 'results': [{'id': pk, 'code': str(pk), 'tags': [pk]}]}
+
+
+@pytest.mark.django_db
+def test_api_accepts_msgpack_bodies(api_client):
+    user = baker.make(CustomUser)
+    api_client.force_authenticate(user=user)
+    product = baker.make(Product, price=Decimal('12.50'), is_active=True)
+    body = MessagePackRenderer().render({'product': product.id, 'quantity': 2})
+
+    response = api_client.post('/api/cart/items/', data=body, content_type='application/msgpack',
+                               HTTP_ACCEPT='application/msgpack')
+
+    assert response.status_code == 201
+    item = MessagePackParser().parse(io.BytesIO(response.content))
+    assert item['product'] == product.id
+    assert item['total_price'] == Decimal('25.00')
+    assert CartItem.objects.get(cart__user=user).quantity == 2
@@ -0,0 +1,142 @@
+import pytest
+from django.db import transaction
+from django.test import RequestFactory
+from model_bakery import baker
+
+from carts.models import Cart
+from customuser.models import CustomUser
+from products.cache import CATALOG, bump_version, fill_from_primary
+from products.models import Product
+from reviews.models import Review
+from shoplit.replicas import ReplicaMiddleware, ReplicaRouter, pin_to_primary, read_from_primary
+
+router = ReplicaRouter()
+
+
+def route_reads(request, *models, atomic=False):
+    """
+    Databases the router picks for reads of ``models`` while ``request`` is served.
+    """
+    def view(request):
+        if atomic:
+            with transaction.atomic():
+                return [router.db_for_read(model) for model in models]
+        return [router.db_for_read(model) for model in models]
+
+    return ReplicaMiddleware(view)(request)
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    return settings
+
+
+@pytest.mark.usefixtures('replicas')
+class TestReplicaRouter:
+    def test_if_safe_catalog_reads_use_replica(self):
+        request = RequestFactory().get('/api/products/')
+
+        assert route_reads(request, Product, Review, Cart) == ['replica', 'replica', 'default']
+
+    @pytest.mark.parametrize('method', ['post', 'put', 'patch', 'delete'])
+    def test_if_write_requests_read_from_primary(self, method):
+        request = getattr(RequestFactory(), method)('/api/products/')
+
+        assert route_reads(request, Product) == ['default']
+
+    def test_if_reads_outside_requests_use_primary(self):
+        assert router.db_for_read(Product) == 'default'
+        assert router.db_for_write(Product) == 'default'
+
+    @pytest.mark.django_db
+    def test_if_reads_inside_transactions_use_primary(self):
+        # The test itself runs in a transaction, so routing happens inside one
+        request = RequestFactory().get('/api/products/')
+
+        assert route_reads(request, Product, atomic=True) == ['default']
+
+    def test_if_replica_is_picked_once_per_request(self, replicas):
+        replicas.DATABASE_REPLICAS = ['replica', 'replica2']
+        request = RequestFactory().get('/api/products/')
+
+        assert len(set(route_reads(request, *[Product] * 20))) == 1
+
+    def test_if_pinned_user_reads_from_primary(self, enable_caching):
+        user = CustomUser(pk=1)
+        request = RequestFactory().get('/api/products/')
+        request.user = user
+        assert route_reads(request, Product) == ['replica']
+
+        pin_to_primary(user)
+
+        assert route_reads(request, Product) == ['default']
+
+    def test_if_write_request_pins_user(self, enable_caching):
+        user = CustomUser(pk=1)
+        request = RequestFactory().post('/api/reviews/')
+        request.user = user
+        route_reads(request)
+
+        request = RequestFactory().get('/api/products/')
+        request.user = user
+        assert route_reads(request, Product) == ['default']
+
+    def test_if_reads_inside_read_from_primary_use_primary(self):
+        request = RequestFactory().get('/api/products/')
+
+        def view(request):
+            with read_from_primary():
+                return router.db_for_read(Product)
+
+        assert ReplicaMiddleware(view)(request) == 'default'
+
+    def test_if_cache_fills_read_from_primary_after_a_bump(self, replicas, enable_caching):
+        def fill(request):
+            with fill_from_primary(CATALOG):
+                return router.db_for_read(Product)
+
+        assert ReplicaMiddleware(fill)(RequestFactory().get('/api/products/')) == 'replica'
+        bump_version(CATALOG)
+        assert ReplicaMiddleware(fill)(RequestFactory().get('/api/products/')) == 'default'
+
+        # Once the replicas have had time to catch up, fills go back to them
+        replicas.REPLICA_PIN_SECONDS = 0
+        bump_version(CATALOG)
+        assert ReplicaMiddleware(fill)(RequestFactory().get('/api/products/')) == 'replica'
+
+
+def test_if_router_is_neutral_without_replicas():
+    assert router.db_for_read(Product) is None
+    assert router.db_for_write(Product) is None
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+def test_if_users_read_their_writes_across_two_databases(api_client, replicas, enable_caching):
+    # Nothing is replicated here: rows written to the primary never reach the replica
+    product = baker.make(Product)
+    baker.make(Review, product=product)
+    user = baker.make(CustomUser)
+
+    assert api_client.get('/api/reviews/').data['count'] == 0
+
+    api_client.force_authenticate(user=user)
+    response = api_client.post('/api/reviews/', {'product': product.id, 'title': 'Good', 'body': 'Works', 'rating': 5})
+    assert response.status_code == 201
+
+    assert api_client.get('/api/reviews/').data['count'] == 2
+    assert Review.objects.using('replica').count() == 0
+
+    api_client.force_authenticate(user=None)
+    assert api_client.get('/api/reviews/').data['count'] == 0
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+def test_if_catalog_page_after_a_write_is_cached_from_primary(api_client, replicas, enable_caching):
+    assert api_client.get('/api/products/').data['count'] == 0
+
+    # Bumps the catalog version on commit; the replica never sees the row
+    baker.make(Product)
+
+    assert api_client.get('/api/products/').data['count'] == 1
+    assert api_client.get('/api/products/').data['count'] == 1
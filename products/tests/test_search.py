@@ -0,0 +1,136 @@
+from django.core.management import call_command
+from django.db import connection
+
+import pytest
+from model_bakery import baker
+
+from products.models import Product, Category
+from products.search import FTS_KEYS_TABLE, FTS_TABLE, SQLITE_TRIGGERS, ensure_search_index, search_products
+
+
+def search(api_client, term, **params):
+    response = api_client.get('/api/products/', {'search': term, **params})
+    return [product['name'] for product in response.data['results']]
+
+
+@pytest.mark.django_db
+class TestProductSearch:
+    def test_if_search_matches_word_prefix(self, api_client):
+        baker.make(Product, name='Gaming Laptop')
+        baker.make(Product, name='Desk Lamp')
+
+        assert search(api_client, 'lap') == ['Gaming Laptop']
+
+    def test_if_search_requires_every_term(self, api_client):
+        baker.make(Product, name='Gaming Laptop')
+        baker.make(Product, name='Office Laptop')
+
+        assert search(api_client, 'gaming laptop') == ['Gaming Laptop']
+
+    def test_if_search_ranks_name_matches_first(self, api_client):
+        baker.make(Product, name='Carry Case', description='Fits any laptop')
+        baker.make(Product, name='Laptop Stand', description='Aluminium')
+
+        assert search(api_client, 'laptop') == ['Laptop Stand', 'Carry Case']
+
+    def test_if_ordering_overrides_relevance(self, api_client):
+        baker.make(Product, name='Carry Case', description='Fits any laptop', price=10)
+        baker.make(Product, name='Laptop Stand', price=20)
+
+        assert search(api_client, 'laptop', ordering='price') == ['Carry Case', 'Laptop Stand']
+
+    def test_if_search_combines_with_filters(self, api_client):
+        category = baker.make(Category)
+        baker.make(Product, name='Laptop Stand', category=category)
+        baker.make(Product, name='Laptop Bag')
+
+        assert search(api_client, 'laptop', category_id=category.id) == ['Laptop Stand']
+
+    def test_if_search_ignores_query_syntax(self, api_client):
+        baker.make(Product, name='Laptop')
+
+        assert search(api_client, '"laptop*) -') == ['Laptop']
+
+    def test_if_updated_product_is_reindexed(self, api_client):
+        product = baker.make(Product, name='Laptop')
+
+        product.name = 'Headphones'
+        product.save()
+
+        assert search(api_client, 'laptop') == []
+        assert search(api_client, 'headphones') == ['Headphones']
+
+    def test_if_deleted_product_is_removed_from_index(self, api_client):
+        product = baker.make(Product, name='Laptop')
+
+        product.delete()
+
+        assert search(api_client, 'laptop') == []
+
+    def test_if_bulk_created_products_are_indexed(self, api_client):
+        Product.objects.bulk_create([Product(name=f'Laptop {i}', price=1) for i in range(3)])
+
+        assert len(search(api_client, 'laptop')) == 3
+
+    def test_if_name_filter_uses_name_column_only(self, api_client):
+        baker.make(Product, name='Laptop Stand')
+        baker.make(Product, name='Carry Case', description='Fits any laptop')
+
+        response = api_client.get('/api/products/', {'name__search': 'laptop'})
+
+        assert [product['name'] for product in response.data['results']] == ['Laptop Stand']
+
+    def test_if_icontains_filter_matches_substrings(self, api_client):
+        baker.make(Product, name='Notebook')
+        baker.make(Product, name='Book Stand')
+
+        response = api_client.get('/api/products/', {'name__icontains': 'book', 'ordering': 'created_at'})
+
+        assert [product['name'] for product in response.data['results']] == ['Notebook', 'Book Stand']
+
+    def test_if_index_is_keyed_on_product_id(self, api_client):
+        product = baker.make(Product, name='Laptop')
+        # What VACUUM may do to the implicit rowids of a table with a UUID key
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE products_product SET rowid = rowid + 1000")
+
+        product.name = 'Headphones'
+        product.save()
+
+        assert search(api_client, 'laptop') == []
+        assert search(api_client, 'headphones') == ['Headphones']
+
+    @pytest.mark.parametrize('columns', ['name, description', 'product_id UNINDEXED, name, description'])
+    def test_if_index_from_before_key_table_is_replaced(self, api_client, columns):
+        baker.make(Product, name='Laptop')
+        with connection.cursor() as cursor:
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER {name}")
+            cursor.execute(f"DROP TABLE {FTS_TABLE}")
+            cursor.execute(f"DROP TABLE {FTS_KEYS_TABLE}")
+            cursor.execute(f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({columns})")
+
+        ensure_search_index(connection)
+
+        assert search(api_client, 'laptop') == ['Laptop']
+
+    def test_if_rank_looks_up_fts_rows_by_rowid(self):
+        baker.make(Product, name='Laptop')
+        queryset = search_products(Product.objects.all(), 'laptop')
+
+        with connection.cursor() as cursor:
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = [row[-1] for row in cursor.fetchall()]
+
+        # FTS5 marks a rowid equality with '=' in its index string; a scan of the matches has none
+        assert any(step.startswith(f'SCAN {FTS_TABLE} VIRTUAL TABLE INDEX 0:=M') for step in plan)
+
+    def test_if_rebuild_search_index_restores_missing_rows(self, api_client):
+        baker.make(Product, name='Laptop')
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+        call_command('rebuild_search_index')
+
+        assert search(api_client, 'laptop') == ['Laptop']
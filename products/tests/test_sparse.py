@@ -0,0 +1,160 @@
+from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+from model_bakery import baker
+from decimal import Decimal
+
+from products.models import Category, SubCategory, Product, ProductImage
+from carts.models import Cart, CartItem
+from orders.models import Order, OrderItem
+from wishlist.models import WishList
+from wishlist.views import WishListViewSet
+from customuser.models import CustomUser
+
+
+@pytest.fixture
+def user(api_client):
+    user = baker.make(CustomUser)
+    api_client.force_authenticate(user=user)
+    return user
+
+
+@pytest.fixture
+def product():
+    subcategory = baker.make(SubCategory, name='Phones', category=baker.make(Category, name='Electronics'))
+    product = baker.make(Product, name='Pixel', price=Decimal('10.00'), subcategory=subcategory)
+    baker.make(ProductImage, product=product, image='products/shop.jpg')
+    return product
+
+
+def product_queries(queries):
+    return [query['sql'] for query in queries if 'FROM "products_product"' in query['sql']]
+
+
+@pytest.mark.django_db
+class TestProductFieldsets:
+    def test_if_fields_limit_output(self, api_client, product):
+        response = api_client.get('/api/products/', {'fields': 'id,name,price'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.data['results'][0]) == ['id', 'name', 'price']
+
+    def test_if_fields_limit_loaded_columns_and_prefetches(self, api_client, product):
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get('/api/products/', {'fields': 'id,name'})
+
+        page_query = product_queries(queries)[-1]
+        assert '"products_product"."description"' not in page_query
+        assert not [query for query in queries if 'products_productimage' in query['sql']]
+
+    def test_if_nested_fields_select_image_columns(self, api_client, product):
+        response = api_client.get('/api/products/', {'fields': 'name,images.image'})
+
+        assert list(response.data['results'][0]['images'][0]) == ['image']
+
+    def test_if_expand_nests_related_objects_in_one_query(self, api_client, product):
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(f'/api/products/{product.id}/', {
+                'fields': 'name,category.name,subcategory', 'expand': 'category,subcategory',
+            })
+
+        assert response.data['category'] == {'name': 'Electronics'}
+        assert response.data['subcategory']['name'] == 'Phones'
+        assert not [query for query in queries if query['sql'].startswith('SELECT') and
+                    'FROM "products_category"' in query['sql']]
+
+    def test_if_default_representation_is_unchanged(self, api_client, product):
+        response = api_client.get(f'/api/products/{product.id}/')
+
+        assert response.data['category'] == product.category_id
+        assert len(response.data['images']) == 1
+
+    @pytest.mark.parametrize('params', [
+        {'fields': 'id,colour'},
+        {'expand': 'images'},
+        {'fields': 'name.first'},
+    ])
+    def test_if_invalid_paths_return_400(self, api_client, product, params):
+        response = api_client.get('/api/products/', params)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_if_category_expands_subcategories(self, api_client, product):
+        response = api_client.get('/api/products/categories/', {
+            'fields': 'name,subcategories.name', 'expand': 'subcategories',
+        })
+
+        assert response.data['results'][0] == {'name': 'Electronics', 'subcategories': [{'name': 'Phones'}]}
+
+    def test_if_subcategory_fields_limit_output_and_columns(self, api_client, product):
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/api/products/subcategories/', {'fields': 'id,name'})
+
+        assert list(response.data['results'][0]) == ['id', 'name']
+        page_query = [query['sql'] for query in queries if 'FROM "products_subcategory"' in query['sql']][-1]
+        assert '"products_subcategory"."description"' not in page_query
+
+    def test_if_invalid_subcategory_fields_return_400(self, api_client, product):
+        response = api_client.get('/api/products/subcategories/', {'fields': 'id,colour'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestOtherFieldsets:
+    def test_if_cart_fields_skip_items(self, api_client, user, product):
+        cart = baker.make(Cart, user=user)
+        baker.make(CartItem, cart=cart, product=product, quantity=2)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/api/cart/', {'fields': 'id,created_at'})
+
+        assert list(response.data) == ['id', 'created_at']
+        assert not [query for query in queries if 'carts_cartitem' in query['sql']]
+
+    def test_if_cart_total_loads_only_prices(self, api_client, user, product):
+        cart = baker.make(Cart, user=user)
+        baker.make(CartItem, cart=cart, product=product, quantity=2)
+
+        response = api_client.get('/api/cart/', {'fields': 'total_price'})
+
+        assert response.data == {'total_price': Decimal('20.00')}
+
+    def test_if_cart_items_expand_product(self, api_client, user, product):
+        cart = baker.make(Cart, user=user)
+        baker.make(CartItem, cart=cart, product=product)
+
+        response = api_client.get('/api/cart/items/', {'fields': 'quantity,product.name', 'expand': 'product'})
+
+        assert response.data['results'][0] == {'quantity': 1, 'product': {'name': 'Pixel'}}
+
+    def test_if_order_items_expand_product(self, api_client, user, product):
+        # Bulk insert: the post_save signal would queue notifications on the broker
+        [order] = Order.objects.bulk_create([Order(user=user)])
+        baker.make(OrderItem, order=order, product=product, quantity=3, price=Decimal('30.00'))
+
+        response = api_client.get('/api/orders/', {
+            'fields': 'id,total_amount,items.product.name', 'expand': 'items.product',
+        })
+
+        assert response.data['results'][0]['items'] == [{'product': {'name': 'Pixel'}}]
+        assert response.data['results'][0]['total_amount'] == Decimal('90.00')
+
+    def test_if_wishlist_fields_select_product_columns(self, api_client, user, product):
+        wishlist = baker.make(WishList, user=user)
+        wishlist.products.add(product)
+
+        response = api_client.get('/api/wishlist/', {'fields': 'products.name'})
+
+        assert response.data['results'][0] == {'products': [{'name': 'Pixel'}]}
+
+    def test_if_wishlist_queryset_skips_product_images(self, user, product):
+        wishlist = baker.make(WishList, user=user)
+        wishlist.products.add(product)
+
+        with CaptureQueriesContext(connection) as queries:
+            list(WishListViewSet.queryset.filter(user=user))
+
+        assert not [query for query in queries if 'products_productimage' in query['sql']]
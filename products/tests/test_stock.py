@@ -0,0 +1,119 @@
+import threading
+import time
+
+import pytest
+from django.db import OperationalError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+from rest_framework.exceptions import ValidationError
+
+from customuser.models import CustomUser
+from orders.models import Order, OrderItem
+from orders.serializers import OrderSerializers
+from products.models import Product, InsufficientStock
+
+
+@pytest.mark.django_db
+class TestReserveStock:
+    def test_if_all_products_are_reserved_in_one_update(self):
+        first, second = baker.make(Product, stock_quantity=5), baker.make(Product, stock_quantity=3)
+
+        with CaptureQueriesContext(connection) as queries:
+            Product.objects.reserve_stock({first.pk: 5, second.pk: 1})
+
+        assert [query['sql'].split()[0] for query in queries if 'products_product' in query['sql']] == ['UPDATE']
+        assert Product.objects.get(pk=first.pk).stock_quantity == 0
+        assert Product.objects.get(pk=second.pk).stock_quantity == 2
+
+    def test_if_one_short_product_reserves_nothing(self):
+        first, second = baker.make(Product, stock_quantity=5), baker.make(Product, stock_quantity=1)
+
+        with pytest.raises(InsufficientStock) as excinfo:
+            Product.objects.reserve_stock({first.pk: 2, second.pk: 2})
+
+        assert excinfo.value.shortages == {second.pk: 1}
+        assert Product.objects.get(pk=first.pk).stock_quantity == 5
+        assert Product.objects.get(pk=second.pk).stock_quantity == 1
+
+    def test_if_reservation_sets_updated_at_and_keeps_other_columns(self):
+        product = baker.make(Product, stock_quantity=5, name='Lamp')
+        Product.objects.filter(pk=product.pk).update(name='Desk lamp')
+
+        product.reduce_stock(2)
+
+        product = Product.objects.get(pk=product.pk)
+        assert (product.name, product.stock_quantity) == ('Desk lamp', 3)
+        assert product.updated_at > product.created_at
+
+    def test_if_reduce_stock_raises_value_error(self):
+        product = baker.make(Product, stock_quantity=1)
+
+        with pytest.raises(ValueError):
+            product.reduce_stock(2)
+        product.increase_stock(4)
+
+        assert product.stock_quantity == 5
+
+
+@pytest.mark.django_db
+class TestOrderStock:
+    def make_order(self, items):
+        user = baker.make(CustomUser)
+        serializer = OrderSerializers(data={'user': user.pk, 'items': items})
+        serializer.is_valid(raise_exception=True)
+        return serializer.save(user=user)
+
+    def test_if_order_reserves_merged_quantities(self):
+        product = baker.make(Product, stock_quantity=5, price=2)
+
+        order = self.make_order([{'product': product.pk, 'quantity': 2}, {'product': product.pk, 'quantity': 3}])
+
+        assert Product.objects.get(pk=product.pk).stock_quantity == 0
+        assert OrderItem.objects.get(order=order).quantity == 5
+
+    def test_if_short_order_writes_nothing(self):
+        plenty, short = baker.make(Product, stock_quantity=5), baker.make(Product, stock_quantity=2, name='Mug')
+
+        with pytest.raises(ValidationError) as excinfo:
+            self.make_order([{'product': plenty.pk, 'quantity': 1},
+                             {'product': short.pk, 'quantity': 2}, {'product': short.pk, 'quantity': 1}])
+
+        assert "'Mug'. Only 2 available." in str(excinfo.value.detail)
+        assert Product.objects.get(pk=plenty.pk).stock_quantity == 5
+        assert not Order.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_if_concurrent_reservations_never_oversell():
+    product = baker.make(Product, stock_quantity=20)
+    buyers = 50
+    barrier = threading.Barrier(buyers)
+    outcomes = []
+
+    def buy():
+        try:
+            barrier.wait()
+            for _ in range(100):
+                try:
+                    with transaction.atomic():
+                        Product.objects.reserve_stock({product.pk: 1})
+                    outcomes.append('reserved')
+                    return
+                except InsufficientStock:
+                    outcomes.append('sold out')
+                    return
+                except OperationalError:
+                    # SQLite lets one writer in at a time, the others retry
+                    time.sleep(0.001)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=buy) for _ in range(buyers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert outcomes.count('reserved') == 20
+    assert outcomes.count('sold out') == buyers - 20
+    assert Product.objects.get(pk=product.pk).stock_quantity == 0
@@ -0,0 +1,116 @@
+from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+from model_bakery import baker
+
+from products.indexes import SyncedNameIndex
+from products.models import Category, SubCategory, Product
+
+
+def suggest(api_client, query, **params):
+    response = api_client.get('/api/products/suggest/', {'q': query, **params})
+    return [(suggestion['type'], suggestion['name']) for suggestion in response.data]
+
+
+@pytest.mark.django_db
+class TestSuggest:
+    def test_if_suggest_matches_word_prefixes(self, api_client):
+        baker.make(Product, name='Gaming Laptop')
+        baker.make(Product, name='Desk Lamp')
+
+        assert suggest(api_client, 'lap') == [('product', 'Gaming Laptop')]
+        assert suggest(api_client, 'GAMING la') == [('product', 'Gaming Laptop')]
+
+    def test_if_suggest_ranks_name_starts_and_taxonomy_first(self, api_client):
+        category = baker.make(Category, name='Laptops')
+        baker.make(SubCategory, name='Laptop Bags', category=category)
+        baker.make(Product, name='Gaming Laptop')
+        baker.make(Product, name='Laptop Stand')
+
+        assert suggest(api_client, 'lapt') == [
+            ('category', 'Laptops'),
+            ('subcategory', 'Laptop Bags'),
+            ('product', 'Laptop Stand'),
+            ('product', 'Gaming Laptop'),
+        ]
+
+    def test_if_inactive_products_are_not_suggested(self, api_client):
+        baker.make(Product, name='Laptop', is_active=False)
+
+        assert suggest(api_client, 'lap') == []
+
+    def test_if_limit_is_applied(self, api_client):
+        baker.make(Product, name='Lamp', _quantity=5)
+
+        response = api_client.get('/api/products/suggest/', {'q': 'la', 'limit': 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 2
+
+    def test_if_invalid_limit_returns_400(self, api_client):
+        response = api_client.get('/api/products/suggest/', {'q': 'la', 'limit': 'many'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_if_empty_query_returns_nothing(self, api_client):
+        baker.make(Product, name='Lamp')
+
+        assert suggest(api_client, '  ') == []
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('enable_caching')
+class TestSuggestIndexUpdates:
+    def test_if_built_index_answers_without_queries(self, api_client):
+        baker.make(Product, name='Gaming Laptop')
+        suggest(api_client, 'lap')
+
+        with CaptureQueriesContext(connection) as queries:
+            assert suggest(api_client, 'gam') == [('product', 'Gaming Laptop')]
+
+        assert len(queries) == 0
+
+    def test_if_saves_update_index_incrementally(self, api_client, django_capture_on_commit_callbacks):
+        product = baker.make(Product, name='Gaming Laptop')
+        suggest(api_client, 'lap')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            product.name = 'Gaming Mouse'
+            product.save()
+            baker.make(Product, name='Laptop Stand')
+        with CaptureQueriesContext(connection) as queries:
+            assert suggest(api_client, 'lap') == [('product', 'Laptop Stand')]
+
+        assert len(queries) == 0
+
+    def test_if_deletes_and_bulk_updates_rebuild_index(self, api_client, django_capture_on_commit_callbacks):
+        laptop = baker.make(Product, name='Laptop')
+        baker.make(Product, name='Lamp')
+        suggest(api_client, 'la')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            laptop.delete()
+        assert suggest(api_client, 'la') == [('product', 'Lamp')]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Product.objects.update(is_active=False)
+        assert suggest(api_client, 'la') == []
+
+    def test_if_bulk_created_rows_are_synced(self, api_client, settings):
+        settings.NAME_INDEX_SYNC_INTERVAL = 0
+        suggest(api_client, 'lap')
+
+        Product.objects.bulk_create([Product(name='Laptop', price=1)])
+
+        assert suggest(api_client, 'lap') == [('product', 'Laptop')]
+
+
+def test_if_name_index_requires_load_add_and_remove():
+    class Incomplete(SyncedNameIndex):
+        def load(self, rows):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
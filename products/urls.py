@@ -8,5 +8,9 @@ router.register(r'categories', views.CategoryViewSet, basename='categories')
 router.register(r'subcategories', views.SubCategoryViewSet, basename='subcategories')
 router.register(r'', views.ProductViewSet, basename='products')
 
-# Use the router-generated URLs
-urlpatterns = router.urls
+# Plain views go first so the product routes don't treat their paths as ids
+urlpatterns = [
+    path('category-tree/', views.CategoryTreeView.as_view(), name='category-tree'),
+    path('import/', views.ProductImportView.as_view(), name='product-import'),
+    path('suggest/', views.SuggestView.as_view(), name='product-suggest'),
+] + router.urls
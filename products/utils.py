@@ -1,21 +1,8 @@
-from faker import Faker
-from random import randint, uniform
-
-import sys
-import os
-import django
-
-
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "shoplit.settings.dev")
-django.setup()
-
-from products.models import Category, SubCategory, Product
+from .generator import CatalogGenerator
 
 #company, finance, food.dish, food.drink, food.fruit, food.species, hardware.graphics, hardware.phone_model
 #hardware.cpu_codeame, 
 
-fake = Faker()
-
 categories = [
     "Electronics", "Fashion", "Home & Garden", "Health & Beauty", "Toys & Hobbies", 
     "Sporting Goods", "Automotive", "Books", "Music", "Movies & TV", "Collectibles", 
@@ -104,51 +91,22 @@ subcategories = {
         "Pet Grooming", "Pet Health", "Pet Accessories", "Pet Furniture"
     ]
 }
-def generate_categories():
-    for category_name in categories:
-        category, created = Category.objects.get_or_create(name=category_name)
-        print(f"Category '{category_name}' created with ID: {category.id}")
-        generate_subcategories(category)
-
-# Generate subcategories
-def generate_subcategories(category):
-    subcategory_names = subcategories.get(category.name, [])
-    for subcategory_name in subcategory_names:
-        subcategory, created = SubCategory.objects.get_or_create(name=subcategory_name, category=category)
-        print(f"Subcategory '{subcategory_name}' created under '{category.name}'")
-
-
-def generate_products(subcategories=subcategories, num=1):
-    products = []
+def generate_categories(seed=0):
+    """
+    Create the default categories and subcategories that don't exist yet.
+    """
+    generator = CatalogGenerator(seed=seed, log=print)
+    generator.resolve_taxonomy(subcategories)
+
+
+def generate_products(subcategories=subcategories, num=1, seed=0):
+    """
+    Create ``num`` products in every subcategory of ``subcategories``.
+    """
     print(f"Generating products {num} per subcategory")
-    for category in subcategories:
-        for subcategory in subcategories[category]:
-            for _ in range(num):
-                # Generate fake product details
-                product_name = fake.word() 
-                price = round(uniform(10, 1000), 2)  
-                stock_quantity = randint(1, 100)  
-                description = fake.text(max_nb_chars=200)  
-                
-                # Create the product and save to the database
-                try:
-                    product = Product(
-                        name=product_name,
-                        description=description,
-                        price=price,
-                        stock_quantity=stock_quantity,
-                        subcategory=SubCategory.objects.get(name=subcategory),
-                        category=SubCategory.objects.get(name=subcategory).category
-                    )
-                except:
-                    pass
-                
-                products.append(product)
-                # print(f"Product updated with {product}")
-
-    Product.objects.bulk_create(products, ignore_conflicts=True)
-    
-    return products
+    generator = CatalogGenerator(seed=seed, log=print)
+    generator.generate_products(subcategories, num)
+    return generator.products
 
 """def seed_database():
     print("Seeding database with e-commerce terms...")
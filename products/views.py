@@ -1,19 +1,34 @@
 from rest_framework.viewsets import ModelViewSet
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework import status
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.throttling import UserRateThrottle, AnonRateThrottle
-from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.exceptions import APIException, ValidationError, NotFound
 
 from django.core.exceptions import ObjectDoesNotExist
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+
+import codecs
 
 from .serializers import CategorySerializer, SubCategorySerializer, \
-    ProductSerializer, ProductCreateUpdateSerializer
+    ProductSerializer, ProductCreateUpdateSerializer, CategoryTreeSerializer
 from .permissions import IsAdminUserOrReadOnly
 from .models import Category, SubCategory, Product
-from .filters import ProductFilterSet
+from .filters import ProductFilterSet, ProductSearchFilter
+from .pagination import KeysetPagination
+from .cache import cache_catalog_page
+from .conditional import conditional_on_updated_at
+from .taxonomy import get_category_tree
+from .facets import get_facets
+from .importer import import_products, get_format, DEFAULT_BATCH_SIZE, FORMATS as IMPORT_FORMATS
+from .suggest import suggest_index, DEFAULT_LIMIT, MAX_LIMIT
+from .sparse import SparseFieldsetViewMixin
 
 from drf_spectacular.utils import extend_schema, extend_schema_view
 
@@ -30,7 +45,7 @@ logger = logging.getLogger(__name__)
     partial_update=extend_schema(summary="Partially update category", tags=["Category"]),
     destroy=extend_schema(summary="Delete category", tags=["Category"]),
 )
-class CategoryViewSet(ModelViewSet):
+class CategoryViewSet(SparseFieldsetViewMixin, ModelViewSet):
    
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -40,7 +55,8 @@ class CategoryViewSet(ModelViewSet):
     ordering_fields = ['name', 'updated_at']
     throttle_classes = [UserRateThrottle, AnonRateThrottle]
 
-    @method_decorator(cache_page(60 * 5))
+    @conditional_on_updated_at
+    @method_decorator(cache_catalog_page())
     def list(self, request, *args, **kwargs):
         logger.info("User %s requested category list.", request.user)
         try:
@@ -51,7 +67,8 @@ class CategoryViewSet(ModelViewSet):
             logger.error("Unexpected error in list view: %s", str(e), exc_info=True)
             raise APIException("An error occurred while fetching the category list.")
 
-    @method_decorator(cache_page(60 * 10))
+    @conditional_on_updated_at
+    @method_decorator(cache_catalog_page())
     def retrieve(self, request, *args, **kwargs):
         category_id = kwargs.get('pk')
         logger.info("User %s requested category details for ID %s.", request.user, category_id)
@@ -119,7 +136,7 @@ class CategoryViewSet(ModelViewSet):
     partial_update=extend_schema(summary="Partially update subcategory", tags=["SubCategory"]),
     destroy=extend_schema(summary="Delete subcategory", tags=["SubCategory"]),
 )
-class SubCategoryViewSet(ModelViewSet):
+class SubCategoryViewSet(SparseFieldsetViewMixin, ModelViewSet):
     """
     Handles operations for SubCategory model.
 
@@ -133,7 +150,8 @@ class SubCategoryViewSet(ModelViewSet):
     filterset_fields = ['category']
     throttle_classes = [UserRateThrottle, AnonRateThrottle]
 
-    @method_decorator(cache_page(60 * 5))
+    @conditional_on_updated_at
+    @method_decorator(cache_catalog_page())
     def list(self, request, *args, **kwargs):
         logger.info("User %s requested subcategory list.", request.user)
         try:
@@ -144,7 +162,8 @@ class SubCategoryViewSet(ModelViewSet):
             logger.error("Unexpected error in list view: %s", str(e), exc_info=True)
             raise APIException("An error occurred while fetching the subcategory list.")
 
-    @method_decorator(cache_page(60 * 10))
+    @conditional_on_updated_at
+    @method_decorator(cache_catalog_page())
     def retrieve(self, request, *args, **kwargs):
         subcategory_id = kwargs.get('pk')
         logger.info("User %s requested subcategory details for ID %s.", request.user, subcategory_id)
@@ -201,6 +220,88 @@ class SubCategoryViewSet(ModelViewSet):
             raise APIException("An error occurred while deleting the subcategory.")
 
 
+class CategoryTreeView(APIView):
+    """
+    Categories with their subcategories and active product counts, for menus.
+
+    Endpoint:
+    GET /products/category-tree/ -> Full category tree
+    """
+    permission_classes = [IsAdminUserOrReadOnly]
+    throttle_classes = [UserRateThrottle, AnonRateThrottle]
+
+    @extend_schema(summary="Category tree", tags=["Category"], responses=CategoryTreeSerializer(many=True))
+    def get(self, request):
+        logger.info("User %s requested the category tree.", request.user)
+        try:
+            return Response(get_category_tree())
+        except Exception as e:
+            logger.error("Unexpected error while building the category tree: %s", str(e), exc_info=True)
+            raise APIException("An error occurred while fetching the category tree.")
+
+
+class SuggestView(APIView):
+    """
+    Search-box suggestions: product, category and subcategory names with a
+    word starting with ?q=, served from an in-process prefix index.
+
+    Endpoint:
+    GET /products/suggest/?q=<prefix>&limit=<n> -> Up to n suggestions (default 10, max 50)
+    """
+    permission_classes = [IsAdminUserOrReadOnly]
+    throttle_classes = [UserRateThrottle, AnonRateThrottle]
+
+    @extend_schema(summary="Search suggestions", tags=["Product"])
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        try:
+            limit = min(int(request.query_params.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+        except ValueError:
+            raise ValidationError({'limit': "A valid integer is required."})
+        logger.debug("User %s requested suggestions for %r.", request.user, query)
+        try:
+            return Response(suggest_index.suggest(query, limit=max(limit, 1)))
+        except Exception as e:
+            logger.error("Unexpected error while building suggestions: %s", str(e), exc_info=True)
+            raise APIException("An error occurred while fetching suggestions.")
+
+
+class ProductImportView(APIView):
+    """
+    Bulk create or update products from an uploaded CSV or JSON Lines file.
+
+    Endpoint:
+    POST /products/import/ -> Multipart upload with a 'file' field and an
+    optional 'format' (csv or jsonl, defaults to the file extension)
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    @extend_schema(summary="Bulk import products", tags=["Product"])
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': "Upload a CSV or JSONL file."})
+        format = request.data.get('format') or get_format(upload.name)
+        if format not in IMPORT_FORMATS:
+            logger.warning("Rejected product import in unsupported format %s.", format)
+            raise ValidationError({'format': f"Unsupported import format '{format}', expected one of {', '.join(IMPORT_FORMATS)}."})
+        logger.info("User %s is importing products from %s (%s).", request.user, upload.name, format)
+        try:
+            report = import_products(codecs.iterdecode(upload, 'utf-8-sig'), format=format,
+                                     batch_size=DEFAULT_BATCH_SIZE)
+        except UnicodeDecodeError as e:
+            logger.warning("Rejected product import that isn't UTF-8: %s", str(e))
+            raise ValidationError({'file': "The file must be UTF-8 encoded."})
+        except Exception as e:
+            logger.error("Unexpected error during product import: %s", str(e), exc_info=True)
+            raise APIException("An error occurred while importing products.")
+
+        logger.info("Product import finished: %s created, %s updated, %s failed.",
+                    report.created, report.updated, report.failed)
+        return Response(report.as_dict(), status=status.HTTP_200_OK)
+
+
 class CustomPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
@@ -214,21 +315,38 @@ class CustomPagination(PageNumberPagination):
     update=extend_schema(summary="Update product", tags=["Product"]),
     partial_update=extend_schema(summary="Partially update product", tags=["Product"]),
     destroy=extend_schema(summary="Delete product", tags=["Product"]),
+    facets=extend_schema(summary="Product facet counts", tags=["Product"]),
 )
-class ProductViewSet(ModelViewSet):
+class ProductViewSet(SparseFieldsetViewMixin, ModelViewSet):
     """
     Handles operations for Product model.
+
+    Lists are page-number paginated by default; ?pagination=cursor switches to
+    keyset pagination ordered by created_at or price (see KeysetPagination).
+    Reads accept ?fields= and ?expand= (see products.sparse).
     """
-    queryset = Product.objects.all()
+    queryset = Product.objects.for_catalog()
     serializer_class = ProductSerializer
     pagination_class = CustomPagination
+    cursor_pagination_class = KeysetPagination
     permission_classes = [IsAdminUserOrReadOnly]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    # Search first, so ?fuzzy= (applied last by the filterset) ranks among the search results
+    filter_backends = [ProductSearchFilter, DjangoFilterBackend, OrderingFilter]
     filterset_class = ProductFilterSet
-    search_fields = ['name', 'description']
-    ordering_fields = ['price', 'updated_at']
+    ordering_fields = ['price', 'created_at', 'updated_at']
     throttle_classes = [UserRateThrottle, AnonRateThrottle]
 
+    @property
+    def paginator(self):
+        """
+        Uses keyset pagination when the client opts in with ?pagination=cursor.
+        """
+        if not hasattr(self, '_paginator') and getattr(self, 'request', None) is not None:
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
     def get_serializer_class(self):
         """
         Returns a different serializer for the 'create' action.
@@ -237,18 +355,40 @@ class ProductViewSet(ModelViewSet):
             return ProductCreateUpdateSerializer  # Serializer for creating a product
         return super().get_serializer_class()
 
-    @method_decorator(cache_page(60 * 5))
+    @conditional_on_updated_at
+    @method_decorator(cache_catalog_page())
     def list(self, request, *args, **kwargs):
         logger.info("User %s requested product list.", request.user)
         try:
             response = super().list(request, *args, **kwargs)
             logger.debug("List response: %s", response.data)
             return response
+        except (ValidationError, NotFound) as e:
+            logger.warning("Invalid product list request: %s", e.detail)
+            raise
         except Exception as e:
             logger.error("Unexpected error in list view: %s", str(e), exc_info=True)
             raise APIException("An error occurred while fetching the product list.")
 
-    @method_decorator(cache_page(60 * 10))
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Counts per category, subcategory and price bucket for the products
+        matching the same filters and search as the list endpoint.
+        """
+        logger.info("User %s requested product facets.", request.user)
+        filterset = self.filterset_class(request.query_params, queryset=Product.objects.all(), request=request)
+        if not filterset.is_valid():
+            logger.warning("Invalid product facet filters: %s", filterset.errors)
+            raise ValidationError(filterset.errors)
+        try:
+            return Response(get_facets(filterset, request.query_params.get('search', '')))
+        except Exception as e:
+            logger.error("Unexpected error while computing product facets: %s", str(e), exc_info=True)
+            raise APIException("An error occurred while fetching the product facets.")
+
+    @conditional_on_updated_at
+    @method_decorator(cache_catalog_page())
     def retrieve(self, request, *args, **kwargs):
         product_id = kwargs.get('pk')
         logger.info("User %s requested product details for ID %s.", request.user, product_id)
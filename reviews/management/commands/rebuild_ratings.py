@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from products.models import Product
+from reviews.utils import refresh_product_ratings
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized rating aggregates stored on products"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000,
+                            help="Number of products updated per statement")
+
+    def handle(self, *args, **options):
+        batch_size = options.get("batch_size")
+        products = Product.objects.order_by('pk').values_list('pk', flat=True)
+
+        updated = 0
+        batch = list(products[:batch_size])
+        while batch:
+            updated += refresh_product_ratings(batch)
+            batch = list(products.filter(pk__gt=batch[-1])[:batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt ratings for {updated} products"))
@@ -0,0 +1,31 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def backfill_product_ratings(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    Review = apps.get_model('reviews', 'Review')
+
+    stats = Review.objects.order_by().values('product_id').annotate(total=Sum('rating'), count=Count('id'))
+    products = [
+        Product(
+            pk=row['product_id'],
+            rating_sum=row['total'],
+            review_count=row['count'],
+            average_rating=row['total'] / row['count'],
+        )
+        for row in stats
+    ]
+    Product.objects.bulk_update(products, ['rating_sum', 'review_count', 'average_rating'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_rating_aggregates'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_product_ratings, migrations.RunPython.noop),
+    ]
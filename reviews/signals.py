@@ -0,0 +1,29 @@
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from reviews.models import Review
+from reviews.utils import refresh_product_ratings
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_product(sender, instance, **kwargs):
+    # A review moved to another product has to refresh the old product too
+    instance._previous_product_id = None
+    if not instance._state.adding:
+        instance._previous_product_id = (
+            Review.objects.filter(pk=instance.pk).values_list('product_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def update_ratings_on_save(sender, instance, **kwargs):
+    product_ids = {instance.product_id}
+    previous_product_id = getattr(instance, '_previous_product_id', None)
+    if previous_product_id:
+        product_ids.add(previous_product_id)
+    refresh_product_ratings(product_ids)
+
+
+@receiver(post_delete, sender=Review)
+def update_ratings_on_delete(sender, instance, **kwargs):
+    refresh_product_ratings([instance.product_id])
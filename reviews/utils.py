@@ -0,0 +1,36 @@
+from django.db.models import Avg, Count, IntegerField, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Now
+
+from products.models import Product
+from .models import Review
+
+
+def _review_stat(aggregate):
+    """
+    Correlated subquery returning one aggregate over the reviews of the outer product.
+    """
+    return Subquery(
+        Review.objects.filter(product=OuterRef('pk'))
+        .order_by()
+        .values('product')
+        .annotate(value=aggregate)
+        .values('value')[:1]
+    )
+
+
+def refresh_product_ratings(product_ids=None):
+    """
+    Recompute the denormalized rating aggregates of the given products
+    (or every product) with a single UPDATE statement.
+    Returns the number of products updated.
+    """
+    products = Product.objects.all()
+    if product_ids is not None:
+        products = products.filter(pk__in=product_ids)
+
+    return products.update(
+        rating_sum=Coalesce(_review_stat(Sum('rating')), Value(0), output_field=IntegerField()),
+        review_count=Coalesce(_review_stat(Count('id')), Value(0), output_field=IntegerField()),
+        average_rating=Coalesce(_review_stat(Avg('rating')), Value(0.0), output_field=FloatField()),
+        updated_at=Now(),
+    )
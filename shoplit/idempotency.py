@@ -0,0 +1,93 @@
+"""
+Idempotency-Key support for endpoints that create things.
+
+A client sends a unique ``Idempotency-Key`` header with a request it may
+retry. The first response for a key is stored in the cache for
+IDEMPOTENCY_KEY_TTL seconds; a retry with the same key and body gets that
+response back with an ``Idempotent-Replayed: true`` header, without running
+the view again, so no database queries and no calls to external services.
+
+Keys are scoped to the user and the endpoint. A retry that arrives while the
+first request is still running gets a 409, reusing a key with a different
+body a 422. Responses with a 5xx status aren't stored, so those can be
+retried with the same key. Requests without the header behave as before.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http.request import RawPostDataException
+from rest_framework import status
+from rest_framework.response import Response
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+def _fingerprint(request):
+    try:
+        body = request.body
+    except RawPostDataException:
+        body = repr(sorted(request.data.items())).encode()
+    return hashlib.sha256(body).hexdigest()
+
+
+def _cache_key(request, key):
+    user = request.user.pk if request.user.is_authenticated else ''
+    digest = hashlib.sha256(f'{user}:{request.method}:{request.path}:{key}'.encode()).hexdigest()
+    return f'idempotency:{digest}'
+
+
+def idempotent(view_method):
+    """
+    Decorator for the handler methods of DRF views (``create``, ``post``, ...).
+    """
+    @wraps(view_method)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return view_method(view, request, *args, **kwargs)
+        if not key.strip() or len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'error': f'{HEADER} must be 1 to {MAX_KEY_LENGTH} characters.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        cache_key = _cache_key(request, key)
+        fingerprint = _fingerprint(request)
+
+        def replay():
+            stored = cache.get(cache_key)
+            if stored is None:
+                return None
+            stored_fingerprint, status_code, data = stored
+            if stored_fingerprint != fingerprint:
+                return Response(
+                    {'error': f'This {HEADER} was already used with a different request body.'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            return Response(data, status=status_code, headers={REPLAYED_HEADER: 'true'})
+
+        response = replay()
+        if response is not None:
+            return response
+
+        lock_key = f'{cache_key}:lock'
+        if not cache.add(lock_key, True, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+            return Response(
+                {'error': f'A request with this {HEADER} is already in progress.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        try:
+            # The first request may have finished between the lookup and taking the lock
+            response = replay() or view_method(view, request, *args, **kwargs)
+            if response.status_code < 500 and REPLAYED_HEADER not in response:
+                cache.set(cache_key, (fingerprint, response.status_code, response.data),
+                          settings.IDEMPOTENCY_KEY_TTL)
+        finally:
+            cache.delete(lock_key)
+        return response
+
+    return wrapper
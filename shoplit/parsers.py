@@ -0,0 +1,57 @@
+"""
+API parsers, the counterparts of shoplit.renderers.
+"""
+import uuid
+from decimal import Decimal, InvalidOperation
+
+import msgpack
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from .renderers import ORJSONRenderer, MessagePackRenderer, MSGPACK_DECIMAL, MSGPACK_UUID
+
+
+class ORJSONParser(JSONParser):
+    """
+    Parses JSON request bodies with orjson. Like JSONParser in strict mode,
+    NaN and Infinity are rejected.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            body = stream.read() if stream is not None else b''
+            if encoding.lower().replace('-', '') != 'utf8':
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+def _msgpack_ext_hook(code, data):
+    if code == MSGPACK_DECIMAL:
+        return Decimal(data.decode('ascii'))
+    if code == MSGPACK_UUID:
+        return uuid.UUID(bytes=data)
+    raise ValueError(f'unknown extension type {code}')
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses ``application/msgpack`` bodies, including the Decimal and UUID
+    extension types written by MessagePackRenderer.
+    """
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            body = stream.read() if stream is not None else b''
+            return msgpack.unpackb(body, ext_hook=_msgpack_ext_hook, raw=False)
+        except (ValueError, TypeError, InvalidOperation, msgpack.UnpackException) as exc:
+            raise ParseError('MessagePack parse error - %s' % str(exc))
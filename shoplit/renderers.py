@@ -0,0 +1,103 @@
+"""
+API renderers.
+
+ORJSONRenderer produces the same bytes as DRF's JSONRenderer, several times
+faster: orjson encodes the built-in types and UUIDs natively and hands
+everything else (Decimal, datetimes, lazy strings, ...) to DRF's JSONEncoder,
+so values keep the representation clients already rely on.
+
+MessagePackRenderer serves ``application/msgpack``. Decimals and UUIDs are
+written as extension types so they read back exactly, not as floats or
+strings; other values are encoded as they are in JSON.
+
+    ext 1  Decimal, its ASCII string form (e.g. "12.50")
+    ext 2  UUID, its 16 bytes
+
+Serializer UUIDFields render UUIDs as strings, while primary key relations
+keep UUID objects. MessagePackRenderer follows the serializer attached to
+ReturnDict / ReturnList data to turn those strings back into UUIDs, so
+every UUID a serializer renders goes out as ext 2.
+"""
+import uuid
+from collections.abc import Mapping
+from decimal import Decimal
+
+import msgpack
+import orjson
+from rest_framework.fields import ListField, UUIDField
+from rest_framework.relations import ManyRelatedField
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.serializers import ListSerializer, Serializer
+from rest_framework.utils import encoders
+
+MSGPACK_DECIMAL = 1
+MSGPACK_UUID = 2
+
+_encoder = encoders.JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    # Datetimes go through DRF's encoder, which formats them as ECMA-262 strings
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        options = self.options
+        # orjson only indents by two spaces, any requested indent gets that
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=_encoder.default, option=options)
+
+        # Same escaping as JSONRenderer, so the output stays a strict JavaScript subset
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, Decimal):
+        return msgpack.ExtType(MSGPACK_DECIMAL, str(obj).encode('ascii'))
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(MSGPACK_UUID, obj.bytes)
+    return _encoder.default(obj)
+
+
+def _restore_uuids(data, field=None):
+    """
+    ``data`` with the strings rendered by serializer UUIDFields turned back
+    into UUIDs. Data that no serializer produced is copied as it is.
+    """
+    if field is None:
+        # Set on serializer.data, also when nested in e.g. a paginated response
+        field = getattr(data, 'serializer', None)
+
+    if isinstance(field, (ListSerializer, ListField)) and isinstance(data, list):
+        return [_restore_uuids(item, field.child) for item in data]
+    if isinstance(field, ManyRelatedField) and isinstance(data, list):
+        return [_restore_uuids(item, field.child_relation) for item in data]
+    if isinstance(field, Serializer) and isinstance(data, Mapping):
+        fields = field.fields
+        return {key: _restore_uuids(value, fields.get(key)) for key, value in data.items()}
+    if isinstance(field, UUIDField) and isinstance(data, str):
+        return uuid.UUID(data)
+    if field is None:
+        if isinstance(data, Mapping):
+            return {key: _restore_uuids(value) for key, value in data.items()}
+        if isinstance(data, (list, tuple)):
+            return [_restore_uuids(item) for item in data]
+    return data
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(_restore_uuids(data), default=_msgpack_default, use_bin_type=True)
@@ -0,0 +1,126 @@
+"""
+Read-replica routing.
+
+Reads of the apps in ``REPLICA_APPS`` made while serving a GET, HEAD or
+OPTIONS request go to one of the ``DATABASE_REPLICAS``, picked once per
+request so a response reads one consistent copy. Everything else uses the
+primary: writes, every read made while serving another method, reads inside
+a transaction and reads outside a request (tasks, management commands).
+
+After an authenticated user sends a write request, their reads stay on the
+primary for ``REPLICA_PIN_SECONDS``, so they see their own changes while the
+replicas catch up. The pin is kept in the cache, so it covers every process.
+
+Results cached under a version that writes bump (see products.cache) are
+filled inside read_from_primary() for a while after each bump, so a lagging
+replica can't store the old rows under the new version.
+
+With no replicas configured the router has no opinion and every query goes
+to ``default`` as before.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+_current_request = ContextVar('replica_request', default=None)
+_read_primary = ContextVar('replica_read_primary', default=False)
+
+
+def _pin_key(user_pk):
+    return f'replica-pin:{user_pk}'
+
+
+def pin_to_primary(user):
+    """
+    Keep ``user``'s reads on the primary for REPLICA_PIN_SECONDS.
+    """
+    cache.set(_pin_key(user.pk), True, settings.REPLICA_PIN_SECONDS)
+
+
+@contextmanager
+def read_from_primary(enabled=True):
+    """
+    Send the reads made inside the block to the primary when ``enabled``.
+    """
+    token = _read_primary.set(enabled or _read_primary.get())
+    try:
+        yield
+    finally:
+        _read_primary.reset(token)
+
+
+class RequestState:
+    def __init__(self, request):
+        self.request = request
+        self.replica = None
+        self.pinned = {}
+
+    def is_pinned(self):
+        # DRF authenticates in the view, after the middleware ran, so the user is looked up lazily
+        user = getattr(self.request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return False
+        if user.pk not in self.pinned:
+            self.pinned[user.pk] = bool(cache.get(_pin_key(user.pk)))
+        return self.pinned[user.pk]
+
+    def get_replica(self, replicas):
+        if self.request.method not in SAFE_METHODS or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        if self.is_pinned():
+            return None
+        if self.replica not in replicas:
+            self.replica = random.choice(replicas)
+        return self.replica
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            return None
+        state = _current_request.get()
+        if state is not None and not _read_primary.get() and model._meta.app_label in settings.REPLICA_APPS:
+            return state.get_replica(replicas) or DEFAULT_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Objects read from a replica are saved to the primary too
+        return DEFAULT_DB_ALIAS if settings.DATABASE_REPLICAS else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            return None
+        databases = {DEFAULT_DB_ALIAS, *replicas}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaMiddleware:
+    """
+    Makes the current request visible to ReplicaRouter and pins users to the
+    primary after their write requests.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _current_request.set(RequestState(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+        user = getattr(request, 'user', None)
+        if (settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS
+                and user is not None and user.is_authenticated):
+            pin_to_primary(user)
+        return response
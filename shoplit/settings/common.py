@@ -14,6 +14,7 @@ from datetime import timedelta
 from pathlib import Path
 import os
 from dotenv import load_dotenv
+from corsheaders.defaults import default_headers
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
@@ -79,6 +80,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'shoplit.replicas.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     "debug_toolbar.middleware.DebugToolbarMiddleware",
@@ -86,6 +88,14 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'shoplit.urls'
 
+# Read replicas, see shoplit.replicas. DATABASES and DATABASE_REPLICAS are set per environment
+DATABASE_ROUTERS = ['shoplit.replicas.ReplicaRouter']
+DATABASE_REPLICAS = []
+# Apps whose models are read from a replica while serving GET, HEAD and OPTIONS requests
+REPLICA_APPS = ['products', 'reviews', 'recommendations']
+# Should comfortably exceed the replication lag
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 10))
+
 
 TEMPLATES = [
     {
@@ -164,6 +174,7 @@ AUTH_USER_MODEL = 'customuser.CustomUser'
 
 # CORS_ALLOWED_ORIGINS = [*]
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
 
 SIMPLE_JWT = {
    'AUTH_HEADER_TYPES': ('JWT',),
@@ -179,6 +190,17 @@ DJOSER = {
 
 REST_FRAMEWORK = {
     'COERCE_DECIMAL_TO_STRING': False,
+    'DEFAULT_RENDERER_CLASSES': [
+        'shoplit.renderers.ORJSONRenderer',
+        'shoplit.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'shoplit.parsers.ORJSONParser',
+        'shoplit.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
      'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -245,8 +267,29 @@ LOGGING = {
     }
 }
 
+# Catalog versions (products.cache) and replica pins (shoplit.replicas) only
+# hold when every worker shares the cache, so no process-local backend here.
+# The table is created by migrate; prod overrides this with Redis.
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "shoplit_cache",
     }
-}
\ No newline at end of file
+}
+
+# Catalog responses are invalidated on write (see products.cache), so they can live long
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', 60 * 60 * 6))
+
+# First responses stored for Idempotency-Key retries, see shoplit.idempotency
+IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL', 60 * 60 * 24))
+# Longest a request may hold its key before a retry can run it again
+IDEMPOTENCY_LOCK_TIMEOUT = 60
+
+# Outbox messages moved to the task queue per transaction, see orders.outbox
+OUTBOX_BATCH_SIZE = 100
+
+# Rows fetched from the cursor and encoded at a time by the order export, see orders.export
+EXPORT_CHUNK_SIZE = 2000
+
+# Orders per status notification task queued by a bulk transition, see orders.status
+ORDER_STATUS_NOTIFY_BATCH_SIZE = 500
@@ -21,9 +21,17 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',  # this creates db.sqlite3 in your project root
-    }
+    },
+    # Stands in for a read replica: copy db.sqlite3 to db.replica.sqlite3 and
+    # set DATABASE_REPLICAS=replica to send catalog reads to it
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+    },
 }
 
+DATABASE_REPLICAS = [alias for alias in os.getenv('DATABASE_REPLICAS', '').split(',') if alias]
+
 
 
 
@@ -57,6 +65,17 @@ Q_CLUSTER = {
 
 REST_FRAMEWORK = {
     'COERCE_DECIMAL_TO_STRING': False,
+    'DEFAULT_RENDERER_CLASSES': [
+        'shoplit.renderers.ORJSONRenderer',
+        'shoplit.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'shoplit.parsers.ORJSONParser',
+        'shoplit.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
      'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -22,6 +22,23 @@ DATABASES = {
     }
 }
 
+# Read replicas as a comma-separated list of database URLs, see shoplit.replicas
+DATABASE_REPLICAS = []
+for number, url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')), start=1):
+    DATABASES[f'replica{number}'] = {**dj_database_url.parse(url), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': REDIS_URL,
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+        },
+    }
+}
+
 
 Q_CLUSTER = {
     'name': 'shoplit',
@@ -54,6 +71,17 @@ EMAIL_PORT = os.environ.get('MAILGUN_SMTP_PORT')
 
 REST_FRAMEWORK = {
     'COERCE_DECIMAL_TO_STRING': False,
+    'DEFAULT_RENDERER_CLASSES': [
+        'shoplit.renderers.ORJSONRenderer',
+        'shoplit.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'shoplit.parsers.ORJSONParser',
+        'shoplit.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
      'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -8,11 +8,12 @@ from rest_framework.throttling import UserRateThrottle, AnonRateThrottle
 
 from .serializers import WishListSerializer
 from .models import WishList
+from products.sparse import SparseFieldsetViewMixin
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-class WishListViewSet(viewsets.ModelViewSet):
+class WishListViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     Handles the WishList Model
 
@@ -22,7 +23,8 @@ class WishListViewSet(viewsets.ModelViewSet):
     PUT /wishlists/{id} -> Update a wishlist
     DELETE /wishlists/{id} -> Delete a wishlist
     """
-    queryset = WishList.objects.all()
+    # The wishlist renders category and subcategory as keys and no images, so a plain prefetch is enough
+    queryset = WishList.objects.prefetch_related('products')
     serializer_class = WishListSerializer
     permission_classes = [IsAuthenticated]
     throttle_classes = [UserRateThrottle, AnonRateThrottle]